@@ -231,6 +231,10 @@ const App: React.FC = () => {
         workOrderId: item.workOrderId,
         workOrderTitle: item.workOrderTitle,
         message: item.message,
+        messageKey: item.messageKey,
+        messageParams: item.messageKey
+          ? { title: item.workOrderTitle, ...item.messageParams }
+          : undefined,
         recipientRole: item.recipientRole as UserRole,
         recipientName: item.recipientName,
         isRead: item.isRead,
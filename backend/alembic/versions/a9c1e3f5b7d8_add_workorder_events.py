@@ -0,0 +1,60 @@
+"""add_workorder_events
+
+Revision ID: a9c1e3f5b7d8
+Revises: f8b0d2e4a6c7
+Create Date: 2026-10-19 18:14:36.902711
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9c1e3f5b7d8'
+down_revision = 'f8b0d2e4a6c7'
+branch_labels = None
+depends_on = None
+
+# Seed the history with what the work order stamps still tell: creation and
+# the latest approval, rejection and close of each work order
+SEED_EVENTS = (
+    ("NULL", "'Open'", "created_at", "created_by", "NULL"),
+    ("'Pending'", "'Completed'", "approved_at", "approved_by", "NULL"),
+    ("'Pending'", "'In Progress'", "rejected_at", "rejected_by", "rejection_reason"),
+    ("'Completed'", "'Closed'", "closed_at", "closed_by", "NULL"),
+)
+
+
+def upgrade() -> None:
+    op.create_table('workorder_events',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('work_order_id', sa.String(length=50), nullable=False),
+    sa.Column('from_status', sa.String(length=50), nullable=True),
+    sa.Column('to_status', sa.String(length=50), nullable=False),
+    sa.Column('at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('actor', sa.String(length=255), nullable=True),
+    sa.Column('assigned_to', sa.String(length=255), nullable=True),
+    sa.Column('asset_name', sa.String(length=255), nullable=True),
+    sa.Column('reason', sa.Text(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_workorder_events_work_order_id_at', 'workorder_events', ['work_order_id', 'at'], unique=False)
+    op.create_index('ix_workorder_events_to_status_at', 'workorder_events', ['to_status', 'at'], unique=False)
+
+    # workorders.created_by is in the model but no migration adds it
+    columns = {c['name'] for c in sa.inspect(op.get_bind()).get_columns('workorders')}
+    for from_status, to_status, at, actor, reason in SEED_EVENTS:
+        if actor not in columns:
+            actor = "NULL"
+        op.execute(
+            "INSERT INTO workorder_events (work_order_id, from_status, to_status, at, "
+            "actor, assigned_to, asset_name, reason) "
+            f"SELECT id, {from_status}, {to_status}, {at}, {actor}, assigned_to, "
+            f"asset_name, {reason} FROM workorders WHERE {at} IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_workorder_events_to_status_at', table_name='workorder_events')
+    op.drop_index('ix_workorder_events_work_order_id_at', table_name='workorder_events')
+    op.drop_table('workorder_events')
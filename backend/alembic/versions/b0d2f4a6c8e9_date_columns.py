@@ -0,0 +1,150 @@
+"""date_columns
+
+Revision ID: b0d2f4a6c8e9
+Revises: a9c1e3f5b7d8
+Create Date: 2026-10-19 19:02:47.318564
+
+"""
+import os
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b0d2f4a6c8e9'
+down_revision = 'a9c1e3f5b7d8'
+branch_labels = None
+depends_on = None
+
+DATE_BACKFILL_CHUNK_SIZE = int(os.getenv("DATE_BACKFILL_CHUNK_SIZE", "1000"))
+
+# (table, column, index) of the YYYY-MM-DD strings that become DATE columns
+DATE_COLUMNS = (
+    ("workorders", "due_date", "ix_workorders_due_date"),
+    ("workorders", "preferred_date", "ix_workorders_preferred_date"),
+    ("requests", "preferred_date", "ix_requests_preferred_date"),
+)
+
+rejects = sa.table(
+    "date_value_rejects",
+    sa.column("table_name", sa.String),
+    sa.column("column_name", sa.String),
+    sa.column("row_id", sa.String),
+    sa.column("value", sa.Text),
+)
+
+
+def _parse(value):
+    try:
+        return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def _backfill(bind, table_name, column, record_rejects=True):
+    """
+    Copy column into column_new in keyset chunks of DATE_BACKFILL_CHUNK_SIZE
+    rows. Values that don't parse stay NULL and go to date_value_rejects.
+    """
+    table = sa.table(
+        table_name,
+        sa.column("id", sa.String),
+        sa.column(column, sa.String),
+        sa.column(f"{column}_new", sa.Date),
+    )
+    new_column = table.c[f"{column}_new"]
+    update = (
+        table.update()
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values({new_column: sa.bindparam("parsed")})
+    )
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, table.c[column])
+            .where(
+                table.c.id > last_id,
+                table.c[column].isnot(None),
+                new_column.is_(None),
+            )
+            .order_by(table.c.id)
+            .limit(DATE_BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        parsed, rejected = [], []
+        for row_id, value in rows:
+            day = _parse(value)
+            if day is not None:
+                parsed.append({"row_id": row_id, "parsed": day})
+            elif value.strip() and record_rejects:
+                rejected.append(
+                    {
+                        "table_name": table_name,
+                        "column_name": column,
+                        "row_id": row_id,
+                        "value": value,
+                    }
+                )
+        if parsed:
+            bind.execute(update, parsed)
+        if rejected:
+            bind.execute(rejects.insert(), rejected)
+            print(f"[Migration] {len(rejected)} unparseable {table_name}.{column} values")
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    op.create_table('date_value_rejects',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('column_name', sa.String(length=50), nullable=False),
+    sa.Column('row_id', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    for table_name, column, _ in DATE_COLUMNS:
+        op.add_column(table_name, sa.Column(f'{column}_new', sa.Date(), nullable=True))
+
+    # Backfill with one commit per chunk, so the tables stay writable
+    with op.get_context().autocommit_block():
+        for table_name, column, _ in DATE_COLUMNS:
+            _backfill(op.get_bind(), table_name, column)
+
+    # Catch up with rows written meanwhile, then swap the columns (batch mode:
+    # SQLite can't ALTER COLUMN, so the table is copied there)
+    for table_name, column, index in DATE_COLUMNS:
+        _backfill(op.get_bind(), table_name, column, record_rejects=False)
+        op.execute(f'DROP INDEX IF EXISTS {index}')
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.drop_column(column)
+            batch_op.alter_column(f'{column}_new', new_column_name=column)
+        op.create_index(index, table_name, [column], unique=False)
+
+    # Dashboard counts are keyed by the (now normalized) due date
+    op.execute("DELETE FROM workorder_stats")
+    op.execute(
+        "INSERT INTO workorder_stats (status, priority, assigned_to, due_date, total) "
+        "SELECT COALESCE(status, ''), priority, COALESCE(assigned_to, ''), "
+        "COALESCE(CAST(due_date AS VARCHAR(50)), ''), COUNT(*) FROM workorders "
+        "GROUP BY COALESCE(status, ''), priority, COALESCE(assigned_to, ''), "
+        "COALESCE(CAST(due_date AS VARCHAR(50)), '')"
+    )
+
+
+def downgrade() -> None:
+    for table_name, column, index in DATE_COLUMNS:
+        op.drop_index(index, table_name=table_name)
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.alter_column(
+                column,
+                existing_type=sa.Date(),
+                type_=sa.String(length=50),
+                postgresql_using=f'{column}::text',
+            )
+    op.create_index('ix_workorders_due_date', 'workorders', ['due_date'], unique=False)
+    op.create_index('ix_requests_preferred_date', 'requests', ['preferred_date'], unique=False)
+    op.drop_table('date_value_rejects')
@@ -0,0 +1,30 @@
+"""add_notification_reads
+
+Revision ID: b8d2f4a6c0e1
+Revises: a3c5e7f9b1d2
+Create Date: 2026-10-19 10:02:11.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d2f4a6c0e1'
+down_revision = 'a3c5e7f9b1d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_reads',
+    sa.Column('notification_id', sa.String(length=100), nullable=False),
+    sa.Column('user_name', sa.String(length=255), nullable=False),
+    sa.Column('read_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('dismissed', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.PrimaryKeyConstraint('notification_id', 'user_name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_reads')
@@ -0,0 +1,116 @@
+"""coded_status_priority
+
+Revision ID: c1e3a5b7d9f0
+Revises: b0d2f4a6c8e9
+Create Date: 2026-10-19 19:48:05.127390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1e3a5b7d9f0'
+down_revision = 'b0d2f4a6c8e9'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the codes in utils/workflow_rules.py at this revision
+STATUS_CODES = {
+    'Open': 1,
+    'In Progress': 2,
+    'Pending': 3,
+    'Completed': 4,
+    'Closed': 5,
+    'Canceled': 6,
+}
+REQUEST_STATUS_CODES = {**STATUS_CODES, 'Converted to WO': 7}
+PRIORITY_CODES = {'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
+# The request portal in Thai sent the translated label instead of the value
+THAI_PRIORITY_CODES = {'ต่ำ': 1, 'ปานกลาง': 2, 'สูง': 3, 'วิกฤต': 4}
+STORED_PRIORITY_CODES = {**PRIORITY_CODES, **THAI_PRIORITY_CODES}
+
+# (table, column, codes of the stored values, codes to restore on downgrade)
+CODED_COLUMNS = (
+    ('workorders', 'status', STATUS_CODES, STATUS_CODES),
+    ('workorders', 'priority', STORED_PRIORITY_CODES, PRIORITY_CODES),
+    ('requests', 'status', REQUEST_STATUS_CODES, REQUEST_STATUS_CODES),
+    ('requests', 'priority', STORED_PRIORITY_CODES, PRIORITY_CODES),
+)
+
+
+def _literal(value):
+    return str(sa.literal(value).compile(compile_kwargs={'literal_binds': True}))
+
+
+def _case(column, mapping):
+    """USING expression that maps every value of the column"""
+    whens = " ".join(
+        f"WHEN {_literal(old)} THEN {_literal(new)}" for old, new in mapping.items()
+    )
+    return f"CASE {column} {whens} END"
+
+
+def _convert(table, column, mapping, type_, existing_type):
+    """
+    Change the column type, mapping its values. PostgreSQL does both in one
+    ALTER ... USING; elsewhere the values are mapped in place first and the
+    type is changed in batch mode (SQLite can't ALTER COLUMN).
+    """
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column(
+            table,
+            column,
+            type_=type_,
+            existing_type=existing_type,
+            postgresql_using=_case(column, mapping),
+        )
+        return
+    op.execute(f"UPDATE {table} SET {column} = {_case(column, mapping)}")
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.alter_column(column, type_=type_, existing_type=existing_type)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    unknown = []
+    for table, column, codes, _ in CODED_COLUMNS:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT DISTINCT {column} FROM {table} "
+                f"WHERE {column} IS NOT NULL AND {column} NOT IN :known"
+            ).bindparams(sa.bindparam('known', expanding=True)),
+            {'known': list(codes)},
+        ).scalars().all()
+        unknown += [f"{table}.{column} = {value!r}" for value in rows]
+    if unknown:
+        raise RuntimeError(
+            "Fix these values before converting the columns: " + ", ".join(unknown)
+        )
+
+    for table, column, codes, _ in CODED_COLUMNS:
+        _convert(table, column, codes, sa.SmallInteger(), sa.String(length=50))
+
+    # The dashboard counts were keyed by the stored labels, Thai ones included
+    status_name = _case('status', {v: k for k, v in STATUS_CODES.items()})
+    priority_name = _case('priority', {v: k for k, v in PRIORITY_CODES.items()})
+    op.execute("DELETE FROM workorder_stats")
+    op.execute(
+        "INSERT INTO workorder_stats (status, priority, assigned_to, due_date, total) "
+        f"SELECT COALESCE({status_name}, ''), {priority_name}, "
+        "COALESCE(assigned_to, ''), COALESCE(CAST(due_date AS VARCHAR(50)), ''), "
+        f"COUNT(*) FROM workorders GROUP BY COALESCE({status_name}, ''), "
+        f"{priority_name}, COALESCE(assigned_to, ''), "
+        "COALESCE(CAST(due_date AS VARCHAR(50)), '')"
+    )
+
+
+def downgrade() -> None:
+    for table, column, _, codes in CODED_COLUMNS:
+        _convert(
+            table,
+            column,
+            {v: k for k, v in codes.items()},
+            sa.String(length=50),
+            sa.SmallInteger(),
+        )
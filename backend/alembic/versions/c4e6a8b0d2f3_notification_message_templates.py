@@ -0,0 +1,40 @@
+"""notification_message_templates
+
+Revision ID: c4e6a8b0d2f3
+Revises: b8d2f4a6c0e1
+Create Date: 2026-10-19 11:20:47.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e6a8b0d2f3'
+down_revision = 'b8d2f4a6c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_templates',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('locale', sa.String(length=8), nullable=False),
+    sa.Column('body', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('key', 'locale')
+    )
+    op.add_column('notifications', sa.Column('message_key', sa.String(length=64), nullable=True))
+    op.add_column('notifications', sa.Column('message_params', sa.JSON(), nullable=True))
+    # Batch mode: SQLite can't ALTER COLUMN, so the table is copied there
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.alter_column('message', existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    # Rows stored as key + params have no pre-rendered text to fall back to
+    op.execute("UPDATE notifications SET message = message_key WHERE message IS NULL")
+    with op.batch_alter_table('notifications') as batch_op:
+        batch_op.alter_column('message', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('message_params')
+        batch_op.drop_column('message_key')
+    op.drop_table('notification_templates')
@@ -0,0 +1,95 @@
+"""add_image_refs
+
+Revision ID: d2f4a6c8e0b1
+Revises: c1e3a5b7d9f0
+Create Date: 2026-10-19 20:21:33.540918
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f4a6c8e0b1'
+down_revision = 'c1e3a5b7d9f0'
+branch_labels = None
+depends_on = None
+
+IMAGE_REFS_BACKFILL_CHUNK_SIZE = int(
+    os.getenv("IMAGE_REFS_BACKFILL_CHUNK_SIZE", "1000")
+)
+
+# (owner table, owner type, {role: JSON array column})
+OWNERS = (
+    ("requests", "request", {"image": "image_ids"}),
+    (
+        "workorders",
+        "workorder",
+        {"image": "image_ids", "technician": "technician_images"},
+    ),
+)
+
+
+def _backfill(bind, table_name, owner_type, roles):
+    """One row per array element, reading the owners in keyset chunks"""
+    table = sa.table(
+        table_name,
+        sa.column("id", sa.String),
+        *(sa.column(column, sa.JSON) for column in roles.values()),
+    )
+    refs = sa.table(
+        "image_refs",
+        sa.column("owner_type", sa.String),
+        sa.column("owner_id", sa.String),
+        sa.column("role", sa.String),
+        sa.column("position", sa.Integer),
+        sa.column("image_id", sa.String),
+    )
+    last_id = ""
+    while True:
+        rows = bind.execute(
+            sa.select(table)
+            .where(table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(IMAGE_REFS_BACKFILL_CHUNK_SIZE)
+        ).mappings().all()
+        if not rows:
+            break
+        values = [
+            {
+                "owner_type": owner_type,
+                "owner_id": row["id"],
+                "role": role,
+                "position": position,
+                "image_id": image_id,
+            }
+            for row in rows
+            for role, column in roles.items()
+            for position, image_id in enumerate(row[column] or [])
+            if isinstance(image_id, str)
+        ]
+        if values:
+            bind.execute(refs.insert(), values)
+        last_id = rows[-1]["id"]
+
+
+def upgrade() -> None:
+    op.create_table('image_refs',
+    sa.Column('owner_type', sa.String(length=20), nullable=False),
+    sa.Column('owner_id', sa.String(length=50), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('image_id', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('owner_type', 'owner_id', 'role', 'position')
+    )
+    op.create_index('ix_image_refs_image_id', 'image_refs', ['image_id'], unique=False)
+
+    for table_name, owner_type, roles in OWNERS:
+        _backfill(op.get_bind(), table_name, owner_type, roles)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_image_refs_image_id', table_name='image_refs')
+    op.drop_table('image_refs')
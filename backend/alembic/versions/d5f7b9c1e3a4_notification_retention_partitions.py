@@ -0,0 +1,137 @@
+"""notification_retention_partitions
+
+Revision ID: d5f7b9c1e3a4
+Revises: c4e6a8b0d2f3
+Create Date: 2026-10-19 13:05:12.418306
+
+"""
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f7b9c1e3a4'
+down_revision = 'c4e6a8b0d2f3'
+branch_labels = None
+depends_on = None
+
+NOTIFICATION_COLUMNS = (
+    "id, type, work_order_id, work_order_title, message, message_key, "
+    "message_params, recipient_role, recipient_name, is_read, created_at, triggered_by"
+)
+NOTIFICATION_INDEXES = ['created_at', 'is_read', 'recipient_name', 'recipient_role', 'work_order_id']
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def upgrade() -> None:
+    op.create_table('notifications_archive',
+    sa.Column('id', sa.String(length=100), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('work_order_id', sa.String(length=50), nullable=False),
+    sa.Column('work_order_title', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('message_key', sa.String(length=64), nullable=True),
+    sa.Column('message_params', sa.JSON(), nullable=True),
+    sa.Column('recipient_role', sa.String(length=50), nullable=False),
+    sa.Column('recipient_name', sa.String(length=255), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('triggered_by', sa.String(length=255), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_archive_created_at'), 'notifications_archive', ['created_at'], unique=False)
+    op.create_index(op.f('ix_notifications_archive_work_order_id'), 'notifications_archive', ['work_order_id'], unique=False)
+
+    op.execute("UPDATE notifications SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+
+    if op.get_bind().dialect.name != 'postgresql':
+        # Batch mode: SQLite can't ALTER COLUMN, so the table is copied there
+        with op.batch_alter_table('notifications') as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+        return
+
+    # Rebuild notifications as a table range-partitioned by created_at month
+    for column in NOTIFICATION_INDEXES:
+        op.drop_index(f'ix_notifications_{column}', table_name='notifications')
+    op.rename_table('notifications', 'notifications_unpartitioned')
+    op.execute("ALTER TABLE notifications_unpartitioned RENAME CONSTRAINT notifications_pkey TO notifications_unpartitioned_pkey")
+    op.create_table('notifications',
+    sa.Column('id', sa.String(length=100), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('work_order_id', sa.String(length=50), nullable=False),
+    sa.Column('work_order_title', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('message_key', sa.String(length=64), nullable=True),
+    sa.Column('message_params', sa.JSON(), nullable=True),
+    sa.Column('recipient_role', sa.String(length=50), nullable=False),
+    sa.Column('recipient_name', sa.String(length=255), nullable=True),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('triggered_by', sa.String(length=255), nullable=False),
+    sa.PrimaryKeyConstraint('id', 'created_at'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    for column in NOTIFICATION_INDEXES:
+        op.create_index(f'ix_notifications_{column}', 'notifications', [column], unique=False)
+
+    # One partition per month from the oldest row to two months ahead
+    oldest = op.get_bind().execute(
+        sa.text("SELECT min(created_at)::date FROM notifications_unpartitioned")
+    ).scalar() or date.today()
+    month = oldest.replace(day=1)
+    last = _next_month(_next_month(date.today().replace(day=1)))
+    while month <= last:
+        upper = _next_month(month)
+        op.execute(
+            f"CREATE TABLE notifications_p{month:%Y%m} PARTITION OF notifications "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+
+    op.execute(
+        f"INSERT INTO notifications ({NOTIFICATION_COLUMNS}) "
+        f"SELECT {NOTIFICATION_COLUMNS} FROM notifications_unpartitioned"
+    )
+    op.drop_table('notifications_unpartitioned')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.rename_table('notifications', 'notifications_partitioned')
+        op.create_table('notifications',
+        sa.Column('id', sa.String(length=100), nullable=False),
+        sa.Column('type', sa.String(length=50), nullable=False),
+        sa.Column('work_order_id', sa.String(length=50), nullable=False),
+        sa.Column('work_order_title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=True),
+        sa.Column('message_key', sa.String(length=64), nullable=True),
+        sa.Column('message_params', sa.JSON(), nullable=True),
+        sa.Column('recipient_role', sa.String(length=50), nullable=False),
+        sa.Column('recipient_name', sa.String(length=255), nullable=True),
+        sa.Column('is_read', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('triggered_by', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id', name='notifications_unpartitioned_pkey')
+        )
+        op.execute(
+            f"INSERT INTO notifications ({NOTIFICATION_COLUMNS}) "
+            f"SELECT {NOTIFICATION_COLUMNS} FROM notifications_partitioned"
+        )
+        # Dropping the parent drops all of its partitions
+        op.drop_table('notifications_partitioned')
+        op.execute("ALTER TABLE notifications RENAME CONSTRAINT notifications_unpartitioned_pkey TO notifications_pkey")
+        for column in NOTIFICATION_INDEXES:
+            op.create_index(f'ix_notifications_{column}', 'notifications', [column], unique=False)
+    else:
+        with op.batch_alter_table('notifications') as batch_op:
+            batch_op.alter_column('created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
+
+    op.drop_index(op.f('ix_notifications_archive_work_order_id'), table_name='notifications_archive')
+    op.drop_index(op.f('ix_notifications_archive_created_at'), table_name='notifications_archive')
+    op.drop_table('notifications_archive')
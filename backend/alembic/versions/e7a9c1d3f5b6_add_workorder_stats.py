@@ -0,0 +1,39 @@
+"""add_workorder_stats
+
+Revision ID: e7a9c1d3f5b6
+Revises: d5f7b9c1e3a4
+Create Date: 2026-10-19 15:40:21.637204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a9c1d3f5b6'
+down_revision = 'd5f7b9c1e3a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('workorder_stats',
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('priority', sa.String(length=50), nullable=False),
+    sa.Column('assigned_to', sa.String(length=255), nullable=False),
+    sa.Column('due_date', sa.String(length=50), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('status', 'priority', 'assigned_to', 'due_date')
+    )
+    # Backfill; from here on the handlers keep the counts current
+    op.execute(
+        "INSERT INTO workorder_stats (status, priority, assigned_to, due_date, total) "
+        "SELECT COALESCE(status, ''), priority, COALESCE(assigned_to, ''), "
+        "COALESCE(due_date, ''), COUNT(*) FROM workorders "
+        "GROUP BY COALESCE(status, ''), priority, COALESCE(assigned_to, ''), "
+        "COALESCE(due_date, '')"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workorder_stats')
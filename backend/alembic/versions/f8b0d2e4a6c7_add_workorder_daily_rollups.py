@@ -0,0 +1,32 @@
+"""add_workorder_daily_rollups
+
+Revision ID: f8b0d2e4a6c7
+Revises: e7a9c1d3f5b6
+Create Date: 2026-10-19 16:52:08.215390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f8b0d2e4a6c7'
+down_revision = 'e7a9c1d3f5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # History is filled by: python -m utils.workorder_rollups backfill
+    op.create_table('workorder_daily_rollups',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('event', sa.String(length=20), nullable=False),
+    sa.Column('priority', sa.String(length=50), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'event', 'priority', 'location')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workorder_daily_rollups')
@@ -0,0 +1,145 @@
+"""
+GET /api/workorders: per-row models vs Core rows + TypeAdapter + bytes
+
+The "models" variant is the previous handler: ORM entities, one
+WorkOrder.model_validate() per row, then FastAPI validates the list again
+against response_model and encodes it with the stdlib json module. The
+"fast" variant is the current handler from routes.workorders (Core rows,
+one TypeAdapter(list[WorkOrder]) validation, pydantic-core JSON bytes).
+
+Both serve the same rows from a temporary SQLite database; the script also
+checks that the two bodies are byte-identical.
+
+Usage (from backend/):
+    python -m benchmarks.list_serialization_benchmark --rows 5000 --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import httpx
+from fastapi import Depends, FastAPI
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+from db import get_read_db  # noqa: E402
+from db.base import Base  # noqa: E402
+from db.models import WorkOrder as WorkOrderModel  # noqa: E402
+from routes.workorders import router as workorders_router  # noqa: E402
+from schemas import WorkOrder  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+
+def seed(url: str, rows: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(WorkOrderModel),
+            [
+                {
+                    "id": f"WO-bench-{i:06d}",
+                    "title": f"Pump {i} vibration",
+                    "description": "Bearing noise on the cooling water pump " * 3,
+                    "asset_name": f"PUMP-{i % 200:03d}",
+                    "location": "Plant 2, Line 4",
+                    "priority": ("Low", "Medium", "High", "Critical")[i % 4],
+                    "status": ("Open", "In Progress", "Pending", "Completed")[i % 4],
+                    "assigned_to": f"tech{i % 25}",
+                    "due_date": "2030-01-01",
+                    "created_at": now - timedelta(minutes=i),
+                    "image_ids": [f"IMG-{i}-1", f"IMG-{i}-2"],
+                    "technician_images": [],
+                    "location_data": {
+                        "latitude": 13.75,
+                        "longitude": 100.5,
+                        "address": "Bangkok",
+                        "googleMapsUrl": "https://maps.example/?q=13.75,100.5",
+                    },
+                    "approved_at": now if i % 4 == 3 else None,
+                }
+                for i in range(rows)
+            ],
+        )
+    engine.dispose()
+
+
+def build_app(url: str, fast: bool) -> FastAPI:
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://", 1))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.state.engine = engine
+    if fast:
+        app.include_router(workorders_router)
+        app.dependency_overrides[get_read_db] = get_db
+        return app
+
+    @app.get("/api/workorders", response_model=List[WorkOrder])
+    async def list_workorders(db: AsyncSession = Depends(get_db)):
+        workorders = (
+            await db.scalars(
+                select(WorkOrderModel).order_by(WorkOrderModel.created_at.desc())
+            )
+        ).all()
+        return [WorkOrder.model_validate(wo) for wo in workorders]
+
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    timings = []
+    body = b""
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm-up (statement cache, validator build)
+        (await client.get("/api/workorders")).raise_for_status()
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = await client.get("/api/workorders")
+            response.raise_for_status()
+            timings.append(time.perf_counter() - started)
+            body = response.content
+    await app.state.engine.dispose()
+    timings.sort()
+    return timings, body
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.environ["DATABASE_URL"]
+    seed(url, args.rows)
+
+    bodies = {}
+    for name, fast in (("models", False), ("fast", True)):
+        timings, bodies[name] = await run(build_app(url, fast), args.requests)
+        print(
+            f"{name:>7}: p50 {timings[len(timings) // 2] * 1000:8.1f} ms  "
+            f"min {timings[0] * 1000:8.1f} ms  "
+            f"({args.rows} rows, {len(bodies[name]) / 1e6:.1f} MB)"
+        )
+    print("identical bodies:", bodies["models"] == bodies["fast"])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
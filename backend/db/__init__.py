@@ -1,15 +1,52 @@
 from db.base import Base
-from db.session import engine, SessionLocal, get_db, init_db
-from db.models import Request, WorkOrder, Image, Notification
+from db.session import (
+    engine,
+    SessionLocal,
+    async_engine,
+    AsyncSessionLocal,
+    get_db,
+    get_sync_db,
+    init_db,
+)
+from db.replicas import get_read_db, replica_set
+from db.models import (
+    Request,
+    WorkOrder,
+    WorkOrderStat,
+    WorkOrderDailyRollup,
+    WorkOrderEvent,
+    DateValueReject,
+    Image,
+    ImageRef,
+    Notification,
+    NotificationArchive,
+    NotificationOutbox,
+    NotificationRead,
+    NotificationTemplate,
+)
 
 __all__ = [
     "Base",
     "engine",
     "SessionLocal",
+    "async_engine",
+    "AsyncSessionLocal",
     "get_db",
+    "get_sync_db",
+    "get_read_db",
+    "replica_set",
     "init_db",
     "Request",
     "WorkOrder",
+    "WorkOrderStat",
+    "WorkOrderDailyRollup",
+    "WorkOrderEvent",
+    "DateValueReject",
     "Image",
+    "ImageRef",
     "Notification",
+    "NotificationArchive",
+    "NotificationOutbox",
+    "NotificationRead",
+    "NotificationTemplate",
 ]
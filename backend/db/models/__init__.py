@@ -1,15 +1,33 @@
 from db.base import Base
 from db.models.request import Request
 from db.models.workorder import WorkOrder
+from db.models.workorder_stat import WorkOrderStat
+from db.models.workorder_daily_rollup import WorkOrderDailyRollup
+from db.models.workorder_event import WorkOrderEvent
+from db.models.date_value_reject import DateValueReject
 from db.models.image import Image
+from db.models.image_ref import ImageRef
 from db.models.notification import Notification
+from db.models.notification_archive import NotificationArchive
+from db.models.notification_outbox import NotificationOutbox
+from db.models.notification_read import NotificationRead
+from db.models.notification_template import NotificationTemplate
 
 __all__ = [
     "Base",
     "Request",
     "WorkOrder",
+    "WorkOrderStat",
+    "WorkOrderDailyRollup",
+    "WorkOrderEvent",
+    "DateValueReject",
     "Image",
+    "ImageRef",
     "Notification",
+    "NotificationArchive",
+    "NotificationOutbox",
+    "NotificationRead",
+    "NotificationTemplate",
 ]
 
 
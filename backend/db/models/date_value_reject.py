@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class DateValueReject(Base):
+    """
+    Date strings that didn't parse as YYYY-MM-DD when the date columns were
+    converted to DATE; the column was set to NULL and the value kept here.
+    """
+
+    __tablename__ = "date_value_rejects"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(50), nullable=False)
+    column_name = Column(String(50), nullable=False)
+    row_id = Column(String(50), nullable=False)
+    value = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
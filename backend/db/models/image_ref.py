@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Index, Integer, String
+
+from db.base import Base
+
+
+class ImageRef(Base):
+    """
+    One image reference of a request or work order, mirroring the JSON
+    arrays (image_ids, technician_images) so lookups by owner or by image
+    are index scans.
+    """
+
+    __tablename__ = "image_refs"
+
+    owner_type = Column(String(20), primary_key=True)  # "request" or "workorder"
+    owner_id = Column(String(50), primary_key=True)
+    role = Column(String(20), primary_key=True)  # "image" or "technician"
+    position = Column(Integer, primary_key=True)  # Index in the JSON array
+    image_id = Column(String(50), nullable=False)
+
+    __table_args__ = (Index("ix_image_refs_image_id", "image_id"),)
@@ -1,19 +1,45 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, String, Text, DateTime, Boolean, JSON, PrimaryKeyConstraint
 from sqlalchemy.sql import func
 
 from db.base import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Notification(Base):
     __tablename__ = "notifications"
+    # On PostgreSQL the table is range-partitioned by created_at month so
+    # expired months can be dropped (see utils/notification_retention.py).
+    # A partitioned table's primary key must include the partition key; the
+    # ORM still identifies rows by id alone.
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
-    id = Column(String(100), primary_key=True)
+    id = Column(String(100), nullable=False)
     type = Column(String(50), nullable=False)
     work_order_id = Column(String(50), nullable=False, index=True)
     work_order_title = Column(String(255), nullable=False)
-    message = Column(Text, nullable=False)
+    # Legacy pre-rendered text; new rows store message_key + message_params
+    # and are rendered per locale when read
+    message = Column(Text, nullable=True)
+    message_key = Column(String(64), nullable=True)
+    message_params = Column(JSON, nullable=True)
     recipient_role = Column(String(50), nullable=False, index=True)
     recipient_name = Column(String(255), nullable=True, index=True)
     is_read = Column(Boolean, default=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=_utcnow,
+        server_default=func.now(),
+        index=True,
+    )
     triggered_by = Column(String(255), nullable=False)
+
+    __mapper_args__ = {"primary_key": [id]}
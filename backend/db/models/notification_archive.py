@@ -0,0 +1,24 @@
+from sqlalchemy import JSON, Boolean, Column, DateTime, String, Text
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class NotificationArchive(Base):
+    """Unread notifications moved out of the hot notifications table by retention"""
+
+    __tablename__ = "notifications_archive"
+
+    id = Column(String(100), primary_key=True)
+    type = Column(String(50), nullable=False)
+    work_order_id = Column(String(50), nullable=False, index=True)
+    work_order_title = Column(String(255), nullable=False)
+    message = Column(Text, nullable=True)
+    message_key = Column(String(64), nullable=True)
+    message_params = Column(JSON, nullable=True)
+    recipient_role = Column(String(50), nullable=False)
+    recipient_name = Column(String(255), nullable=True)
+    is_read = Column(Boolean, default=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    triggered_by = Column(String(255), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
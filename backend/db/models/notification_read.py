@@ -0,0 +1,18 @@
+from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy.sql import func
+
+from db.base import Base
+
+
+class NotificationRead(Base):
+    """Per-user read receipt for role-broadcast notifications (recipient_name IS NULL)"""
+
+    __tablename__ = "notification_reads"
+
+    # The composite primary key doubles as the index for the "unread for me"
+    # anti-join: NOT EXISTS (... WHERE notification_id = n.id AND user_name = :me)
+    notification_id = Column(String(100), primary_key=True)
+    user_name = Column(String(255), primary_key=True)
+    read_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set when the user clears read notifications; the broadcast row stays for others
+    dismissed = Column(Boolean, nullable=False, default=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, Text
+
+from db.base import Base
+
+
+class NotificationTemplate(Base):
+    """Per-locale notification text, overriding the built-in defaults"""
+
+    __tablename__ = "notification_templates"
+
+    key = Column(String(64), primary_key=True)
+    locale = Column(String(8), primary_key=True)
+    body = Column(Text, nullable=False)
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, String, Text, DateTime, JSON, Boolean
+from sqlalchemy import Column, Date, String, Text, DateTime, JSON, Boolean
 from sqlalchemy.sql import func
 
 from db.base import Base
+from db.types import CodedString
+from utils.workflow_rules import PRIORITY_CODES, STATUS_CODES
 
 
 class WorkOrder(Base):
@@ -12,10 +14,10 @@ class WorkOrder(Base):
     description = Column(Text, nullable=False)
     asset_name = Column(String(255), nullable=False)
     location = Column(String(255), nullable=False)
-    priority = Column(String(50), nullable=False, index=True)
-    status = Column(String(50), default="Open", index=True)
+    priority = Column(CodedString(PRIORITY_CODES), nullable=False, index=True)
+    status = Column(CodedString(STATUS_CODES), default="Open", index=True)
     assigned_to = Column(String(255), nullable=True, index=True)
-    due_date = Column(String(50), nullable=True, index=True)
+    due_date = Column(Date, nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     image_ids = Column(JSON, default=list)
     request_id = Column(String(50), nullable=True)
@@ -25,8 +27,8 @@ class WorkOrder(Base):
     admin_review = Column(Text, nullable=True)
     location_data = Column(JSON, nullable=True)
     preferred_date = Column(
-        String(50), nullable=True
-    )  # Preferred maintenance date from request (YYYY-MM-DD)
+        Date, nullable=True, index=True
+    )  # Preferred maintenance date from request
     approved_by = Column(String(255), nullable=True)
     approved_at = Column(DateTime(timezone=True), nullable=True)
     rejected_by = Column(String(255), nullable=True)
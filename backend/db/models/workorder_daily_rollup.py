@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, Integer, String
+
+from db.base import Base
+
+
+class WorkOrderDailyRollup(Base):
+    """
+    Workflow events per day, priority and location (created, completed,
+    closed, canceled, deleted) for trend charts; see utils/workorder_rollups.py.
+    """
+
+    __tablename__ = "workorder_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    event = Column(String(20), primary_key=True)
+    priority = Column(String(50), primary_key=True)
+    location = Column(String(255), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from db.base import Base
+
+
+class WorkOrderEvent(Base):
+    """
+    Append-only status history: one row per status change (from_status is
+    NULL when the work order is created), written in the same transaction.
+    """
+
+    __tablename__ = "workorder_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    work_order_id = Column(String(50), nullable=False)
+    from_status = Column(String(50), nullable=True)
+    to_status = Column(String(50), nullable=False)
+    at = Column(DateTime(timezone=True), nullable=False)
+    actor = Column(String(255), nullable=True)
+    # Technician and asset at the time of the change, for per-group analytics
+    assigned_to = Column(String(255), nullable=True)
+    asset_name = Column(String(255), nullable=True)
+    reason = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_workorder_events_work_order_id_at", "work_order_id", "at"),
+        Index("ix_workorder_events_to_status_at", "to_status", "at"),
+    )
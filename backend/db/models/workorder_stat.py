@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String
+
+from db.base import Base
+
+
+class WorkOrderStat(Base):
+    """
+    Work order counts per (status, priority, technician, due date), kept
+    current by the handlers that write work orders (utils/workorder_stats.py).
+    Missing values are stored as "" so they can be part of the primary key.
+    """
+
+    __tablename__ = "workorder_stats"
+
+    status = Column(String(50), primary_key=True)
+    priority = Column(String(50), primary_key=True)
+    assigned_to = Column(String(255), primary_key=True)
+    due_date = Column(String(50), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,201 @@
+"""
+Connection pool settings and metrics
+
+Pool sizing comes from the environment:
+- DB_POOL_SIZE (default 5), DB_MAX_OVERFLOW (default 10)
+- DB_POOL_TIMEOUT seconds to wait for a connection (default 30)
+- DB_POOL_PRE_PING 1/0 (default 1), DB_POOL_RECYCLE seconds (default 300)
+
+Each engine's pool records checkout wait time, overflow checkouts and
+checkout timeouts; pool event listeners track connects, checkouts and
+checkins. Snapshots are served by GET /api/metrics/db-pool.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Counters and checkout wait samples for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Optional[Engine] = None
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _percentile(self, samples, fraction: float) -> float:
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+    @property
+    def pool(self) -> Optional[Pool]:
+        # engine.dispose() swaps in a new pool, so always ask the engine
+        return self.engine.pool if self.engine is not None else None
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "overflowCheckouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+            }
+            wait_total, wait_max = self.wait_total, self.wait_max
+
+        gauges = {"size": None, "inUse": None, "idle": None, "overflow": None}
+        if isinstance(pool, QueuePool):
+            gauges = {
+                "size": pool.size(),
+                "inUse": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return {
+            "name": self.name,
+            "pool": type(pool).__name__ if pool is not None else None,
+            **gauges,
+            **counters,
+            "checkoutWaitMs": {
+                "avg": (wait_total / counters["checkouts"] * 1000)
+                if counters["checkouts"]
+                else 0.0,
+                "p50": self._percentile(waits, 0.5) * 1000,
+                "p95": self._percentile(waits, 0.95) * 1000,
+                "max": wait_max * 1000,
+            },
+        }
+
+
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+# QueuePool._do_get() retries by calling itself; only time the outer call
+_in_checkout: ContextVar[bool] = ContextVar("_in_checkout", default=False)
+
+
+def _timed_pool_class(base: Type[QueuePool], metrics: PoolMetrics) -> Type[QueuePool]:
+    """
+    Subclass of a QueuePool that times how long a checkout waits for a
+    connection. Pool.recreate() instantiates self.__class__, so the timing
+    survives engine.dispose().
+    """
+
+    class TimedPool(base):
+        def _do_get(self):
+            if _in_checkout.get():
+                return super()._do_get()
+            token = _in_checkout.set(True)
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            finally:
+                metrics.record_wait(time.perf_counter() - started)
+                _in_checkout.reset(token)
+
+    TimedPool.__name__ = base.__name__
+    TimedPool.__qualname__ = base.__qualname__
+    return TimedPool
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    """
+    create_engine() / create_async_engine() keyword arguments for url.
+
+    In-memory SQLite uses a single shared connection, so it keeps its default
+    pool and only the listeners are attached.
+    """
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if _is_memory_sqlite(url):
+        return options
+
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    options.update(
+        poolclass=_timed_pool_class(base, metrics),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def instrument_pool(engine: Engine, name: str) -> PoolMetrics:
+    """Attach pool event listeners to a (sync) engine; returns its metrics"""
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+    metrics.engine = engine
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool = engine.pool
+        with metrics._lock:
+            metrics.checkouts += 1
+            if isinstance(pool, QueuePool) and pool.overflow() > 0:
+                metrics.overflow_checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.checkins += 1
+
+    return metrics
+
+
+def pool_metrics() -> list:
+    """Snapshot of every instrumented pool"""
+    return [metrics.snapshot() for metrics in POOL_METRICS.values()]
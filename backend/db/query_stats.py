@@ -0,0 +1,139 @@
+"""
+Per-request SQL statistics
+
+Cursor execute hooks on every engine attribute each statement and its
+duration to the request being served (a ContextVar set by
+QueryStatsMiddleware; SQLAlchemy's async greenlets and run_in_threadpool
+both carry the context along). The middleware reports the totals in a
+Server-Timing header and a structured log line.
+
+A statement shape (the SQL with whitespace and IN lists normalized) that
+runs more than SQL_N_PLUS_ONE_THRESHOLD times in one request is flagged as
+a likely N+1.
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+SQL_STATS_LOG = os.getenv("SQL_STATS_LOG", "1") == "1"
+
+_WHITESPACE = re.compile(r"\s+")
+# "IN (?, ?, ?)" / "IN (%(id_1_1)s, %(id_1_2)s)" -> "IN (...)"
+_IN_LIST = re.compile(r"\bIN \((?:[^()]*?,\s*)*[^()]*?\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace, IN lists and literals normalized"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("IN (...)", shape)
+    return _LITERAL.sub("?", shape)
+
+
+class RequestQueryStats:
+    """Statements run while serving one request"""
+
+    def __init__(
+        self, method: str = "", path: str = "", scope: Optional[dict] = None
+    ):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        # The ASGI scope; the router adds the matched route to it
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self.shape_durations: Dict[str, float] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = statement_shape(statement)
+        self.count += 1
+        self.duration += duration
+        self.shapes[shape] += 1
+        self.shape_durations[shape] = self.shape_durations.get(shape, 0.0) + duration
+
+    def n_plus_one(self, threshold: Optional[int] = None) -> List[dict]:
+        """Statement shapes repeated more than threshold times"""
+        threshold = SQL_N_PLUS_ONE_THRESHOLD if threshold is None else threshold
+        return [
+            {
+                "statement": shape,
+                "count": count,
+                "durationMs": round(self.shape_durations[shape] * 1000, 2),
+            }
+            for shape, count in self.shapes.most_common()
+            if count > threshold
+        ]
+
+    def current_route(self) -> str:
+        """Route template once the request has been routed, else the path"""
+        route = getattr((self.scope or {}).get("route"), "path", None)
+        return self.route or route or self.path
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+    def as_log_record(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "queries": self.count,
+            "dbMs": round(self.duration * 1000, 2),
+            "nPlusOne": self.n_plus_one(),
+        }
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+# Called with the stats of every finished request (used by the pytest
+# query_budget helper)
+REQUEST_STATS_HOOKS: List[Callable[[RequestQueryStats], None]] = []
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def start_request(method: str, path: str, scope: Optional[dict] = None):
+    """Begin collecting for a request; returns the token for end_request()"""
+    return _current.set(RequestQueryStats(method, path, scope))
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def instrument_queries(engine: Engine) -> None:
+    """Attach the cursor execute hooks to a (sync) engine"""
+    if getattr(engine, "_query_stats_instrumented", False):
+        return
+    engine._query_stats_instrumented = True
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,180 @@
+"""
+Read-replica routing
+
+With DATABASE_REPLICA_URLS (comma separated sync URLs, rewritten for the
+async driver like DATABASE_URL) read-only routes use get_read_db, which hands
+out sessions on the replicas round-robin. Replicas are health-checked in the
+background every REPLICA_HEALTH_CHECK_SECONDS; an unhealthy replica is
+skipped, and with no healthy replica reads go to the primary.
+
+Read-your-writes: after a successful write the RecentWriteMiddleware marks the
+client with a short-lived cookie (and X-Recent-Write response header, for
+clients that don't send cookies cross-origin). While the marker is valid the
+client's reads go to the primary, so replica lag can't hide its own write.
+"""
+
+import asyncio
+import itertools
+import os
+import time
+from typing import AsyncGenerator, List, Optional
+
+from fastapi import Depends, Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from db.pool import engine_options, instrument_pool
+from db.query_stats import instrument_queries
+from db.session import engine as primary_engine
+from db.session import get_db, to_async_url
+from db.slow_queries import slow_query_log
+
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+REPLICA_HEALTH_TIMEOUT_SECONDS = float(os.getenv("REPLICA_HEALTH_TIMEOUT_SECONDS", "2"))
+RECENT_WRITE_SECONDS = int(os.getenv("RECENT_WRITE_SECONDS", "5"))
+
+RECENT_WRITE_COOKIE = "eureka_recent_write"
+RECENT_WRITE_HEADER = "X-Recent-Write"
+
+
+class Replica:
+    """One read replica: its engine, session factory and health state"""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.session_factory = async_sessionmaker(
+            engine, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = True
+
+    async def check(self, timeout: float = REPLICA_HEALTH_TIMEOUT_SECONDS) -> bool:
+        try:
+            async with asyncio.timeout(timeout):
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            if self.healthy:
+                print(f"[Replicas] {self.name} marked unhealthy: {e}")
+            self.healthy = False
+        else:
+            if not self.healthy:
+                print(f"[Replicas] {self.name} is healthy again")
+            self.healthy = True
+        return self.healthy
+
+
+class ReplicaSet:
+    """Round-robin over healthy replicas with periodic background health checks"""
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        health_check_seconds: float = REPLICA_HEALTH_CHECK_SECONDS,
+    ):
+        self.replicas = replicas
+        self.health_check_seconds = health_check_seconds
+        self._counter = itertools.count()
+        self._last_check = time.monotonic()
+        self._check_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_urls(cls, urls: List[str], **kwargs) -> "ReplicaSet":
+        replicas = []
+        for index, url in enumerate(urls):
+            name = f"replica-{index + 1}"
+            engine = create_async_engine(
+                to_async_url(url), **engine_options(url, name, is_async=True)
+            )
+            instrument_pool(engine.sync_engine, name)
+            instrument_queries(engine.sync_engine)
+            # Replicas share the primary's schema and indexes
+            slow_query_log.instrument(engine.sync_engine, explain_engine=primary_engine)
+            replicas.append(Replica(name, engine))
+        return cls(replicas, **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    async def check_all(self) -> None:
+        await asyncio.gather(*(replica.check() for replica in self.replicas))
+
+    def _schedule_health_check(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.health_check_seconds:
+            return
+        if self._check_task is not None and not self._check_task.done():
+            return
+        self._last_check = now
+        self._check_task = asyncio.create_task(self.check_all())
+
+    def pick(self) -> Optional[Replica]:
+        """Next healthy replica, or None when all are down"""
+        self._schedule_health_check()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._counter) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    async def dispose(self) -> None:
+        if self._check_task is not None:
+            self._check_task.cancel()
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_set = ReplicaSet.from_urls(DATABASE_REPLICA_URLS)
+
+
+def recent_write_marker() -> str:
+    """Marker value: epoch milliseconds until which the client is pinned"""
+    return str(int((time.time() + RECENT_WRITE_SECONDS) * 1000))
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """
+    True while the client's recent-write marker has not expired. A marker
+    further ahead than RECENT_WRITE_SECONDS wasn't issued by us and is
+    ignored, so a client can't pin itself to the primary for good.
+    """
+    marker = request.headers.get(RECENT_WRITE_HEADER) or request.cookies.get(
+        RECENT_WRITE_COOKIE
+    )
+    if marker is None:
+        return False
+    try:
+        until = int(marker)
+    except ValueError:
+        return False
+    now = time.time() * 1000
+    return now < until <= now + RECENT_WRITE_SECONDS * 1000
+
+
+async def get_read_db(
+    request: Request, primary: AsyncSession = Depends(get_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Session for read-only routes: a replica when one is configured, healthy
+    and the client has no recent write; otherwise the primary session.
+    """
+    replica = None
+    if replica_set.enabled and not is_pinned_to_primary(request):
+        replica = replica_set.pick()
+    if replica is None:
+        yield primary
+        return
+    async with replica.session_factory() as db:
+        db.info["replica"] = replica.name
+        yield db
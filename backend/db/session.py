@@ -1,9 +1,15 @@
 import os
+from datetime import date
 from pathlib import Path
 
 from db.base import Base
+from db.pool import engine_options, instrument_pool
+from db.query_stats import instrument_queries
+from db.slow_queries import slow_query_log
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 # Load .env file from project root
@@ -17,17 +23,60 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_recycle=300,
-    pool_pre_ping=True,
-)
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Rewrite a sync DATABASE_URL for the async driver of the same database
+    (postgresql -> postgresql+asyncpg, sqlite -> sqlite+aiosqlite).
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return url
+    parsed = parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        # asyncpg calls it "ssl"
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+# Sync engine: Alembic, init_db and the background jobs (run in threads)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, "primary"))
+instrument_pool(engine, "primary")
+instrument_queries(engine)
+slow_query_log.instrument(engine, explain_engine=engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine: request handlers, so a slow query never blocks the event loop
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    **engine_options(DATABASE_URL, "primary-async", is_async=True),
+)
+instrument_pool(async_engine.sync_engine, "primary-async")
+instrument_queries(async_engine.sync_engine)
+slow_query_log.instrument(async_engine.sync_engine, explain_engine=engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_db():
+    """Yield an AsyncSession for FastAPI dependencies."""
+    async with AsyncSessionLocal() as db:
+        yield db
 
-def get_db():
-    """Yield a database session for FastAPI dependencies."""
+
+def get_sync_db():
+    """
+    Yield a sync Session for handlers that hand blocking work (reminder scan)
+    to a thread.
+    """
     db = SessionLocal()
     try:
         yield db
@@ -48,6 +97,21 @@ def init_db():
     Base.metadata.create_all(bind=engine)
     print("[Database] Tables created successfully")
 
+    # create_all makes image_refs empty on an existing database; fill it from
+    # the JSON arrays so image GC doesn't see every image as unreferenced
+    from utils.image_refs import backfill_image_refs
+
+    backfill_image_refs(engine)
+
+    # A partitioned notifications table needs a partition for the current month
+    # before the first insert (PostgreSQL only)
+    from utils.notification_retention import ensure_partitions, is_partitioned
+
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            ensure_partitions(conn, date.today())
+            print("[Database] Notification partitions ensured")
+
     # Ensure images table has base64_data column (for existing databases)
     try:
         with engine.connect() as conn:
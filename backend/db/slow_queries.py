@@ -0,0 +1,289 @@
+"""
+Slow-query log with EXPLAIN capture
+
+Statements slower than SLOW_QUERY_MS (default 500, 0 disables) are logged
+with their SQL, the shape of the bound parameters (types only, never values)
+and the route being served. The statement is then EXPLAINed on a background
+thread through a sync engine (EXPLAIN on PostgreSQL, EXPLAIN QUERY PLAN on
+SQLite; never ANALYZE, so nothing is executed twice) and the plan is kept
+per statement fingerprint for GET /api/metrics/slow-queries.
+
+EXPLAIN runs at most once per fingerprint every
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS and at most
+SLOW_QUERY_EXPLAINS_PER_MINUTE times a minute overall.
+"""
+
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from db.query_stats import current_stats, statement_shape
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "1") == "1"
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(
+    os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "3600")
+)
+SLOW_QUERY_EXPLAINS_PER_MINUTE = int(
+    os.getenv("SLOW_QUERY_EXPLAINS_PER_MINUTE", "10")
+)
+
+EXPLAIN_PREFIXES = {"postgresql": "EXPLAIN", "sqlite": "EXPLAIN QUERY PLAN"}
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+# Pending EXPLAINs beyond this are dropped rather than queued
+EXPLAIN_QUEUE_SIZE = 100
+# Parameters listed individually (long IN lists are summarized)
+MAX_PARAMETERS = 20
+# Fingerprints kept (least recently seen are evicted) and routes per fingerprint
+MAX_ENTRIES = 500
+MAX_ROUTES = 10
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN <statement>, compiled for the engine it runs on"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: ClauseElement, prefix: str):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return f"{element.prefix} {compiler.process(element.statement, **kw)}"
+
+
+def fingerprint(statement: str) -> str:
+    """Short stable id for a statement shape"""
+    return hashlib.sha1(statement_shape(statement).encode()).hexdigest()[:16]
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Bound parameter types, e.g. {"id_1": "str"} or ["str", "int"]"""
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "row": parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        shape = [type(value).__name__ for value in parameters[:MAX_PARAMETERS]]
+        if len(parameters) > MAX_PARAMETERS:
+            shape.append(f"...+{len(parameters) - MAX_PARAMETERS}")
+        return shape
+    return None
+
+
+class SlowQueryLog:
+    """Logs slow statements and collects their plans"""
+
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_MS,
+        explain: bool = SLOW_QUERY_EXPLAIN,
+        explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+        explains_per_minute: int = SLOW_QUERY_EXPLAINS_PER_MINUTE,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self.explains_per_minute = explains_per_minute
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._last_explain: Dict[str, float] = {}
+        self._recent_explains: deque = deque()
+        self._queue: "queue.Queue" = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def instrument(
+        self, engine: Engine, explain_engine: Optional[Engine] = None
+    ) -> None:
+        """
+        Time the statements of a (sync) engine. Plans are taken on
+        explain_engine, a sync engine for the same database (async engines
+        can't run outside their event loop).
+        """
+        if not self.enabled:
+            return
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            duration = time.perf_counter() - conn.info["slow_query_start"].pop()
+            if duration < self.threshold:
+                return
+            # The EXPLAINs themselves are run with slow_query_log=False
+            if context is None or context.execution_options.get("slow_query_log", True):
+                self.record(
+                    statement,
+                    parameters,
+                    executemany,
+                    duration,
+                    context,
+                    explain_engine,
+                )
+
+        @event.listens_for(engine, "handle_error")
+        def _error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("slow_query_start"):
+                conn.info["slow_query_start"].pop()
+
+    def record(
+        self,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+        context=None,
+        explain_engine: Optional[Engine] = None,
+    ) -> None:
+        stats = current_stats()
+        key = fingerprint(statement)
+        record = {
+            "fingerprint": key,
+            "statement": " ".join(statement.split()),
+            "parameters": parameter_shape(parameters, executemany),
+            "durationMs": round(duration * 1000, 2),
+            "method": stats.method if stats is not None else None,
+            "route": stats.current_route() if stats is not None else None,
+        }
+        print(f"[SlowQuery] {json.dumps(record)}")
+        explainable = self._explainable(statement, context, explain_engine)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= MAX_ENTRIES:
+                    oldest = min(self._entries.values(), key=lambda e: e["lastSeen"])
+                    del self._entries[oldest["fingerprint"]]
+                    self._last_explain.pop(oldest["fingerprint"], None)
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": statement_shape(statement),
+                    "count": 0,
+                    "maxMs": 0.0,
+                    "routes": [],
+                    "plan": None,
+                    "explainedAt": None,
+                }
+            entry["count"] += 1
+            entry["maxMs"] = max(entry["maxMs"], record["durationMs"])
+            entry["lastMs"] = record["durationMs"]
+            entry["lastSeen"] = time.time()
+            routes = entry["routes"]
+            route = record["route"]
+            if route and route not in routes and len(routes) < MAX_ROUTES:
+                routes.append(route)
+            should_explain = explainable and self._claim_explain(key)
+
+        if should_explain:
+            self._enqueue_explain(key, context, explain_engine)
+
+    def _claim_explain(self, key: str) -> bool:
+        """Dedupe per fingerprint and rate-limit overall (caller holds the lock)"""
+        now = time.monotonic()
+        last = self._last_explain.get(key)
+        if last is not None and now - last < self.explain_interval:
+            return False
+        while self._recent_explains and now - self._recent_explains[0] > 60:
+            self._recent_explains.popleft()
+        if len(self._recent_explains) >= self.explains_per_minute:
+            return False
+        self._last_explain[key] = now
+        self._recent_explains.append(now)
+        return True
+
+    def _explainable(self, statement: str, context, explain_engine) -> bool:
+        """Only compiled DML/SELECT statements on a dialect with EXPLAIN"""
+        compiled = getattr(context, "compiled", None)
+        return (
+            self.explain
+            and explain_engine is not None
+            and explain_engine.dialect.name in EXPLAIN_PREFIXES
+            and compiled is not None
+            and isinstance(compiled.statement, ClauseElement)
+            and statement.lstrip().upper().startswith(EXPLAINABLE)
+        )
+
+    def _enqueue_explain(self, key: str, context, explain_engine: Engine) -> None:
+        # Bound values before type processing; Explain re-binds them by name
+        parameters = (
+            dict(context.compiled_parameters[0]) if context.compiled_parameters else {}
+        )
+        job = (key, context.compiled.statement, parameters, explain_engine)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            return
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="slow-query-explain", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            key, statement, parameters, explain_engine = self._queue.get()
+            try:
+                plan = self._explain(statement, parameters, explain_engine)
+            except Exception as e:
+                print(f"[SlowQuery] EXPLAIN failed for {key}: {e}")
+                plan = None
+            if plan is not None:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        entry["plan"] = plan
+                        entry["explainedAt"] = time.time()
+                print(f"[SlowQuery] Plan for {key}:\n" + "\n".join(plan))
+            self._queue.task_done()
+
+    def _explain(
+        self, statement: ClauseElement, parameters: dict, explain_engine: Engine
+    ) -> List[str]:
+        prefix = EXPLAIN_PREFIXES[explain_engine.dialect.name]
+        with explain_engine.connect() as conn:
+            rows = conn.execute(
+                Explain(statement, prefix),
+                parameters,
+                execution_options={"slow_query_log": False},
+            ).all()
+        # PostgreSQL: one "QUERY PLAN" column; SQLite: (id, parent, notused, detail)
+        return [str(row[-1]) for row in rows]
+
+    def wait_for_explains(self) -> None:
+        """Block until queued EXPLAINs have finished (tests)"""
+        self._queue.join()
+
+    def entries(self) -> List[dict]:
+        """Slow statements, slowest first"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+        return sorted(entries, key=lambda entry: entry["maxMs"], reverse=True)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,44 @@
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+
+class CodedString(TypeDecorator):
+    """
+    A string from a fixed set, stored as a SMALLINT code.
+
+    Python code and the API keep working with the strings: values are
+    encoded when bound (inserts, updates, ==, IN) and decoded when loaded.
+    ORDER BY sorts by code, so codes are assigned in the order that sorting
+    should follow.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes: Mapping[str, int]):
+        super().__init__()
+        # A tuple, so the type can be part of SQLAlchemy's statement cache key
+        self.codes = tuple(codes.items())
+        self._encode = dict(self.codes)
+        self._decode = {code: value for value, code in self.codes}
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[int]:
+        if value is None:
+            return None
+        try:
+            return self._encode[value]
+        except KeyError:
+            raise ValueError(
+                f"{value!r} is not one of {', '.join(self._encode)}"
+            ) from None
+
+    def process_literal_param(self, value: Any, dialect) -> str:
+        return "NULL" if value is None else str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[str]:
+        return None if value is None else self._decode[value]
+
+    def copy(self, **kw) -> "CodedString":
+        return CodedString(dict(self.codes))
@@ -0,0 +1,33 @@
+from typing import Iterable, Union
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Engine
+
+
+def dialect_insert(bind: Union[Engine, Connection], table: Table):
+    """INSERT construct supporting ON CONFLICT for the bind's dialect"""
+    dialect = bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT inserts not supported for {dialect}")
+    return insert(table)
+
+
+def increment(
+    bind: Union[Engine, Connection],
+    table: Table,
+    keys: Iterable[str],
+    column: str = "total",
+):
+    """
+    INSERT ... ON CONFLICT (keys) DO UPDATE SET column = column + excluded.column:
+    executed with one row per key, adds each row's value to the stored count.
+    """
+    insert = dialect_insert(bind, table)
+    return insert.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + insert.excluded[column]},
+    )
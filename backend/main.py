@@ -2,18 +2,35 @@ import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 
-from db import init_db
+from db import SessionLocal, async_engine, engine, init_db, replica_set
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from middleware import (
+    CompressionMiddleware,
+    HttpMetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    RecentWriteMiddleware,
+)
 from routes import (
     images_router,
+    metrics_router,
     notifications_router,
+    prometheus_router,
     requests_router,
+    stats_router,
     workorders_router,
 )
 
 from utils import PICTURES_DIR
+from utils.notification_retention import (
+    NOTIFICATION_RETENTION_ENABLED,
+    NotificationRetentionJob,
+)
+from utils.outbox import OUTBOX_CHANNELS, OutboxDispatcher
+from utils.profiler import PROFILE_DIR, PROFILING_ENABLED
+from utils.scheduler import REMINDER_SCHEDULER_ENABLED, ReminderScheduler
 
 SHOULD_INIT_DB = os.getenv("INIT_DB_WITH_METADATA", "1") == "1"
 
@@ -28,7 +45,26 @@ async def lifespan(app: FastAPI):
         print(
             "[Startup] Skipping database initialization. Using Alembic migrations instead."
         )
+
+    jobs = []
+    if REMINDER_SCHEDULER_ENABLED:
+        jobs.append(ReminderScheduler(SessionLocal, engine))
+        print("[Startup] Reminder scheduler started")
+    if OUTBOX_CHANNELS:
+        jobs.append(OutboxDispatcher(SessionLocal, engine))
+        print(f"[Startup] Notification outbox dispatcher started: {OUTBOX_CHANNELS}")
+    if NOTIFICATION_RETENTION_ENABLED:
+        jobs.append(NotificationRetentionJob(SessionLocal, engine))
+        print("[Startup] Notification retention job started")
+    for job in jobs:
+        job.start()
+
     yield
+
+    for job in jobs:
+        await job.stop()
+    await async_engine.dispose()
+    await replica_set.dispose()
     print("[Shutdown] Application shutting down...")
 
 
@@ -39,6 +75,13 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.add_middleware(RecentWriteMiddleware)
+if PROFILING_ENABLED:
+    # Inside QueryStatsMiddleware, so profiles include the request's SQL
+    app.add_middleware(ProfilingMiddleware)
+    print(f"[Startup] Request profiling enabled, writing to {PROFILE_DIR}")
+app.add_middleware(QueryStatsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -52,12 +95,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Recent-Write",
+        "Server-Timing",
+        "X-Profile-Id",
+        "ETag",
+        "X-Next-Cursor",
+    ],
 )
 
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so latency includes the other middleware
+app.add_middleware(HttpMetricsMiddleware)
+
 app.include_router(images_router)
 app.include_router(requests_router)
 app.include_router(workorders_router)
 app.include_router(notifications_router)
+app.include_router(metrics_router)
+app.include_router(stats_router)
+app.include_router(prometheus_router)
 
 
 @app.get("/api/health", tags=["Health"])
@@ -0,0 +1,13 @@
+from .compression import CompressionMiddleware
+from .http_metrics import HttpMetricsMiddleware
+from .profiling import ProfilingMiddleware
+from .query_stats import QueryStatsMiddleware
+from .recent_write import RecentWriteMiddleware
+
+__all__ = [
+    "CompressionMiddleware",
+    "HttpMetricsMiddleware",
+    "ProfilingMiddleware",
+    "QueryStatsMiddleware",
+    "RecentWriteMiddleware",
+]
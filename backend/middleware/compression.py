@@ -0,0 +1,308 @@
+"""
+Response compression with ETags and a compressed-body cache
+
+JSON and text responses of at least COMPRESSION_MIN_SIZE bytes are
+compressed with Brotli (when the brotli package is installed) or gzip,
+whichever the client prefers in Accept-Encoding. Bodies of
+COMPRESSION_THREAD_MIN_SIZE bytes or more are compressed in a worker thread
+so the event loop keeps serving other requests.
+
+Complete GET responses get a weak ETag (a hash of the uncompressed body) and
+If-None-Match is answered with 304. The compressed bytes are cached by
+(ETag, encoding) up to COMPRESSION_CACHE_MAX_BYTES, so clients polling an
+unchanged list don't make the server recompress it. Streamed responses are
+compressed chunk by chunk and are neither tagged nor cached.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_THREAD_MIN_SIZE = int(os.getenv("COMPRESSION_THREAD_MIN_SIZE", "65536"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+COMPRESSION_CACHE_MAX_BYTES = int(
+    os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def _available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported encoding in an Accept-Encoding header (br before gzip on ties)"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in _available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def body_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison: W/"x" matches "x"
+    return "*" in candidates or etag.removeprefix("W/") in (
+        tag.removeprefix("W/") for tag in candidates
+    )
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), bounded in bytes"""
+
+    def __init__(self, max_bytes: int = COMPRESSION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((etag, encoding))
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((etag, encoding))
+            self.hits += 1
+            return body
+
+    def put(self, etag: str, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop((etag, encoding), None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[(etag, encoding)] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+compressed_cache = CompressedCache()
+
+
+class _StreamCompressor:
+    """Incremental compressor for streamed bodies"""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self._compress = self._compressor.process
+            self._finish = self._compressor.finish
+        else:
+            # wbits 16+: gzip container
+            self._compressor = zlib.compressobj(
+                COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self._compress = self._compressor.compress
+            self._finish = self._compressor.flush
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compress(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware: ETags, 304s and gzip/Brotli compression"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        min_size: int = COMPRESSION_MIN_SIZE,
+        thread_min_size: int = COMPRESSION_THREAD_MIN_SIZE,
+        cache: CompressedCache = compressed_cache,
+    ):
+        self.app = app
+        self.min_size = min_size
+        self.thread_min_size = thread_min_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        tag_responses = scope["method"] == "GET"
+        if encoding is None and not tag_responses:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _Responder(self, send, encoding, request_headers, tag_responses)
+        await self.app(scope, receive, responder.send)
+
+    async def _compress(self, body: bytes, encoding: str) -> bytes:
+        if len(body) >= self.thread_min_size:
+            return await asyncio.to_thread(compress, body, encoding)
+        return compress(body, encoding)
+
+
+class _Responder:
+    """Per-response state: decides at response start whether to buffer"""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        send: Send,
+        encoding: Optional[str],
+        request_headers: Headers,
+        tag_responses: bool,
+    ):
+        self.middleware = middleware
+        self._send = send
+        self.encoding = encoding
+        self.request_headers = request_headers
+        self.tag_responses = tag_responses
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.streaming: Optional[_StreamCompressor] = None
+        self.chunks: List[bytes] = []
+
+    def _eligible(self, message: Message) -> bool:
+        headers = Headers(raw=message.get("headers", []))
+        content_type = headers.get("content-type", "")
+        return (
+            message["status"] == 200
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            if not self._eligible(message):
+                self.passthrough = True
+                await self._send(message)
+                return
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.streaming is not None:
+            await self._send_stream_chunk(body, more_body)
+            return
+
+        if more_body and not self.chunks:
+            # First chunk of a streamed body: compress as it goes
+            if self.encoding is None:
+                self.passthrough = True
+                await self._send(self.start)
+                await self._send(message)
+                return
+            await self._start_stream()
+            await self._send_stream_chunk(body, more_body)
+            return
+        self.chunks.append(body)
+        if not more_body:
+            await self._send_complete(b"".join(self.chunks))
+
+    async def _start_stream(self) -> None:
+        self.streaming = _StreamCompressor(self.encoding)
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        await self._send({**self.start, "headers": headers.raw})
+
+    async def _send_stream_chunk(self, body: bytes, more_body: bool) -> None:
+        if len(body) >= self.middleware.thread_min_size:
+            data = await asyncio.to_thread(self.streaming.compress, body)
+        else:
+            data = self.streaming.compress(body)
+        if not more_body:
+            data += self.streaming.finish()
+        await self._send(
+            {"type": "http.response.body", "body": data, "more_body": more_body}
+        )
+
+    async def _send_complete(self, body: bytes) -> None:
+        headers = MutableHeaders(raw=list(self.start["headers"]))
+        headers.add_vary_header("Accept-Encoding")
+        etag = None
+        if self.tag_responses:
+            etag = headers.get("etag") or body_etag(body)
+            headers["ETag"] = etag
+            if_none_match = self.request_headers.get("if-none-match")
+            if if_none_match and etag_matches(if_none_match, etag):
+                for name in ("content-length", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                await self._send({**self.start, "status": 304, "headers": headers.raw})
+                await self._send({"type": "http.response.body", "body": b""})
+                return
+
+        if self.encoding is not None and len(body) >= self.middleware.min_size:
+            compressed = (
+                self.middleware.cache.get(etag, self.encoding) if etag else None
+            )
+            if compressed is None:
+                compressed = await self.middleware._compress(body, self.encoding)
+                if etag:
+                    self.middleware.cache.put(etag, self.encoding, compressed)
+            body = compressed
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(body))
+
+        await self._send({**self.start, "headers": headers.raw})
+        await self._send({"type": "http.response.body", "body": body})
@@ -0,0 +1,61 @@
+"""
+Per-route HTTP metrics for the Prometheus /metrics endpoint
+
+Requests are labeled by route template (e.g. /api/workorders/{wo_id}), not
+the raw path, so label cardinality stays bounded; unmatched paths share the
+"unmatched" label.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.prometheus import REGISTRY, Counter, Gauge, Histogram
+
+HTTP_REQUESTS = REGISTRY.register(
+    Counter(
+        "http_requests_total",
+        "HTTP requests by method, route template and status code",
+        ("method", "route", "status"),
+    )
+)
+HTTP_IN_FLIGHT = REGISTRY.register(
+    Gauge("http_requests_in_flight", "HTTP requests being served", ("method",))
+)
+HTTP_LATENCY = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by method and route template",
+        ("method", "route"),
+    )
+)
+
+
+class HttpMetricsMiddleware:
+    """Pure ASGI middleware recording counts, in-flight requests and latency"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(method)
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec(method)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method, route, str(status))
+            HTTP_LATENCY.observe(time.perf_counter() - started, method, route)
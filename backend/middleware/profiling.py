@@ -0,0 +1,159 @@
+"""
+Opt-in per-request profiling
+
+A request is profiled when it sends X-Profile: <PROFILE_TOKEN>, or at random
+with probability PROFILE_SAMPLE_RATE. Its profile is written to PROFILE_DIR
+as <id>.folded (flamegraph input: Python stacks plus one [sql] stack per
+statement shape) and <id>.json (route, wall time, SQL statements and
+pydantic validation/serialization time); the response carries the id in
+X-Profile-Id.
+
+main.py only installs the middleware when PROFILE_DIR is set and a trigger
+is configured, so it costs nothing otherwise.
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from db import query_stats
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils import profiler
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _write_profile(directory: str, profile_id: str, folded: str, summary: dict) -> None:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile_id)
+    with open(f"{path}.folded", "w", encoding="utf-8") as f:
+        f.write(folded)
+    with open(f"{path}.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling selected requests to PROFILE_DIR"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        directory: str = profiler.PROFILE_DIR,
+        sample_rate: float = profiler.PROFILE_SAMPLE_RATE,
+        token: str = profiler.PROFILE_TOKEN,
+        interval: float = profiler.PROFILE_INTERVAL_MS / 1000,
+    ):
+        self.app = app
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if self.token:
+            supplied = Headers(scope=scope).get(PROFILE_HEADER)
+            if supplied is not None and hmac.compare_digest(supplied, self.token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        started_at = datetime.now(timezone.utc)
+        profile_id = "-".join(
+            [
+                started_at.strftime("%Y%m%dT%H%M%S"),
+                scope["method"],
+                _UNSAFE.sub("_", scope["path"]).strip("_")[:60] or "root",
+                uuid.uuid4().hex[:8],
+            ]
+        )
+        status: Optional[int] = None
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        profile = profiler.RequestProfile(
+            interval=self.interval, stop_code=self.__call__.__code__
+        )
+        stats = query_stats.current_stats()
+        started = time.perf_counter()
+        token = profiler.start(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop(token)
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", None)
+            profile.root = f"{scope['method']} {route or scope['path']}"
+            await self._save(profile, profile_id, scope, route, status, elapsed, stats)
+
+    async def _save(
+        self,
+        profile: profiler.RequestProfile,
+        profile_id: str,
+        scope: Scope,
+        route: Optional[str],
+        status: Optional[int],
+        elapsed: float,
+        stats: Optional[query_stats.RequestQueryStats],
+    ) -> None:
+        statements = []
+        if stats is not None:
+            for shape, count in stats.shapes.most_common():
+                seconds = stats.shape_durations[shape]
+                profile.add_stack(["[sql]", shape], seconds)
+                statements.append(
+                    {
+                        "statement": shape,
+                        "count": count,
+                        "durationMs": round(seconds * 1000, 2),
+                    }
+                )
+        summary = {
+            "id": profile_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status,
+            "wallMs": round(elapsed * 1000, 2),
+            "profiledMs": round(profile.sampled * 1000, 2),
+            "sql": {
+                "queries": stats.count if stats is not None else 0,
+                "dbMs": round(stats.duration * 1000, 2) if stats is not None else 0.0,
+                "statements": statements,
+            },
+            "pydantic": {
+                "validationMs": round(profile.pydantic["validation"] * 1000, 2),
+                "serializationMs": round(profile.pydantic["serialization"] * 1000, 2),
+            },
+        }
+        try:
+            await asyncio.to_thread(
+                _write_profile, self.directory, profile_id, profile.folded(), summary
+            )
+        except OSError as e:
+            print(f"[Profiling] Failed to write profile {profile_id}: {e}")
+        else:
+            print(
+                f"[Profiling] Wrote {profile_id} ({summary['wallMs']} ms) to {self.directory}"
+            )
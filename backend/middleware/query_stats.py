@@ -0,0 +1,47 @@
+"""
+Per-request SQL statistics: Server-Timing header and structured log line
+"""
+
+import json
+
+from db import query_stats
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware collecting the queries run by each HTTP request"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = query_stats.start_request(scope["method"], scope["path"], scope)
+        stats = query_stats.current_stats()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.end_request(token)
+            route = scope.get("route")
+            stats.route = getattr(route, "path", None)
+            self._report(stats)
+
+    def _report(self, stats: query_stats.RequestQueryStats) -> None:
+        record = stats.as_log_record()
+        if record["nPlusOne"]:
+            print(f"[SQL] Likely N+1 in {stats.method} {stats.route or stats.path}: {json.dumps(record)}")
+        elif query_stats.SQL_STATS_LOG and stats.count:
+            print(f"[SQL] {json.dumps(record)}")
+        for hook in query_stats.REQUEST_STATS_HOOKS:
+            hook(stats)
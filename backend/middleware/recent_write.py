@@ -0,0 +1,51 @@
+"""
+Read-your-writes marker for replica routing
+
+After a successful write request (POST/PUT/PATCH/DELETE with a 2xx/3xx
+response) the client gets a short-lived cookie and X-Recent-Write header;
+get_read_db keeps that client on the primary until it expires.
+"""
+
+from db import replicas
+from db.replicas import (
+    RECENT_WRITE_COOKIE,
+    RECENT_WRITE_HEADER,
+    RECENT_WRITE_SECONDS,
+    recent_write_marker,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+class RecentWriteMiddleware:
+    """Pure ASGI middleware; a no-op unless replicas are configured"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in WRITE_METHODS
+            or not replicas.replica_set.enabled
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_marker(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                marker = recent_write_marker()
+                headers = list(message.get("headers", []))
+                headers.append(
+                    (
+                        b"set-cookie",
+                        f"{RECENT_WRITE_COOKIE}={marker}; Max-Age={RECENT_WRITE_SECONDS}; "
+                        "Path=/; HttpOnly; SameSite=Lax".encode(),
+                    )
+                )
+                headers.append((RECENT_WRITE_HEADER.lower().encode(), marker.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_marker)
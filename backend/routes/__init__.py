@@ -2,10 +2,16 @@ from .images import router as images_router
 from .requests import router as requests_router
 from .workorders import router as workorders_router
 from .notifications import router as notifications_router
+from .metrics import prometheus_router
+from .metrics import router as metrics_router
+from .stats import router as stats_router
 
 __all__ = [
     "images_router",
     "requests_router", 
     "workorders_router",
     "notifications_router",
+    "metrics_router",
+    "prometheus_router",
+    "stats_router",
 ]
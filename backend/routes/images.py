@@ -1,25 +1,28 @@
 import base64
 import os
-import uuid
-from datetime import datetime
-from typing import List
+from typing import Dict, List, Literal, Optional
 
-from db import get_db
+from db import get_db, get_read_db
 from db.models import Image as ImageModel
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from fastapi.responses import JSONResponse
 from schemas import ImageInfo
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from utils import PICTURES_DIR
+from utils import PICTURES_DIR, generate_id
+from utils.image_refs import image_owners, load_owner_images
+from utils.json_response import rows_response
+
+IMAGE_BATCH_MAX_OWNERS = int(os.getenv("IMAGE_BATCH_MAX_OWNERS", "200"))
 
 router = APIRouter(prefix="/api/images", tags=["Images"])
 
 
 @router.post("/upload", response_model=ImageInfo)
-async def upload_image(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_image(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
     """Upload an image file, convert to base64, and store in DB"""
-    image_id = f"IMG-{int(datetime.now().timestamp() * 1000)}-{uuid.uuid4().hex[:8]}"
+    image_id = generate_id("IMG")
     ext = os.path.splitext(file.filename)[1] or ".jpg"
     filename = f"{image_id}{ext}"
 
@@ -32,14 +35,14 @@ async def upload_image(file: UploadFile = File(...), db: Session = Depends(get_d
     )
 
     db.add(new_image)
-    db.commit()
-    db.refresh(new_image)
+    await db.commit()
+    await db.refresh(new_image)
 
     return ImageInfo.model_validate(new_image)
 
 
 @router.post("/upload-base64", response_model=ImageInfo)
-async def upload_image_base64(payload: dict, db: Session = Depends(get_db)):
+async def upload_image_base64(payload: dict, db: AsyncSession = Depends(get_db)):
     """Upload an image provided as base64 in JSON { originalName, base64Data }"""
     original_name = payload.get("originalName")
     base64_data = payload.get("base64Data")
@@ -48,7 +51,7 @@ async def upload_image_base64(payload: dict, db: Session = Depends(get_db)):
             status_code=400, detail="originalName and base64Data are required"
         )
 
-    image_id = f"IMG-{int(datetime.now().timestamp() * 1000)}-{uuid.uuid4().hex[:8]}"
+    image_id = generate_id("IMG")
     ext = os.path.splitext(original_name)[1] or ".jpg"
     filename = f"{image_id}{ext}"
 
@@ -66,16 +69,46 @@ async def upload_image_base64(payload: dict, db: Session = Depends(get_db)):
     )
 
     db.add(new_image)
-    db.commit()
-    db.refresh(new_image)
+    await db.commit()
+    await db.refresh(new_image)
 
     return ImageInfo.model_validate(new_image)
 
 
+@router.get("/by-owner", response_model=Dict[str, List[ImageInfo]])
+async def get_owner_images(
+    ownerType: Literal["request", "workorder"],
+    ownerIds: List[str] = Query(..., description="Request or work order ids"),
+    role: Optional[Literal["image", "technician"]] = Query(
+        default=None, description="Only imageIds or only technicianImages"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Images of many requests or work orders (e.g. a page of cards) at once"""
+    if len(ownerIds) > IMAGE_BATCH_MAX_OWNERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {IMAGE_BATCH_MAX_OWNERS} owners per request",
+        )
+    images = await load_owner_images(db, ownerType, ownerIds, role)
+    return {
+        owner_id: [ImageInfo.model_validate(image) for image in owner_images]
+        for owner_id, owner_images in images.items()
+    }
+
+
+@router.get("/{image_id}/references")
+async def get_image_references(
+    image_id: str, db: AsyncSession = Depends(get_read_db)
+):
+    """Requests and work orders that use an image"""
+    return await image_owners(db, image_id)
+
+
 @router.get("/{image_id}")
-async def get_image(image_id: str, db: Session = Depends(get_db)):
+async def get_image(image_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get image base64 by ID"""
-    image = db.query(ImageModel).filter(ImageModel.id == image_id).first()
+    image = await db.scalar(select(ImageModel).where(ImageModel.id == image_id))
 
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
@@ -87,16 +120,20 @@ async def get_image(image_id: str, db: Session = Depends(get_db)):
 
 
 @router.get("", response_model=List[ImageInfo])
-async def list_images(db: Session = Depends(get_db)):
+async def list_images(db: AsyncSession = Depends(get_read_db)):
     """List all images"""
-    images = db.query(ImageModel).order_by(ImageModel.created_at.desc()).all()
-    return [ImageInfo.model_validate(img) for img in images]
+    rows = (
+        await db.execute(
+            select(ImageModel.__table__).order_by(ImageModel.created_at.desc())
+        )
+    ).mappings()
+    return rows_response(ImageInfo, rows)
 
 
 @router.delete("/{image_id}")
-async def delete_image(image_id: str, db: Session = Depends(get_db)):
+async def delete_image(image_id: str, db: AsyncSession = Depends(get_db)):
     """Delete an image"""
-    image = db.query(ImageModel).filter(ImageModel.id == image_id).first()
+    image = await db.scalar(select(ImageModel).where(ImageModel.id == image_id))
 
     if not image:
         raise HTTPException(status_code=404, detail="Image not found")
@@ -105,7 +142,7 @@ async def delete_image(image_id: str, db: Session = Depends(get_db)):
     if os.path.exists(filepath):
         os.remove(filepath)
 
-    db.delete(image)
-    db.commit()
+    await db.delete(image)
+    await db.commit()
 
     return {"message": "Image deleted"}
@@ -0,0 +1,81 @@
+"""
+Operational metrics routes
+"""
+
+from db.pool import pool_metrics
+from db.slow_queries import slow_query_log
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from utils.prometheus import REGISTRY, Counter, Gauge
+
+router = APIRouter(prefix="/api/metrics", tags=["Metrics"])
+prometheus_router = APIRouter(tags=["Metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+POOL_GAUGES = {
+    "size": "Configured pool size",
+    "inUse": "Connections checked out",
+    "idle": "Connections idle in the pool",
+    "overflow": "Overflow connections open",
+}
+POOL_COUNTERS = {
+    "checkouts": "Connection checkouts",
+    "overflowCheckouts": "Checkouts served by an overflow connection",
+    "timeouts": "Checkouts that timed out waiting for a connection",
+}
+
+
+def _snake(key: str) -> str:
+    return "".join("_" + c.lower() if c.isupper() else c for c in key)
+
+
+def _pool_collector():
+    """Connection pool gauges, built from the pool snapshots at scrape time"""
+    snapshots = pool_metrics()
+    metrics = []
+    for key, help_text in POOL_GAUGES.items():
+        gauge = Gauge(f"db_pool_{_snake(key)}", help_text, ("pool",))
+        for snapshot in snapshots:
+            if snapshot[key] is not None:
+                gauge.set(snapshot["name"], value=snapshot[key])
+        metrics.append(gauge)
+    for key, help_text in POOL_COUNTERS.items():
+        counter = Counter(f"db_pool_{_snake(key)}_total", help_text, ("pool",))
+        for snapshot in snapshots:
+            counter.inc(snapshot["name"], amount=snapshot[key])
+        metrics.append(counter)
+
+    wait = Gauge(
+        "db_pool_checkout_wait_p95_seconds",
+        "95th percentile checkout wait over recent checkouts",
+        ("pool",),
+    )
+    for snapshot in snapshots:
+        wait.set(snapshot["name"], value=snapshot["checkoutWaitMs"]["p95"] / 1000)
+    metrics.append(wait)
+    return metrics
+
+
+REGISTRY.add_collector(_pool_collector)
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    """Connection pool gauges, counters and checkout wait times per engine"""
+    return {"pools": pool_metrics()}
+
+
+@router.get("/slow-queries")
+async def get_slow_queries():
+    """Statements over the slow-query threshold with their latest EXPLAIN plan"""
+    return {
+        "thresholdMs": slow_query_log.threshold * 1000,
+        "statements": slow_query_log.entries(),
+    }
+
+
+@prometheus_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint (HTTP and connection pool metrics)"""
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,30 +3,172 @@ Notification Routes for CMMS System
 Handles notification CRUD operations and workflow notifications
 """
 
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
 from typing import List, Optional
-from datetime import datetime, timedelta
+from sqlalchemy import (
+    Boolean,
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import uuid
+from starlette.concurrency import run_in_threadpool
 
-from db import get_db
-from db.models import Notification as NotificationModel, WorkOrder as WorkOrderModel
+from db import get_db, get_read_db, get_sync_db
+from db.models import Notification as NotificationModel, NotificationRead
+from db.upsert import dialect_insert
 from schemas import NotificationCreate, Notification
+from utils import generate_id
+from utils.json_response import models_response, stream_entities_response
+from utils.notification_templates import normalize_locale, template_cache
+from utils.reminders import ReminderScanBusy, create_due_reminders
+from utils.scheduler import reminder_scan
 
 router = APIRouter(prefix="/api", tags=["Notifications"])
 
 
+def get_locale(
+    locale: Optional[str] = Query(
+        default=None, description="Message locale (th, en); defaults to Accept-Language"
+    ),
+    accept_language: Optional[str] = Header(None),
+) -> str:
+    """Locale used to render notification messages"""
+    return normalize_locale(locale or accept_language)
+
+
+def to_notification(
+    notification: NotificationModel, locale: str, is_read: Optional[bool] = None
+) -> Notification:
+    """Build the response model, rendering the message template for the locale"""
+    update = {
+        "message": template_cache.render(
+            notification.message_key,
+            notification.message_params,
+            locale,
+            title=notification.work_order_title,
+            fallback=notification.message,
+        )
+    }
+    if is_read is not None:
+        update["isRead"] = is_read
+    return Notification.model_validate(notification).model_copy(update=update)
+
+
+def _for_user(user_role: str, user_name: str):
+    """Notifications addressed to the user by name or broadcast to their role"""
+    return and_(
+        NotificationModel.recipient_role == user_role,
+        or_(
+            NotificationModel.recipient_name.is_(None),
+            NotificationModel.recipient_name == user_name,
+        ),
+    )
+
+
+def _receipt_exists(user_name: str, dismissed: Optional[bool] = None):
+    """EXISTS over notification_reads, served by its (notification_id, user_name) key"""
+    query = select(NotificationRead.notification_id).where(
+        NotificationRead.notification_id == NotificationModel.id,
+        NotificationRead.user_name == user_name,
+    )
+    if dismissed is not None:
+        query = query.where(NotificationRead.dismissed == dismissed)
+    return query.exists()
+
+
+def _is_read_for(user_name: str):
+    """Direct notifications use is_read, broadcasts use the user's read receipt"""
+    return type_coerce(
+        case(
+            (NotificationModel.recipient_name.is_(None), _receipt_exists(user_name)),
+            else_=NotificationModel.is_read,
+        ),
+        Boolean,
+    )
+
+
+def _is_unread_for(user_name: str):
+    return or_(
+        and_(
+            NotificationModel.recipient_name.is_(None),
+            ~_receipt_exists(user_name),
+        ),
+        and_(
+            NotificationModel.recipient_name.isnot(None),
+            NotificationModel.is_read == False,  # noqa: E712
+        ),
+    )
+
+
 @router.get("/notifications", response_model=List[Notification])
 async def get_notifications(
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    locale: str = Depends(get_locale),
+    stream: bool = Query(
+        default=False, description="Stream the JSON array in batches (for exports)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get all notifications"""
-    notifications = (
-        db.query(NotificationModel).order_by(NotificationModel.created_at.desc()).all()
+    """
+    Get notifications.
+
+    With X-User-Role / X-User-Name headers this is the user's inbox: their own
+    and their role's broadcast notifications, with isRead evaluated for them.
+    Without headers all notifications are returned.
+    """
+    await template_cache.refresh_async(db)
+
+    if not (x_user_role and x_user_name):
+        query = select(NotificationModel).order_by(NotificationModel.created_at.desc())
+
+        def convert(n: NotificationModel) -> Notification:
+            return to_notification(n, locale)
+
+    else:
+        query = (
+            select(NotificationModel, _is_read_for(x_user_name))
+            .where(
+                _for_user(x_user_role, x_user_name),
+                ~_receipt_exists(x_user_name, dismissed=True),
+            )
+            .order_by(NotificationModel.created_at.desc())
+        )
+
+        def convert(n: NotificationModel, is_read) -> Notification:
+            return to_notification(n, locale, bool(is_read))
+
+    if stream:
+        return stream_entities_response(Notification, db.bind, query, convert)
+    rows = (await db.execute(query)).all()
+    return models_response(Notification, [convert(*row) for row in rows])
+
+
+@router.get("/notifications/unread-count")
+async def get_unread_notification_count(
+    x_user_role: Optional[str] = Header(None),
+    x_user_name: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Count notifications the current user has not read yet"""
+    if not (x_user_role and x_user_name):
+        return {"count": 0}
+
+    count = await db.scalar(
+        select(func.count(NotificationModel.id)).where(
+            _for_user(x_user_role, x_user_name), _is_unread_for(x_user_name)
+        )
     )
-    return [Notification.model_validate(n) for n in notifications]
+    return {"count": count}
 
 
 @router.post("/notifications", response_model=Notification)
@@ -34,32 +176,33 @@ async def create_notification(
     notification: NotificationCreate,
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    locale: str = Depends(get_locale),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Create a new notification"""
-    # Use millisecond timestamp + random suffix to avoid primary key collisions
-    # when multiple notifications are created very close together.
-    notification_id = (
-        f"notif-{int(datetime.now().timestamp() * 1000)}-{uuid.uuid4().hex[:6]}"
-    )
-
-    new_notification = NotificationModel(
-        id=notification_id,
-        type=notification.type,
-        work_order_id=notification.workOrderId,
-        work_order_title=notification.workOrderTitle,
-        message=notification.message,
-        recipient_role=notification.recipientRole,
-        recipient_name=notification.recipientName,
-        is_read=notification.isRead,
-        triggered_by=notification.triggeredBy,
+    """Create a new notification (template key + params, or a legacy message)"""
+    notification_id = generate_id("notif")
+
+    new_notification = await db.scalar(
+        insert(NotificationModel)
+        .values(
+            id=notification_id,
+            type=notification.type,
+            work_order_id=notification.workOrderId,
+            work_order_title=notification.workOrderTitle,
+            message=None if notification.messageKey else notification.message,
+            message_key=notification.messageKey,
+            message_params=notification.messageParams,
+            recipient_role=notification.recipientRole,
+            recipient_name=notification.recipientName,
+            is_read=notification.isRead,
+            triggered_by=notification.triggeredBy,
+        )
+        .returning(NotificationModel)
     )
+    await db.commit()
 
-    db.add(new_notification)
-    db.commit()
-    db.refresh(new_notification)
-
-    return Notification.model_validate(new_notification)
+    await template_cache.refresh_async(db)
+    return to_notification(new_notification, locale)
 
 
 @router.patch("/notifications/{notification_id}/read", response_model=Notification)
@@ -67,79 +210,132 @@ async def mark_notification_as_read(
     notification_id: str,
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    locale: str = Depends(get_locale),
+    db: AsyncSession = Depends(get_db),
 ):
     """Mark a specific notification as read"""
-    notification = (
-        db.query(NotificationModel)
-        .filter(NotificationModel.id == notification_id)
-        .first()
+    notification = await db.scalar(
+        select(NotificationModel).where(NotificationModel.id == notification_id)
     )
 
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    notification.is_read = True
-    db.commit()
-    db.refresh(notification)
-
-    return Notification.model_validate(notification)
-
-
-def is_notification_for_user(
-    notification: NotificationModel, user_role: str, user_name: str
-) -> bool:
-    """Check if notification belongs to a specific user"""
-    if notification.recipient_role != user_role:
-        return False
+    if notification.recipient_name is None and x_user_name:
+        # Role broadcast: record a receipt for this user only
+        await db.execute(
+            dialect_insert(db.get_bind(), NotificationRead.__table__)
+            .values(
+                notification_id=notification.id,
+                user_name=x_user_name,
+                dismissed=False,
+            )
+            .on_conflict_do_nothing(index_elements=["notification_id", "user_name"])
+        )
+        await db.commit()
+        await template_cache.refresh_async(db)
+        return to_notification(notification, locale, True)
 
-    recipient_name = notification.recipient_name
-    if recipient_name and recipient_name != user_name:
-        return False
+    notification.is_read = True
+    await db.commit()
+    await db.refresh(notification)
 
-    return True
+    await template_cache.refresh_async(db)
+    return to_notification(notification, locale)
 
 
 @router.patch("/notifications/read-all")
 async def mark_all_notifications_as_read(
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Mark all notifications as read for the current user only"""
-    notifications = db.query(NotificationModel).all()
-
-    marked_count = 0
-    for notification in notifications:
-        if is_notification_for_user(notification, x_user_role or "", x_user_name or ""):
-            if not notification.is_read:
-                notification.is_read = True
-                marked_count += 1
+    if not (x_user_role and x_user_name):
+        return {"message": "0 notifications marked as read"}
+
+    direct_count = (
+        await db.execute(
+            update(NotificationModel)
+            .where(
+                NotificationModel.recipient_role == x_user_role,
+                NotificationModel.recipient_name == x_user_name,
+                NotificationModel.is_read == False,  # noqa: E712
+            )
+            .values(is_read=True)
+            .execution_options(synchronize_session=False)
+        )
+    ).rowcount
+
+    unread_broadcasts = select(
+        NotificationModel.id, literal(x_user_name), literal(False)
+    ).where(
+        NotificationModel.recipient_role == x_user_role,
+        NotificationModel.recipient_name.is_(None),
+        ~_receipt_exists(x_user_name),
+    )
+    broadcast_count = (
+        await db.execute(
+            dialect_insert(db.get_bind(), NotificationRead.__table__).from_select(
+                ["notification_id", "user_name", "dismissed"], unread_broadcasts
+            )
+        )
+    ).rowcount
 
-    db.commit()
+    await db.commit()
 
-    return {"message": f"{marked_count} notifications marked as read"}
+    return {
+        "message": f"{direct_count + broadcast_count} notifications marked as read"
+    }
 
 
 @router.delete("/notifications/read")
 async def delete_all_read_notifications(
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Delete read notifications for the current user only"""
-    notifications = db.query(NotificationModel).all()
+    """
+    Delete read notifications for the current user only.
+
+    Broadcast notifications are shared with the rest of the role, so they are
+    only dismissed for this user.
+    """
+    if not (x_user_role and x_user_name):
+        return {"message": "0 read notifications deleted"}
+
+    deleted_count = (
+        await db.execute(
+            delete(NotificationModel)
+            .where(
+                NotificationModel.recipient_role == x_user_role,
+                NotificationModel.recipient_name == x_user_name,
+                NotificationModel.is_read == True,  # noqa: E712
+            )
+            .execution_options(synchronize_session=False)
+        )
+    ).rowcount
 
-    deleted_count = 0
-    for notification in notifications:
-        if is_notification_for_user(notification, x_user_role or "", x_user_name or ""):
-            if notification.is_read:
-                db.delete(notification)
-                deleted_count += 1
+    role_broadcasts = select(NotificationModel.id).where(
+        NotificationModel.recipient_role == x_user_role,
+        NotificationModel.recipient_name.is_(None),
+    )
+    dismissed_count = (
+        await db.execute(
+            update(NotificationRead)
+            .where(
+                NotificationRead.user_name == x_user_name,
+                NotificationRead.dismissed == False,  # noqa: E712
+                NotificationRead.notification_id.in_(role_broadcasts),
+            )
+            .values(dismissed=True)
+            .execution_options(synchronize_session=False)
+        )
+    ).rowcount
 
-    db.commit()
+    await db.commit()
 
-    return {"message": f"{deleted_count} read notifications deleted"}
+    return {"message": f"{deleted_count + dismissed_count} read notifications deleted"}
 
 
 @router.delete("/notifications/{notification_id}")
@@ -147,260 +343,57 @@ async def delete_notification(
     notification_id: str,
     x_user_role: Optional[str] = Header(None),
     x_user_name: Optional[str] = Header(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Delete a specific notification"""
-    notification = (
-        db.query(NotificationModel)
-        .filter(NotificationModel.id == notification_id)
-        .first()
+    notification = await db.scalar(
+        select(NotificationModel).where(NotificationModel.id == notification_id)
     )
 
     if notification:
-        db.delete(notification)
-        db.commit()
+        await db.delete(notification)
+        await db.execute(
+            delete(NotificationRead)
+            .where(NotificationRead.notification_id == notification_id)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
 
     return {"message": "Notification deleted"}
 
 
+@router.get("/notifications/templates")
+async def get_notification_templates(
+    locale: str = Depends(get_locale), db: AsyncSession = Depends(get_read_db)
+):
+    """Message templates for a locale, so clients can render messageKey themselves"""
+    await template_cache.refresh_async(db)
+    return {"locale": locale, "templates": template_cache.templates_for(locale)}
+
+
 @router.post("/notifications/check-reminders")
-async def check_and_create_reminders(db: Session = Depends(get_db)):
+async def check_and_create_reminders(db: Session = Depends(get_sync_db)):
     """
-    Check all work orders with preferredDate and create reminder notifications
-    for technicians when:
-    - 7 days before preferred date
-    - 3 days before preferred date
+    Check all work orders with preferredDate / dueDate and create reminder
+    notifications for technicians (7/3 days before preferred date,
+    7/3/1 days before due date).
 
-    This should be called periodically (e.g., once per day or on app load)
-    """
-    today = datetime.now().date()
-    created_notifications = []
-
-    # Get all work orders with preferredDate and assignedTo that are not completed/closed
-    work_orders = (
-        db.query(WorkOrderModel)
-        .filter(
-            WorkOrderModel.preferred_date.isnot(None),
-            WorkOrderModel.assigned_to.isnot(None),
-            WorkOrderModel.status.notin_(["Completed", "Closed", "Canceled"]),
-        )
-        .all()
-    )
+    Reminders are generated by the in-process scheduler; this endpoint is a
+    manual trigger. Concurrent calls share a single scan in this worker, and a
+    scan already running on another worker is not repeated.
 
-    for wo in work_orders:
-        try:
-            preferred_date = datetime.strptime(wo.preferred_date, "%Y-%m-%d").date()
-            days_until = (preferred_date - today).days
-
-            # Check for 7-day reminder
-            if days_until == 7:
-                # Check if reminder already exists for this WO and type
-                existing = (
-                    db.query(NotificationModel)
-                    .filter(
-                        NotificationModel.work_order_id == wo.id,
-                        NotificationModel.type == "wo_reminder_7_days",
-                    )
-                    .first()
-                )
-
-                if not existing:
-                    notification_id = (
-                        f"notif-{int(datetime.now().timestamp() * 1000)}-7d"
-                    )
-                    formatted_date = preferred_date.strftime("%d/%m/%Y")
-
-                    new_notification = NotificationModel(
-                        id=notification_id,
-                        type="wo_reminder_7_days",
-                        work_order_id=wo.id,
-                        work_order_title=wo.title,
-                        message=f'งาน "{wo.title}" มีกำหนดนัดหมายในอีก 7 วัน ({formatted_date})',
-                        recipient_role="Technician",
-                        recipient_name=wo.assigned_to,
-                        is_read=False,
-                        triggered_by="System",
-                    )
-                    db.add(new_notification)
-                    created_notifications.append(
-                        {
-                            "workOrderId": wo.id,
-                            "type": "wo_reminder_7_days",
-                            "assignedTo": wo.assigned_to,
-                        }
-                    )
-
-            # Check for 3-day reminder
-            elif days_until == 3:
-                # Check if reminder already exists for this WO and type
-                existing = (
-                    db.query(NotificationModel)
-                    .filter(
-                        NotificationModel.work_order_id == wo.id,
-                        NotificationModel.type == "wo_reminder_3_days",
-                    )
-                    .first()
-                )
-
-                if not existing:
-                    notification_id = (
-                        f"notif-{int(datetime.now().timestamp() * 1000)}-3d"
-                    )
-                    formatted_date = preferred_date.strftime("%d/%m/%Y")
-
-                    new_notification = NotificationModel(
-                        id=notification_id,
-                        type="wo_reminder_3_days",
-                        work_order_id=wo.id,
-                        work_order_title=wo.title,
-                        message=f'⚠️ งาน "{wo.title}" มีกำหนดนัดหมายในอีก 3 วัน ({formatted_date}) กรุณาเตรียมตัวให้พร้อม',
-                        recipient_role="Technician",
-                        recipient_name=wo.assigned_to,
-                        is_read=False,
-                        triggered_by="System",
-                    )
-                    db.add(new_notification)
-                    created_notifications.append(
-                        {
-                            "workOrderId": wo.id,
-                            "type": "wo_reminder_3_days",
-                            "assignedTo": wo.assigned_to,
-                        }
-                    )
-
-        except (ValueError, TypeError) as e:
-            # Skip work orders with invalid date format
-            continue
-
-    # ==========================================
-    # Check Due Date reminders (7, 3, 1 days)
-    # ==========================================
-    work_orders_with_due = (
-        db.query(WorkOrderModel)
-        .filter(
-            WorkOrderModel.due_date.isnot(None),
-            WorkOrderModel.assigned_to.isnot(None),
-            WorkOrderModel.status.notin_(["Completed", "Closed", "Canceled"]),
+    The scan is a blocking batch job, so it runs on a sync session in a
+    worker thread.
+    """
+    try:
+        created_notifications = await reminder_scan.run(
+            lambda: run_in_threadpool(create_due_reminders, db)
         )
-        .all()
-    )
-
-    for wo in work_orders_with_due:
-        try:
-            due_date = datetime.strptime(wo.due_date, "%Y-%m-%d").date()
-            days_until_due = (due_date - today).days
-            formatted_due = due_date.strftime("%d/%m/%Y")
-
-            # Check for 7-day due date reminder
-            if days_until_due == 7:
-                existing = (
-                    db.query(NotificationModel)
-                    .filter(
-                        NotificationModel.work_order_id == wo.id,
-                        NotificationModel.type == "wo_due_7_days",
-                    )
-                    .first()
-                )
-
-                if not existing:
-                    notification_id = (
-                        f"notif-{int(datetime.now().timestamp() * 1000)}-due7d"
-                    )
-                    new_notification = NotificationModel(
-                        id=notification_id,
-                        type="wo_due_7_days",
-                        work_order_id=wo.id,
-                        work_order_title=wo.title,
-                        message=f'📅 งาน "{wo.title}" จะถึงกำหนดส่งในอีก 7 วัน ({formatted_due})',
-                        recipient_role="Technician",
-                        recipient_name=wo.assigned_to,
-                        is_read=False,
-                        triggered_by="System",
-                    )
-                    db.add(new_notification)
-                    created_notifications.append(
-                        {
-                            "workOrderId": wo.id,
-                            "type": "wo_due_7_days",
-                            "assignedTo": wo.assigned_to,
-                        }
-                    )
-
-            # Check for 3-day due date reminder
-            elif days_until_due == 3:
-                existing = (
-                    db.query(NotificationModel)
-                    .filter(
-                        NotificationModel.work_order_id == wo.id,
-                        NotificationModel.type == "wo_due_3_days",
-                    )
-                    .first()
-                )
-
-                if not existing:
-                    notification_id = (
-                        f"notif-{int(datetime.now().timestamp() * 1000)}-due3d"
-                    )
-                    new_notification = NotificationModel(
-                        id=notification_id,
-                        type="wo_due_3_days",
-                        work_order_id=wo.id,
-                        work_order_title=wo.title,
-                        message=f'⚠️ งาน "{wo.title}" จะถึงกำหนดส่งในอีก 3 วัน ({formatted_due}) กรุณาเร่งดำเนินการ',
-                        recipient_role="Technician",
-                        recipient_name=wo.assigned_to,
-                        is_read=False,
-                        triggered_by="System",
-                    )
-                    db.add(new_notification)
-                    created_notifications.append(
-                        {
-                            "workOrderId": wo.id,
-                            "type": "wo_due_3_days",
-                            "assignedTo": wo.assigned_to,
-                        }
-                    )
-
-            # Check for 1-day due date reminder
-            elif days_until_due == 1:
-                existing = (
-                    db.query(NotificationModel)
-                    .filter(
-                        NotificationModel.work_order_id == wo.id,
-                        NotificationModel.type == "wo_due_1_day",
-                    )
-                    .first()
-                )
-
-                if not existing:
-                    notification_id = (
-                        f"notif-{int(datetime.now().timestamp() * 1000)}-due1d"
-                    )
-                    new_notification = NotificationModel(
-                        id=notification_id,
-                        type="wo_due_1_day",
-                        work_order_id=wo.id,
-                        work_order_title=wo.title,
-                        message=f'🚨 งาน "{wo.title}" จะถึงกำหนดส่งพรุ่งนี้ ({formatted_due}) กรุณาดำเนินการให้เสร็จ!',
-                        recipient_role="Technician",
-                        recipient_name=wo.assigned_to,
-                        is_read=False,
-                        triggered_by="System",
-                    )
-                    db.add(new_notification)
-                    created_notifications.append(
-                        {
-                            "workOrderId": wo.id,
-                            "type": "wo_due_1_day",
-                            "assignedTo": wo.assigned_to,
-                        }
-                    )
-
-        except (ValueError, TypeError) as e:
-            # Skip work orders with invalid date format
-            continue
-
-    db.commit()
+    except ReminderScanBusy:
+        return {
+            "message": "Reminder scan already in progress",
+            "notifications": [],
+        }
 
     return {
         "message": f"Created {len(created_notifications)} reminder notifications",
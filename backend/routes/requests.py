@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, timedelta
 
 from schemas import (
     RequestCreate,
@@ -10,49 +11,63 @@ from schemas import (
     WorkOrderCreate,
     WorkOrder,
 )
-from db import get_db
+from db import get_db, get_read_db
 from db.models import Request as RequestModel
-from utils import generate_id, get_current_datetime
+from utils import generate_id
+from utils.image_refs import delete_image_refs, sync_image_refs
+from utils.json_response import rows_response, stream_rows_response
 
 router = APIRouter(prefix="/api/requests", tags=["Requests"])
 
 
 @router.post("", response_model=RequestItem)
-async def create_request(request: RequestCreate, db: Session = Depends(get_db)):
+async def create_request(request: RequestCreate, db: AsyncSession = Depends(get_db)):
     """Create a new maintenance request"""
     request_id = generate_id("REQ")
 
-    new_request = RequestModel(
-        id=request_id,
-        location=request.location,
-        priority=request.priority,
-        description=request.description,
-        status="Open",
-        image_ids=request.imageIds,
-        assigned_to=request.assignedTo,
-        created_by=request.createdBy,
-        location_data=request.locationData.dict() if request.locationData else None,
-        preferred_date=request.preferredDate,
+    new_request = await db.scalar(
+        insert(RequestModel)
+        .values(
+            id=request_id,
+            location=request.location,
+            priority=request.priority,
+            description=request.description,
+            status="Open",
+            image_ids=request.imageIds,
+            assigned_to=request.assignedTo,
+            created_by=request.createdBy,
+            location_data=(
+                request.locationData.dict() if request.locationData else None
+            ),
+            preferred_date=request.preferredDate,
+        )
+        .returning(RequestModel)
     )
-
-    db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+    await sync_image_refs(db, "request", request_id, {"image": request.imageIds})
+    await db.commit()
 
     return RequestItem.model_validate(new_request)
 
 
 @router.get("", response_model=List[RequestItem])
-async def list_requests(db: Session = Depends(get_db)):
+async def list_requests(
+    stream: bool = Query(
+        default=False, description="Stream the JSON array in batches (for exports)"
+    ),
+    db: AsyncSession = Depends(get_read_db),
+):
     """List all requests"""
-    requests = db.query(RequestModel).order_by(RequestModel.created_at.desc()).all()
-    return [RequestItem.model_validate(r) for r in requests]
+    query = select(RequestModel.__table__).order_by(RequestModel.created_at.desc())
+    if stream:
+        return stream_rows_response(RequestItem, db.bind, query)
+    rows = (await db.execute(query)).mappings()
+    return rows_response(RequestItem, rows)
 
 
 @router.get("/{request_id}", response_model=RequestItem)
-async def get_request(request_id: str, db: Session = Depends(get_db)):
+async def get_request(request_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific request"""
-    request = db.query(RequestModel).filter(RequestModel.id == request_id).first()
+    request = await db.scalar(select(RequestModel).where(RequestModel.id == request_id))
 
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
@@ -62,10 +77,10 @@ async def get_request(request_id: str, db: Session = Depends(get_db)):
 
 @router.put("/{request_id}", response_model=RequestItem)
 async def update_request(
-    request_id: str, updates: RequestUpdate, db: Session = Depends(get_db)
+    request_id: str, updates: RequestUpdate, db: AsyncSession = Depends(get_db)
 ):
     """Update request"""
-    request = db.query(RequestModel).filter(RequestModel.id == request_id).first()
+    request = await db.scalar(select(RequestModel).where(RequestModel.id == request_id))
 
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
@@ -79,30 +94,31 @@ async def update_request(
     if updates.locationData is not None:
         request.location_data = updates.locationData.dict()
 
-    db.commit()
-    db.refresh(request)
+    await db.commit()
+    await db.refresh(request)
 
     return RequestItem.model_validate(request)
 
 
 @router.delete("/{request_id}")
-async def delete_request(request_id: str, db: Session = Depends(get_db)):
+async def delete_request(request_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a request"""
-    request = db.query(RequestModel).filter(RequestModel.id == request_id).first()
+    request = await db.scalar(select(RequestModel).where(RequestModel.id == request_id))
 
     if request:
-        db.delete(request)
-        db.commit()
+        await delete_image_refs(db, "request", request.id)
+        await db.delete(request)
+        await db.commit()
 
     return {"message": "Request deleted"}
 
 
 @router.post("/{request_id}/convert", response_model=WorkOrder)
-async def convert_request_to_workorder(request_id: str, db: Session = Depends(get_db)):
+async def convert_request_to_workorder(request_id: str, db: AsyncSession = Depends(get_db)):
     """Convert a request to a work order"""
     from routes.workorders import create_workorder_internal
 
-    request = db.query(RequestModel).filter(RequestModel.id == request_id).first()
+    request = await db.scalar(select(RequestModel).where(RequestModel.id == request_id))
 
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
@@ -110,10 +126,9 @@ async def convert_request_to_workorder(request_id: str, db: Session = Depends(ge
     # Calculate dueDate: if preferredDate exists, set dueDate to 7 days after preferredDate
     # Otherwise use current date
     if request.preferred_date:
-        preferred = datetime.strptime(request.preferred_date, "%Y-%m-%d")
-        due_date = (preferred + timedelta(days=7)).strftime("%Y-%m-%d")
+        due_date = request.preferred_date + timedelta(days=7)
     else:
-        due_date = get_current_datetime().split("T")[0]
+        due_date = date.today()
 
     # Parse location_data if it exists
     location_data = None
@@ -138,6 +153,6 @@ async def convert_request_to_workorder(request_id: str, db: Session = Depends(ge
     new_wo = await create_workorder_internal(wo_data, db)
 
     request.status = "Converted to WO"
-    db.commit()
+    await db.commit()
 
     return new_wo
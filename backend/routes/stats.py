@@ -0,0 +1,105 @@
+"""
+Dashboard statistics routes
+"""
+
+import json
+import os
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+from db import get_read_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.json_response import JSONBytesResponse
+from utils.workorder_history import load_workorder_analytics
+from utils.workorder_rollups import load_trends
+from utils.workorder_stats import load_workorder_stats, stats_cache
+
+TRENDS_MAX_DAYS = int(os.getenv("TRENDS_MAX_DAYS", "731"))
+ANALYTICS_MAX_DAYS = int(os.getenv("ANALYTICS_MAX_DAYS", "366"))
+
+router = APIRouter(prefix="/api/stats", tags=["Statistics"])
+
+
+@router.get("/workorders")
+async def get_workorder_stats(db: AsyncSession = Depends(get_read_db)):
+    """
+    Work order KPIs for the dashboard: totals, counts by status and priority,
+    overdue and open work per technician.
+    """
+    today = date.today()
+    body = stats_cache.get(today.isoformat())
+    if body is None:
+        stats = await load_workorder_stats(db, today)
+        body = _encode(stats)
+        stats_cache.put(today.isoformat(), body)
+    return JSONBytesResponse(body)
+
+
+@router.get("/workorders/trends")
+async def get_workorder_trends(
+    start: Optional[date] = Query(
+        default=None, description="First day (YYYY-MM-DD); default 12 months ago"
+    ),
+    end: Optional[date] = Query(default=None, description="Last day; default today"),
+    groupBy: Optional[Literal["priority", "location"]] = Query(
+        default=None, description="One series per priority or location"
+    ),
+    priority: Optional[str] = Query(default=None),
+    location: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Created, completed, closed, canceled and deleted work orders and the
+    backlog per day, read from the daily rollups.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=364)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= TRENDS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {TRENDS_MAX_DAYS} days per request"
+        )
+
+    series = await load_trends(db, start, end, groupBy, priority, location)
+    return JSONBytesResponse(
+        _encode(
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "groupBy": groupBy,
+                "series": series,
+            }
+        )
+    )
+
+
+@router.get("/workorders/analytics")
+async def get_workorder_analytics(
+    start: Optional[date] = Query(
+        default=None, description="First day (YYYY-MM-DD); default 90 days ago"
+    ),
+    end: Optional[date] = Query(default=None, description="Last day; default today"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    MTTR, time-in-status percentiles and rejection rates, overall and per
+    technician and asset, from the work order status history.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days >= ANALYTICS_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {ANALYTICS_MAX_DAYS} days per request"
+        )
+
+    analytics = await load_workorder_analytics(db, start, end)
+    return JSONBytesResponse(_encode(analytics))
+
+
+def _encode(payload: dict) -> bytes:
+    # Same JSON as FastAPI's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
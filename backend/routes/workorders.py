@@ -1,21 +1,52 @@
-from datetime import datetime
-from typing import List, Optional
+import os
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
-from db import get_db
+from db import get_db, get_read_db
 from db.models import WorkOrder as WorkOrderModel
 from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
-from schemas import TechnicianUpdate, WorkOrder, WorkOrderCreate, WorkOrderUpdate
-from sqlalchemy.orm import Session
+from schemas import (
+    AnnotatedWorkOrder,
+    BulkTransitionRequest,
+    BulkTransitionResponse,
+    TechnicianUpdate,
+    WorkOrder,
+    WorkOrderCreate,
+    WorkOrderUpdate,
+)
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.json_response import rows_response, stream_rows_response
+from utils.workflow_notifications import enqueue_workflow_notifications
 from utils.workflow_rules import (
     get_work_order_permissions,
     is_transition_allowed,
     validate_status_transition,
+    work_order_annotation,
+)
+from utils.image_refs import delete_image_refs, sync_image_refs
+from utils.workorder_history import history_event, record_history
+from utils.workorder_rollups import (
+    deletion_events,
+    record_events,
+    status_events,
+    workorder_event,
+)
+from utils.workorder_stats import apply_stats_changes, stats_key
+from utils.workorder_transitions import (
+    BULK_TRANSITION_MAX_IDS,
+    apply_transition,
+    bulk_transition,
+    current_workorder,
 )
 
 from utils import generate_id, get_current_date
 
 
+WORKORDER_PAGE_MAX = int(os.getenv("WORKORDER_PAGE_MAX", "500"))
+
+
 class AdminRejectData(BaseModel):
     rejectionReason: str
 
@@ -23,36 +54,41 @@ class AdminRejectData(BaseModel):
 router = APIRouter(prefix="/api/workorders", tags=["Work Orders"])
 
 
-async def create_workorder_internal(wo: WorkOrderCreate, db: Session) -> WorkOrder:
+async def create_workorder_internal(wo: WorkOrderCreate, db: AsyncSession) -> WorkOrder:
     """Internal function to create work order, used by both POST endpoint and request conversion"""
     wo_id = generate_id("WO")
 
-    new_wo = WorkOrderModel(
-        id=wo_id,
-        title=wo.title,
-        description=wo.description,
-        asset_name=wo.assetName,
-        location=wo.location,
-        priority=wo.priority,
-        status=wo.status,
-        assigned_to=wo.assignedTo,
-        due_date=wo.dueDate,
-        image_ids=wo.imageIds,
-        request_id=wo.requestId,
-        created_by=wo.createdBy,  # Store who created this WO
-        location_data=wo.locationData.dict() if wo.locationData else None,
-        preferred_date=wo.preferredDate,
+    new_wo = await db.scalar(
+        insert(WorkOrderModel)
+        .values(
+            id=wo_id,
+            title=wo.title,
+            description=wo.description,
+            asset_name=wo.assetName,
+            location=wo.location,
+            priority=wo.priority,
+            status=wo.status,
+            assigned_to=wo.assignedTo,
+            due_date=wo.dueDate,
+            image_ids=wo.imageIds,
+            request_id=wo.requestId,
+            created_by=wo.createdBy,  # Store who created this WO
+            location_data=wo.locationData.dict() if wo.locationData else None,
+            preferred_date=wo.preferredDate,
+        )
+        .returning(WorkOrderModel)
     )
-
-    db.add(new_wo)
-    db.commit()
-    db.refresh(new_wo)
+    await apply_stats_changes(db, [(None, stats_key(new_wo))])
+    await record_events(db, [workorder_event("created", new_wo)])
+    record_history(db, [history_event(new_wo, None, wo.createdBy)])
+    await sync_image_refs(db, "workorder", wo_id, {"image": new_wo.image_ids})
+    await db.commit()
 
     return WorkOrder.model_validate(new_wo)
 
 
 @router.post("", response_model=WorkOrder)
-async def create_workorder(wo: WorkOrderCreate, db: Session = Depends(get_db)):
+async def create_workorder(wo: WorkOrderCreate, db: AsyncSession = Depends(get_db)):
     """Create a new work order"""
     return await create_workorder_internal(wo, db)
 
@@ -71,36 +107,106 @@ async def list_workorders(
     assignedTo: Optional[str] = Query(
         default=None, description="Filter by assigned technician name"
     ),
-    db: Session = Depends(get_db),
+    dueFrom: Optional[date] = Query(
+        default=None, description="Filter by dueDate >= dueFrom (YYYY-MM-DD)"
+    ),
+    dueTo: Optional[date] = Query(
+        default=None, description="Filter by dueDate <= dueTo (YYYY-MM-DD)"
+    ),
+    stream: bool = Query(
+        default=False, description="Stream the JSON array in batches (for exports)"
+    ),
+    annotate: bool = Query(
+        default=False,
+        description="Add permissions and allowedNextStatuses for the X-User-Role user",
+    ),
+    limit: Optional[int] = Query(
+        default=None,
+        ge=1,
+        le=WORKORDER_PAGE_MAX,
+        description="Page size; the next page is at before=X-Next-Cursor",
+    ),
+    before: Optional[str] = Query(
+        default=None, description="Only work orders with an older id (page cursor)"
+    ),
+    sortBy: Literal["createdAt", "priority"] = Query(
+        default="createdAt",
+        description="createdAt (newest first) or priority (most urgent first)",
+    ),
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
+    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List work orders with optional filtering and search"""
-    query = db.query(WorkOrderModel)
+    model, annotator = WorkOrder, None
+    if annotate:
+        if not x_user_role:
+            raise HTTPException(
+                status_code=400, detail="X-User-Role is required with annotate"
+            )
+
+        def annotator(row) -> dict:
+            return work_order_annotation(
+                row["status"], x_user_role, row["assigned_to"], x_user_name
+            )
+
+        model = AnnotatedWorkOrder
+
+    query = select(WorkOrderModel.__table__)
 
     if search:
         s = f"%{search.lower()}%"
-        query = query.filter(
+        query = query.where(
             (WorkOrderModel.title.ilike(s)) | (WorkOrderModel.description.ilike(s))
         )
 
     if assignedTo:
-        query = query.filter(WorkOrderModel.assigned_to == assignedTo)
+        query = query.where(WorkOrderModel.assigned_to == assignedTo)
 
     if startDate:
         start_dt = datetime.strptime(startDate, "%Y-%m-%d")
-        query = query.filter(WorkOrderModel.created_at >= start_dt)
+        query = query.where(WorkOrderModel.created_at >= start_dt)
 
     if endDate:
         end_dt = datetime.strptime(endDate, "%Y-%m-%d")
-        query = query.filter(WorkOrderModel.created_at <= end_dt)
+        query = query.where(WorkOrderModel.created_at <= end_dt)
+
+    if dueFrom:
+        query = query.where(WorkOrderModel.due_date >= dueFrom)
+
+    if dueTo:
+        query = query.where(WorkOrderModel.due_date <= dueTo)
+
+    if before:
+        query = query.where(WorkOrderModel.id < before)
 
-    workorders = query.order_by(WorkOrderModel.created_at.desc()).all()
-    return [WorkOrder.model_validate(wo) for wo in workorders]
+    if limit is None and sortBy == "priority":
+        # Priority codes follow the rank, Critical highest
+        query = query.order_by(
+            WorkOrderModel.priority.desc(), WorkOrderModel.created_at.desc()
+        )
+    elif limit is None:
+        query = query.order_by(WorkOrderModel.created_at.desc())
+    elif sortBy != "createdAt":
+        raise HTTPException(
+            status_code=400, detail="Pages with limit are sorted by id (createdAt)"
+        )
+    else:
+        # IDs are time-ordered, so pages are keyset ranges of the primary key
+        query = query.order_by(WorkOrderModel.id.desc()).limit(limit)
+    if stream:
+        return stream_rows_response(model, db.bind, query, annotate=annotator)
+    rows = (await db.execute(query)).mappings().all()
+    response = rows_response(model, rows, annotate=annotator)
+    if limit is not None and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = rows[-1]["id"]
+    return response
 
 
 @router.get("/{wo_id}", response_model=WorkOrder)
-async def get_workorder(wo_id: str, db: Session = Depends(get_db)):
+async def get_workorder(wo_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get a specific work order"""
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
+    wo = await db.scalar(select(WorkOrderModel).where(WorkOrderModel.id == wo_id))
 
     if not wo:
         raise HTTPException(status_code=404, detail="Work order not found")
@@ -114,13 +220,13 @@ async def update_workorder(
     updates: WorkOrderUpdate,
     x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
     x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update a work order with workflow validation"""
     user_role = x_user_role or "Admin"
     user_name = x_user_name or "Unknown"
 
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
+    wo = await db.scalar(select(WorkOrderModel).where(WorkOrderModel.id == wo_id))
 
     if not wo:
         raise HTTPException(status_code=404, detail="Work order not found")
@@ -168,6 +274,10 @@ async def update_workorder(
         "preferredDate": "preferred_date",
     }
 
+    previous_assignee = wo.assigned_to
+    previous_key = stats_key(wo)
+    previous_status = wo.status
+
     for api_key, db_key in field_mapping.items():
         if api_key in update_data:
             value = update_data[api_key]
@@ -175,69 +285,120 @@ async def update_workorder(
                 value = value.dict() if hasattr(value, "dict") else value
             setattr(wo, db_key, value)
 
-    db.commit()
-    db.refresh(wo)
+    if wo.assigned_to and wo.assigned_to != previous_assignee:
+        enqueue_workflow_notifications(db, wo, "assigned", user_name)
+
+    await apply_stats_changes(db, [(previous_key, stats_key(wo))])
+    await record_events(db, status_events(wo, previous_status))
+    record_history(db, [history_event(wo, previous_status, user_name)])
+    if "imageIds" in update_data:
+        await sync_image_refs(db, "workorder", wo.id, {"image": wo.image_ids})
+    await db.commit()
+    await db.refresh(wo)
 
     return WorkOrder.model_validate(wo)
 
 
 @router.delete("/{wo_id}")
-async def delete_workorder(wo_id: str, db: Session = Depends(get_db)):
+async def delete_workorder(wo_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a work order"""
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
+    wo = await db.scalar(select(WorkOrderModel).where(WorkOrderModel.id == wo_id))
 
     if wo:
-        db.delete(wo)
-        db.commit()
+        await apply_stats_changes(db, [(stats_key(wo), None)])
+        await record_events(db, deletion_events(wo))
+        await delete_image_refs(db, "workorder", wo.id)
+        await db.delete(wo)
+        await db.commit()
 
     return {"message": "Work order deleted"}
 
 
-@router.patch("/{wo_id}/technician-update", response_model=WorkOrder)
-async def technician_update_workorder(
+async def _transition_error(
+    db: AsyncSession,
     wo_id: str,
-    technician_update: TechnicianUpdate,
-    x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
-    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
-    db: Session = Depends(get_db),
-):
-    """Update work order by technician with notes and images, moves status to Pending"""
-    user_role = x_user_role or "Technician"
-    user_name = x_user_name or "Unknown"
-
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
+    from_status: str,
+    to_status: str,
+    user_role: str,
+    status_detail: str,
+    assignee: Optional[str] = None,
+) -> HTTPException:
+    """Why a conditional transition matched no row, in the handlers' check order"""
+    wo = await current_workorder(db, wo_id)
 
     if not wo:
-        raise HTTPException(status_code=404, detail="Work order not found")
-
-    current_status = wo.status
+        return HTTPException(status_code=404, detail="Work order not found")
 
-    if current_status != "In Progress":
-        raise HTTPException(
-            status_code=403,
-            detail=f"Technician updates only allowed when status is 'In Progress', current status: '{current_status}'",
+    if wo.status != from_status:
+        return HTTPException(
+            status_code=403, detail=status_detail.format(current=wo.status)
         )
 
-    if wo.assigned_to != user_name and user_role == "Technician":
-        raise HTTPException(
+    if assignee is not None and wo.assigned_to != assignee:
+        return HTTPException(
             status_code=403,
             detail="Technician can only update work orders assigned to them",
         )
 
     try:
-        validate_status_transition(current_status, "Pending", user_role)
+        validate_status_transition(from_status, to_status, user_role)
     except ValueError as e:
-        raise HTTPException(status_code=403, detail=str(e))
+        return HTTPException(status_code=403, detail=str(e))
 
-    wo.technician_notes = technician_update.technicianNotes
-    wo.technician_images = technician_update.technicianImages
-    wo.status = "Pending"
+    # The row matches now, so it changed between the UPDATE and this read
+    return HTTPException(
+        status_code=409, detail="Work order was modified concurrently, please retry"
+    )
+
+
+@router.patch("/{wo_id}/technician-update", response_model=WorkOrder)
+async def technician_update_workorder(
+    wo_id: str,
+    technician_update: TechnicianUpdate,
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
+    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Update work order by technician with notes and images, moves status to Pending"""
+    user_role = x_user_role or "Technician"
+    user_name = x_user_name or "Unknown"
+    assignee = user_name if user_role == "Technician" else None
 
     # Keep original request images separate from technician images
     # Do NOT merge technicianImages into image_ids
+    wo = None
+    if is_transition_allowed("In Progress", "Pending", user_role):
+        wo = await apply_transition(
+            db,
+            wo_id,
+            "In Progress",
+            {
+                "technician_notes": technician_update.technicianNotes,
+                "technician_images": technician_update.technicianImages,
+                "status": "Pending",
+            },
+            assigned_to=assignee,
+            actor=user_name,
+        )
+
+    if wo is None:
+        raise await _transition_error(
+            db,
+            wo_id,
+            "In Progress",
+            "Pending",
+            user_role,
+            "Technician updates only allowed when status is 'In Progress', "
+            "current status: '{current}'",
+            assignee=assignee,
+        )
+
+    await sync_image_refs(
+        db, "workorder", wo.id, {"technician": wo.technician_images}
+    )
+    enqueue_workflow_notifications(db, wo, "completed", user_name)
 
-    db.commit()
-    db.refresh(wo)
+    await db.commit()
 
     return WorkOrder.model_validate(wo)
 
@@ -247,7 +408,7 @@ async def admin_approve_workorder(
     wo_id: str,
     x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
     x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Head Technician approves work order, changes status from Pending to Completed"""
     user_role = x_user_role or "Head Technician"
@@ -258,30 +419,33 @@ async def admin_approve_workorder(
             status_code=403, detail="Only Head Technician can approve work orders"
         )
 
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
-
-    if not wo:
-        raise HTTPException(status_code=404, detail="Work order not found")
-
-    current_status = wo.status
-
-    if current_status != "Pending":
-        raise HTTPException(
-            status_code=403,
-            detail=f"Can only approve work orders in 'Pending' status, current: '{current_status}'",
+    wo = None
+    if is_transition_allowed("Pending", "Completed", user_role):
+        wo = await apply_transition(
+            db,
+            wo_id,
+            "Pending",
+            {
+                "status": "Completed",
+                "approved_by": user_name,
+                "approved_at": datetime.now(),
+            },
+            actor=user_name,
         )
 
-    try:
-        validate_status_transition(current_status, "Completed", user_role)
-    except ValueError as e:
-        raise HTTPException(status_code=403, detail=str(e))
+    if wo is None:
+        raise await _transition_error(
+            db,
+            wo_id,
+            "Pending",
+            "Completed",
+            user_role,
+            "Can only approve work orders in 'Pending' status, current: '{current}'",
+        )
 
-    wo.status = "Completed"
-    wo.approved_by = user_name
-    wo.approved_at = datetime.now()
+    enqueue_workflow_notifications(db, wo, "approved", user_name)
 
-    db.commit()
-    db.refresh(wo)
+    await db.commit()
 
     return WorkOrder.model_validate(wo)
 
@@ -292,7 +456,7 @@ async def admin_reject_workorder(
     reject_data: AdminRejectData,
     x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
     x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Head Technician rejects work order with reason, changes status from Pending to In Progress"""
     user_role = x_user_role or "Head Technician"
@@ -303,31 +467,37 @@ async def admin_reject_workorder(
             status_code=403, detail="Only Head Technician can reject work orders"
         )
 
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
-
-    if not wo:
-        raise HTTPException(status_code=404, detail="Work order not found")
-
-    current_status = wo.status
-
-    if current_status != "Pending":
-        raise HTTPException(
-            status_code=403,
-            detail=f"Can only reject work orders in 'Pending' status, current: '{current_status}'",
+    wo = None
+    if is_transition_allowed("Pending", "In Progress", user_role):
+        wo = await apply_transition(
+            db,
+            wo_id,
+            "Pending",
+            {
+                "status": "In Progress",
+                "rejection_reason": reject_data.rejectionReason,
+                "rejected_by": user_name,
+                "rejected_at": datetime.now(),
+            },
+            actor=user_name,
+            reason=reject_data.rejectionReason,
         )
 
-    try:
-        validate_status_transition(current_status, "In Progress", user_role)
-    except ValueError as e:
-        raise HTTPException(status_code=403, detail=str(e))
+    if wo is None:
+        raise await _transition_error(
+            db,
+            wo_id,
+            "Pending",
+            "In Progress",
+            user_role,
+            "Can only reject work orders in 'Pending' status, current: '{current}'",
+        )
 
-    wo.status = "In Progress"
-    wo.rejection_reason = reject_data.rejectionReason
-    wo.rejected_by = user_name
-    wo.rejected_at = datetime.now()
+    enqueue_workflow_notifications(
+        db, wo, "rejected", user_name, reason=reject_data.rejectionReason
+    )
 
-    db.commit()
-    db.refresh(wo)
+    await db.commit()
 
     return WorkOrder.model_validate(wo)
 
@@ -337,7 +507,7 @@ async def admin_close_workorder(
     wo_id: str,
     x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
     x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Admin closes work order, changes status from Completed to Closed"""
     user_role = x_user_role or "Admin"
@@ -346,29 +516,78 @@ async def admin_close_workorder(
     if user_role != "Admin":
         raise HTTPException(status_code=403, detail="Only Admin can close work orders")
 
-    wo = db.query(WorkOrderModel).filter(WorkOrderModel.id == wo_id).first()
+    wo = None
+    if is_transition_allowed("Completed", "Closed", user_role):
+        wo = await apply_transition(
+            db,
+            wo_id,
+            "Completed",
+            {"status": "Closed", "closed_by": user_name, "closed_at": datetime.now()},
+            actor=user_name,
+        )
 
-    if not wo:
-        raise HTTPException(status_code=404, detail="Work order not found")
+    if wo is None:
+        raise await _transition_error(
+            db,
+            wo_id,
+            "Completed",
+            "Closed",
+            user_role,
+            "Can only close work orders in 'Completed' status, current: '{current}'",
+        )
 
-    current_status = wo.status
+    enqueue_workflow_notifications(db, wo, "closed", user_name)
 
-    if current_status != "Completed":
-        raise HTTPException(
-            status_code=403,
-            detail=f"Can only close work orders in 'Completed' status, current: '{current_status}'",
-        )
+    await db.commit()
 
-    try:
-        validate_status_transition(current_status, "Closed", user_role)
-    except ValueError as e:
-        raise HTTPException(status_code=403, detail=str(e))
+    return WorkOrder.model_validate(wo)
 
-    wo.status = "Closed"
-    wo.closed_by = user_name
-    wo.closed_at = datetime.now()
 
-    db.commit()
-    db.refresh(wo)
+@router.post("/bulk-transition", response_model=BulkTransitionResponse)
+async def bulk_transition_workorders(
+    body: BulkTransitionRequest,
+    x_user_role: Optional[str] = Header(None, alias="X-User-Role"),
+    x_user_name: Optional[str] = Header(None, alias="X-User-Name"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Approve, reject, close or reassign many work orders in one transaction.
 
-    return WorkOrder.model_validate(wo)
+    Every work order is checked against the workflow rules; the ones that
+    pass are updated and the others are reported with the reason, one
+    result per ID.
+    """
+    user_role = x_user_role or "Admin"
+    user_name = x_user_name or "Unknown"
+
+    if body.action == "reject" and not body.rejectionReason:
+        raise HTTPException(status_code=400, detail="rejectionReason is required")
+    if body.action == "reassign" and not body.assignedTo:
+        raise HTTPException(status_code=400, detail="assignedTo is required")
+    if body.fromAssignee and body.action != "reassign":
+        raise HTTPException(
+            status_code=400, detail="fromAssignee is only supported for reassign"
+        )
+    if len(body.ids) > BULK_TRANSITION_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {BULK_TRANSITION_MAX_IDS} work orders per request",
+        )
+
+    results = await bulk_transition(
+        db,
+        body.action,
+        body.ids,
+        user_role,
+        user_name,
+        reason=body.rejectionReason,
+        assignee=body.assignedTo,
+        from_assignee=body.fromAssignee,
+    )
+    await db.commit()
+
+    return {
+        "action": body.action,
+        "updated": sum(result["ok"] for result in results),
+        "results": results,
+    }
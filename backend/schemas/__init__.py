@@ -1,5 +1,15 @@
 from .request import RequestCreate, RequestItem, RequestUpdate, LocationData
-from .workorder import WorkOrderCreate, WorkOrder, WorkOrderUpdate, TechnicianUpdate
+from .workorder import (
+    WorkOrderCreate,
+    WorkOrder,
+    AnnotatedWorkOrder,
+    WorkOrderPermissionsInfo,
+    WorkOrderUpdate,
+    TechnicianUpdate,
+    BulkTransitionRequest,
+    BulkTransitionResult,
+    BulkTransitionResponse,
+)
 from .image import ImageInfo
 from .notification import NotificationCreate, Notification
 
@@ -10,8 +20,13 @@ __all__ = [
     "RequestUpdate",
     "WorkOrderCreate",
     "WorkOrder",
+    "AnnotatedWorkOrder",
+    "WorkOrderPermissionsInfo",
     "WorkOrderUpdate",
     "TechnicianUpdate",
+    "BulkTransitionRequest",
+    "BulkTransitionResult",
+    "BulkTransitionResponse",
     "ImageInfo",
     "NotificationCreate",
     "Notification",
@@ -1,19 +1,27 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class NotificationCreate(BaseModel):
     type: str
     workOrderId: str
     workOrderTitle: str
-    message: str
+    message: Optional[str] = None  # Legacy pre-rendered text
+    messageKey: Optional[str] = None  # Template key, e.g. "notif.woClosed"
+    messageParams: Optional[Dict[str, str]] = None  # Template parameters
     recipientRole: str
     recipientName: Optional[str] = None
     isRead: bool = False
     triggeredBy: str
 
+    @model_validator(mode="after")
+    def require_message_or_key(self) -> "NotificationCreate":
+        if not self.message and not self.messageKey:
+            raise ValueError("Either message or messageKey is required")
+        return self
+
 
 class Notification(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -22,7 +30,11 @@ class Notification(BaseModel):
     type: str
     workOrderId: str = Field(validation_alias="work_order_id")
     workOrderTitle: str = Field(validation_alias="work_order_title")
-    message: str
+    message: Optional[str] = None  # Rendered for the requested locale
+    messageKey: Optional[str] = Field(default=None, validation_alias="message_key")
+    messageParams: Optional[Dict[str, str]] = Field(
+        default=None, validation_alias="message_params"
+    )
     recipientRole: str = Field(validation_alias="recipient_role")
     recipientName: Optional[str] = Field(
         default=None, validation_alias="recipient_name"
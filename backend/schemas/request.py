@@ -1,7 +1,33 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Annotated, Any, Iterable, List, Optional
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, Field
+
+from utils.workflow_rules import PRIORITY_CODES, REQUEST_STATUS_CODES
+
+
+def _empty_to_none(value: Any) -> Any:
+    return None if value == "" else value
+
+
+# YYYY-MM-DD on the wire, a DATE column in the database; "" means no date
+OptionalDate = Annotated[Optional[date], BeforeValidator(_empty_to_none)]
+
+
+def one_of(values: Iterable[str]) -> AfterValidator:
+    """Accept only the values a coded status/priority column can store"""
+    allowed = tuple(values)
+
+    def check(value: str) -> str:
+        if value not in allowed:
+            raise ValueError(f"must be one of: {', '.join(allowed)}")
+        return value
+
+    return AfterValidator(check)
+
+
+PriorityValue = Annotated[str, one_of(PRIORITY_CODES)]
+RequestStatusValue = Annotated[str, one_of(REQUEST_STATUS_CODES)]
 
 
 class LocationData(BaseModel):
@@ -13,15 +39,13 @@ class LocationData(BaseModel):
 
 class RequestCreate(BaseModel):
     location: str
-    priority: str
+    priority: PriorityValue
     description: str
     imageIds: List[str] = []
     assignedTo: Optional[str] = None  # Technician assigned to this request
     createdBy: Optional[str] = None  # User who created this request
     locationData: Optional[LocationData] = None  # GPS location data
-    preferredDate: Optional[str] = (
-        None  # Preferred date for maintenance visit (YYYY-MM-DD)
-    )
+    preferredDate: OptionalDate = None  # Preferred date for maintenance visit
 
 
 class RequestItem(BaseModel):
@@ -39,15 +63,15 @@ class RequestItem(BaseModel):
     locationData: Optional[LocationData] = Field(
         default=None, validation_alias="location_data"
     )
-    preferredDate: Optional[str] = Field(
+    preferredDate: OptionalDate = Field(
         default=None, validation_alias="preferred_date"
     )
 
 
 class RequestUpdate(BaseModel):
-    status: Optional[str] = None
-    priority: Optional[str] = None
+    status: Optional[RequestStatusValue] = None
+    priority: Optional[PriorityValue] = None
     description: Optional[str] = None
     assignedTo: Optional[str] = None
     locationData: Optional[LocationData] = None
-    preferredDate: Optional[str] = None  # Preferred date for maintenance visit
+    preferredDate: OptionalDate = None  # Preferred date for maintenance visit
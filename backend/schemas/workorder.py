@@ -1,9 +1,13 @@
-from datetime import datetime
-from typing import List, Optional
+from datetime import date, datetime
+from typing import Annotated, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, field_serializer
 
-from .request import LocationData
+from utils.workflow_rules import STATUS_CODES
+
+from .request import LocationData, OptionalDate, PriorityValue, one_of
+
+StatusValue = Annotated[str, one_of(STATUS_CODES)]
 
 
 class WorkOrderCreate(BaseModel):
@@ -11,15 +15,15 @@ class WorkOrderCreate(BaseModel):
     description: str
     assetName: str
     location: str
-    priority: str
-    status: str = "Open"
+    priority: PriorityValue
+    status: StatusValue = "Open"
     assignedTo: Optional[str] = None
-    dueDate: str
+    dueDate: OptionalDate  # "" from an empty date input is stored as no date
     imageIds: List[str] = []
     requestId: Optional[str] = None
     createdBy: Optional[str] = None  # Name of the requester who created this WO
     locationData: Optional[LocationData] = None
-    preferredDate: Optional[str] = None  # Preferred maintenance date from request
+    preferredDate: OptionalDate = None  # Preferred maintenance date from request
 
 
 class WorkOrder(BaseModel):
@@ -33,7 +37,7 @@ class WorkOrder(BaseModel):
     priority: str
     status: str
     assignedTo: Optional[str] = Field(default=None, validation_alias="assigned_to")
-    dueDate: Optional[str] = Field(default=None, validation_alias="due_date")
+    dueDate: Optional[date] = Field(default=None, validation_alias="due_date")
     createdAt: Optional[datetime] = Field(default=None, validation_alias="created_at")
     imageIds: List[str] = Field(default_factory=list, validation_alias="image_ids")
     requestId: Optional[str] = Field(default=None, validation_alias="request_id")
@@ -48,7 +52,7 @@ class WorkOrder(BaseModel):
     locationData: Optional[LocationData] = Field(
         default=None, validation_alias="location_data"
     )
-    preferredDate: Optional[str] = Field(
+    preferredDate: Optional[date] = Field(
         default=None, validation_alias="preferred_date"
     )
     approvedBy: Optional[str] = Field(default=None, validation_alias="approved_by")
@@ -69,22 +73,59 @@ class WorkOrder(BaseModel):
         return value.strftime("%Y-%m-%d")
 
 
+class WorkOrderPermissionsInfo(BaseModel):
+    canEdit: bool
+    canChangeStatus: bool
+    canAssign: bool
+    canDelete: bool
+    canView: bool
+
+
+class AnnotatedWorkOrder(WorkOrder):
+    """Work order with what the requesting user may do with it (?annotate=1)"""
+
+    permissions: WorkOrderPermissionsInfo
+    allowedNextStatuses: List[str]
+
+
 class WorkOrderUpdate(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     assetName: Optional[str] = None
     location: Optional[str] = None
-    priority: Optional[str] = None
-    status: Optional[str] = None
+    priority: Optional[PriorityValue] = None
+    status: Optional[StatusValue] = None
     assignedTo: Optional[str] = None
-    dueDate: Optional[str] = None
+    dueDate: OptionalDate = None
     imageIds: Optional[List[str]] = None
     adminReview: Optional[str] = None
     locationData: Optional[LocationData] = None
-    preferredDate: Optional[str] = None  # Preferred maintenance date
+    preferredDate: OptionalDate = None  # Preferred maintenance date
 
 
 class TechnicianUpdate(BaseModel):
     technicianNotes: str
     technicianImages: List[str] = []
     status: str = "Pending"  # Default to Pending when technician submits update
+
+
+class BulkTransitionRequest(BaseModel):
+    action: Literal["approve", "reject", "close", "reassign"]
+    ids: List[str] = []
+    rejectionReason: Optional[str] = None  # reject
+    assignedTo: Optional[str] = None  # reassign: new technician
+    # reassign: take all open work of this technician instead of ids
+    fromAssignee: Optional[str] = None
+
+
+class BulkTransitionResult(BaseModel):
+    id: str
+    ok: bool
+    status: Optional[str] = None  # Status after the action (current one if it failed)
+    error: Optional[str] = None
+
+
+class BulkTransitionResponse(BaseModel):
+    action: str
+    updated: int
+    results: List[BulkTransitionResult]
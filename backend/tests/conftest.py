@@ -1,35 +1,54 @@
 import os
 import shutil
 import tempfile
-from typing import Generator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Generator, List
 
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
+
+# The reminder scheduler is exercised directly in test_scheduler.py
+os.environ.setdefault("REMINDER_SCHEDULER_ENABLED", "0")
+os.environ.setdefault("NOTIFICATION_RETENTION_ENABLED", "0")
 
 from db.base import Base
 from db import get_db as real_get_db
+from db import get_sync_db as real_get_sync_db
+from db import query_stats
 from utils import PICTURES_DIR
 
 from main import app
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# A temporary SQLite file shared by the app's async engine (aiosqlite) and the
+# sync engine tests use to seed and inspect data directly.
+TEST_DB_DIR = tempfile.mkdtemp(prefix="test_db_")
+TEST_DB_PATH = os.path.join(TEST_DB_DIR, "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{TEST_DB_PATH}"
 
-# Use StaticPool so all sessions share the same in-memory database connection.
-# Otherwise each connection would see its own empty database, causing "no such table" errors.
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: aiosqlite connections must not outlive the TestClient event loop
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool
+)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+query_stats.instrument_queries(engine)
+query_stats.instrument_queries(async_engine.sync_engine)
+
 
 @pytest.fixture(scope="session", autouse=True)
 def create_test_db() -> Generator[None, None, None]:
-    """Create all tables in the in-memory SQLite database for the test session."""
+    """Create all tables in the temporary SQLite database for the test session."""
     # Import models so they are registered with Base.metadata
     from db import models as _models  # noqa: F401
 
@@ -38,10 +57,18 @@ def create_test_db() -> Generator[None, None, None]:
         yield
     finally:
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        shutil.rmtree(TEST_DB_DIR, ignore_errors=True)
+
+
+async def override_get_db() -> AsyncGenerator:
+    """Yield an AsyncSession for FastAPI dependency override."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
 
 
-def override_get_db() -> Generator:
-    """Yield a database session for FastAPI dependency override."""
+def override_get_sync_db() -> Generator:
+    """Yield a sync session for FastAPI dependency override."""
     db = TestingSessionLocal()
     try:
         yield db
@@ -81,6 +108,49 @@ def client(
     Provide a TestClient with the test database and temporary pictures directory.
     """
     app.dependency_overrides[real_get_db] = override_get_db
+    app.dependency_overrides[real_get_sync_db] = override_get_sync_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert how many SQL statements the requests made inside the block run.
+
+        with query_budget(2):
+            client.get("/api/workorders")
+
+    Fails when the total exceeds max_queries, or when a statement shape
+    repeats more than n_plus_one_threshold times (likely N+1) unless
+    allow_n_plus_one is set. Yields the list of per-request stats.
+    """
+
+    @contextmanager
+    def budget(
+        max_queries: int,
+        n_plus_one_threshold: int = query_stats.SQL_N_PLUS_ONE_THRESHOLD,
+        allow_n_plus_one: bool = False,
+    ):
+        recorded: List[query_stats.RequestQueryStats] = []
+        query_stats.REQUEST_STATS_HOOKS.append(recorded.append)
+        try:
+            yield recorded
+        finally:
+            query_stats.REQUEST_STATS_HOOKS.remove(recorded.append)
+
+        total = sum(stats.count for stats in recorded)
+        assert total <= max_queries, (
+            f"{total} queries exceed the budget of {max_queries}: "
+            f"{[stats.as_log_record() for stats in recorded]}"
+        )
+        if not allow_n_plus_one:
+            suspects = [
+                suspect
+                for stats in recorded
+                for suspect in stats.n_plus_one(n_plus_one_threshold)
+            ]
+            assert not suspects, f"Likely N+1 queries: {suspects}"
+
+    return budget
@@ -0,0 +1,128 @@
+import gzip
+import threading
+
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from middleware import compression
+from middleware.compression import (
+    CompressedCache,
+    CompressionMiddleware,
+    choose_encoding,
+)
+
+ITEM = '{"title":"งานซ่อมปั๊มน้ำ","status":"Open"}'
+PAYLOAD = ("[" + ",".join([ITEM] * 200) + "]").encode()
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+def _client(cache: CompressedCache, thread_min_size: int = 1 << 30) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    async def big():
+        return Response(PAYLOAD, media_type="application/json")
+
+    @app.get("/small")
+    async def small():
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    @app.get("/image")
+    async def image():
+        return Response(PAYLOAD, media_type="image/png")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield PAYLOAD
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    return TestClient(
+        CompressionMiddleware(
+            app, min_size=1024, thread_min_size=thread_min_size, cache=cache
+        )
+    )
+
+
+def test_choose_encoding():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, deflate") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    preferred = "br" if compression.brotli else "gzip"
+    assert choose_encoding("br;q=1.0, gzip;q=0.5") == preferred
+
+
+def test_large_json_is_gzipped_and_small_or_binary_is_not():
+    client = _client(CompressedCache())
+
+    resp = client.get("/big", headers=GZIP)
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert int(resp.headers["content-length"]) < len(PAYLOAD) / 5
+    assert resp.content == PAYLOAD  # decoded by the client
+
+    for path, headers in (
+        ("/small", GZIP),
+        ("/image", GZIP),
+        ("/big", {"Accept-Encoding": "identity"}),
+    ):
+        assert "content-encoding" not in client.get(path, headers=headers).headers
+
+
+def test_etag_304_and_compressed_cache(monkeypatch):
+    calls = []
+    real_compress = compression.compress
+
+    def counting_compress(body, encoding):
+        calls.append(threading.current_thread().name)
+        return real_compress(body, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+    cache = CompressedCache()
+    client = _client(cache, thread_min_size=1024)
+
+    first = client.get("/big", headers=GZIP)
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    second = client.get("/big", headers=GZIP)
+    assert second.headers["etag"] == etag
+    assert second.content == PAYLOAD
+    # Compressed once, off the event loop thread; the repeat poll hit the cache
+    assert len(calls) == 1
+    assert calls[0] != threading.main_thread().name
+    assert cache.hits == 1
+
+    not_modified = client.get("/big", headers={**GZIP, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_streamed_json_is_compressed_incrementally():
+    client = _client(CompressedCache())
+    with client.stream("GET", "/stream", headers=GZIP) as resp:
+        assert resp.headers["content-encoding"] == "gzip"
+        assert "etag" not in resp.headers
+        raw = b"".join(resp.iter_raw())
+    assert gzip.decompress(raw) == PAYLOAD * 3
+
+
+def test_app_lists_are_compressed(client: TestClient):
+    for i in range(8):
+        client.post(
+            "/api/requests",
+            json={
+                "location": "อาคาร A",
+                "priority": "High",
+                "description": f"ท่อน้ำรั่ว {i}",
+            },
+        )
+    resp = client.get("/api/requests", headers=GZIP)
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["etag"]
+    assert isinstance(resp.json(), list)
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from db import pool as pool_module
+from db.pool import POOL_METRICS, engine_options, instrument_pool
+
+
+def test_pool_metrics_track_checkouts_overflow_and_timeouts(tmp_path, monkeypatch):
+    monkeypatch.setattr(pool_module, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(pool_module, "DB_MAX_OVERFLOW", 1)
+    monkeypatch.setattr(pool_module, "DB_POOL_TIMEOUT", 0.05)
+
+    url = f"sqlite:///{os.path.join(tmp_path, 'pool.db')}"
+    engine = create_engine(url, **engine_options(url, "test-pool"))
+    metrics = instrument_pool(engine, "test-pool")
+    try:
+        first = engine.connect()
+        first.execute(text("SELECT 1"))
+        second = engine.connect()  # overflow connection
+
+        snapshot = metrics.snapshot()
+        assert snapshot["size"] == 1
+        assert snapshot["inUse"] == 2
+        assert snapshot["overflow"] == 1
+        assert snapshot["overflowCheckouts"] == 1
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+        first.close()
+        second.close()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["timeouts"] == 1
+        assert snapshot["checkouts"] == 2
+        assert snapshot["checkins"] == 2
+        assert snapshot["inUse"] == 0
+        assert snapshot["checkoutWaitMs"]["max"] >= 50
+    finally:
+        engine.dispose()
+        POOL_METRICS.pop("test-pool", None)
+
+
+def test_db_pool_metrics_endpoint(client):
+    resp = client.get("/api/metrics/db-pool")
+    assert resp.status_code == 200
+    names = {pool["name"] for pool in resp.json()["pools"]}
+    assert {"primary", "primary-async"} <= names
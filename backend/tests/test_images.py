@@ -99,3 +99,83 @@ def test_delete_image(client: TestClient, tmp_path: Path):
     # Subsequent get should 404
     get_resp = client.get(f"/api/images/{image_id}")
     assert get_resp.status_code == 404
+
+
+def _upload(client: TestClient, name: str) -> str:
+    payload = {
+        "originalName": name,
+        "base64Data": base64.b64encode(name.encode()).decode(),
+    }
+    return client.post("/api/images/upload-base64", json=payload).json()["id"]
+
+
+def test_gc_deletes_old_unreferenced_images(client: TestClient, tmp_path, monkeypatch):
+    from db.models import Image as ImageModel
+    from utils import image_refs
+    from utils.image_refs import gc_images
+
+    from tests.conftest import TestingSessionLocal, engine
+
+    kept = _upload(client, "kept.jpg")
+    client.post(
+        "/api/requests",
+        json={
+            "location": "Lobby",
+            "priority": "Low",
+            "description": "Door",
+            "imageIds": [kept],
+        },
+    )
+    recent = _upload(client, "recent.jpg")
+    with TestingSessionLocal() as db:
+        for image_id in ("IMG-gc-orphan", kept):
+            image = db.get(ImageModel, image_id) or ImageModel(
+                id=image_id,
+                original_name="old.jpg",
+                base64_data="AA==",
+                filename="orphan.jpg",
+            )
+            image.created_at = datetime(2020, 1, 1)
+            db.add(image)
+        db.commit()
+    monkeypatch.setattr(image_refs, "PICTURES_DIR", str(tmp_path))
+    (tmp_path / "orphan.jpg").write_bytes(b"jpg")
+
+    assert gc_images(engine) >= 1
+    assert not (tmp_path / "orphan.jpg").exists()
+    assert client.get("/api/images/IMG-gc-orphan").status_code == 404
+    assert client.get(f"/api/images/{kept}").status_code == 200
+    assert client.get(f"/api/images/{recent}").status_code == 200
+
+
+def test_gc_waits_for_image_refs_backfill(client: TestClient):
+    from db.models import Image as ImageModel
+    from db.models import ImageRef
+    from sqlalchemy import delete
+    from utils.image_refs import backfill_image_refs, gc_images
+
+    from tests.conftest import TestingSessionLocal, engine
+
+    image_id = _upload(client, "legacy.jpg")
+    client.post(
+        "/api/requests",
+        json={
+            "location": "Lobby",
+            "priority": "Low",
+            "description": "Legacy",
+            "imageIds": [image_id],
+        },
+    )
+    with TestingSessionLocal() as db:
+        db.get(ImageModel, image_id).created_at = datetime(2020, 1, 1)
+        # As after create_all on a database that predates image_refs
+        db.execute(delete(ImageRef))
+        db.commit()
+
+    assert gc_images(engine) == 0
+    assert backfill_image_refs(engine) >= 1
+    assert backfill_image_refs(engine) == 0
+    gc_images(engine)
+    assert client.get(f"/api/images/{image_id}").status_code == 200
+    owners = client.get(f"/api/images/{image_id}/references").json()
+    assert [owner["ownerType"] for owner in owners] == ["request"]
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+from middleware.http_metrics import HTTP_LATENCY, HTTP_REQUESTS
+
+
+def test_requests_are_labeled_by_route_template(client: TestClient):
+    before = HTTP_REQUESTS.value("GET", "/api/workorders/{wo_id}", "404")
+    latency_before = HTTP_LATENCY.count("GET", "/api/workorders/{wo_id}")
+
+    client.get("/api/workorders/WO-metrics-missing-1")
+    client.get("/api/workorders/WO-metrics-missing-2")
+
+    assert HTTP_REQUESTS.value("GET", "/api/workorders/{wo_id}", "404") == before + 2
+    assert HTTP_LATENCY.count("GET", "/api/workorders/{wo_id}") == latency_before + 2
+
+    client.get("/no-such-path-1")
+    assert HTTP_REQUESTS.value("GET", "unmatched", "404") >= 1
+
+
+def test_metrics_endpoint_prometheus_format(client: TestClient):
+    client.get("/api/health")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    body = resp.text
+    assert "# TYPE http_requests_total counter" in body
+    assert 'http_requests_total{method="GET",route="/api/health",status="200"}' in body
+    assert "# TYPE http_request_duration_seconds histogram" in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/health",le="+Inf"}' in body
+    assert 'http_requests_in_flight{method="GET"} 1' in body
+    assert 'db_pool_checkouts_total{pool="primary"}' in body
+    # Raw IDs never become labels
+    assert "WO-metrics-missing" not in body
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+from db import Notification, NotificationArchive, NotificationOutbox, NotificationRead
+from utils.notification_retention import run_retention
+
+from tests.conftest import TestingSessionLocal
+
+
+def _add_notification(db, notification_id: str, age_days: int, is_read: bool) -> None:
+    db.add(
+        Notification(
+            id=notification_id,
+            type="wo_closed",
+            work_order_id="WO-retention",
+            work_order_title="Retention WO",
+            message_key="notif.woClosed",
+            recipient_role="Admin",
+            recipient_name=None,
+            is_read=is_read,
+            created_at=datetime.now(timezone.utc) - timedelta(days=age_days),
+            triggered_by="admin",
+        )
+    )
+
+
+def test_retention_deletes_old_read_and_archives_old_unread():
+    db = TestingSessionLocal()
+    try:
+        _add_notification(db, "notif-ret-read-old", 45, is_read=True)
+        _add_notification(db, "notif-ret-read-new", 5, is_read=True)
+        _add_notification(db, "notif-ret-unread-old", 120, is_read=False)
+        _add_notification(db, "notif-ret-unread-mid", 45, is_read=False)
+        db.add(NotificationRead(notification_id="notif-ret-read-old", user_name="u1"))
+        db.add(
+            NotificationOutbox(
+                notification_id="notif-ret-unread-old", channel="log", status="delivered"
+            )
+        )
+        db.commit()
+
+        result = run_retention(db, read_days=30, unread_days=90, batch_size=1)
+        assert result["deleted"] >= 1
+        assert result["archived"] >= 1
+
+        remaining = {
+            n.id
+            for n in db.query(Notification).filter(
+                Notification.work_order_id == "WO-retention"
+            )
+        }
+        assert remaining == {"notif-ret-read-new", "notif-ret-unread-mid"}
+
+        archived = db.get(NotificationArchive, "notif-ret-unread-old")
+        assert archived is not None
+        assert archived.message_key == "notif.woClosed"
+        assert db.get(NotificationArchive, "notif-ret-read-old") is None
+
+        assert (
+            db.query(NotificationRead)
+            .filter(NotificationRead.notification_id == "notif-ret-read-old")
+            .count()
+            == 0
+        )
+        assert (
+            db.query(NotificationOutbox)
+            .filter(NotificationOutbox.notification_id == "notif-ret-unread-old")
+            .count()
+            == 0
+        )
+    finally:
+        db.query(Notification).filter(
+            Notification.work_order_id == "WO-retention"
+        ).delete(synchronize_session=False)
+        db.query(NotificationArchive).delete(synchronize_session=False)
+        db.commit()
+        db.close()
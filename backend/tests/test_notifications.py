@@ -1,15 +1,18 @@
+import time
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 
 from db import Notification, WorkOrder
+from utils.notification_templates import TemplateCache
 
 
 def _create_workorder_for_notifications(db_session, days_until_preferred: int = 7, days_until_due: int = 7):
     """Helper to insert a work order directly into the DB for reminder tests."""
     today = datetime.now().date()
-    preferred_date = (today + timedelta(days=days_until_preferred)).strftime("%Y-%m-%d")
-    due_date = (today + timedelta(days=days_until_due)).strftime("%Y-%m-%d")
+    preferred_date = today + timedelta(days=days_until_preferred)
+    due_date = today + timedelta(days=days_until_due)
 
     wo = WorkOrder(
         id="WO-test-notif",
@@ -180,3 +183,167 @@ def test_check_and_create_reminders(client: TestClient):
     assert len(body["notifications"]) >= 1
 
 
+
+
+def test_broadcast_read_receipts_are_per_user(client: TestClient):
+    payload = {
+        "type": "wo_created",
+        "workOrderId": "WO-broadcast",
+        "workOrderTitle": "Broadcast",
+        "message": "For every admin",
+        "recipientRole": "Admin",
+        "recipientName": None,
+        "isRead": False,
+        "triggeredBy": "Tester",
+    }
+    notif_id = client.post("/api/notifications", json=payload).json()["id"]
+
+    admin1 = {"X-User-Role": "Admin", "X-User-Name": "admin1"}
+    admin2 = {"X-User-Role": "Admin", "X-User-Name": "admin2"}
+
+    count_before = client.get("/api/notifications/unread-count", headers=admin2).json()
+
+    resp = client.patch(f"/api/notifications/{notif_id}/read", headers=admin1)
+    assert resp.status_code == 200
+    assert resp.json()["isRead"] is True
+
+    def inbox_flag(headers):
+        inbox = client.get("/api/notifications", headers=headers).json()
+        return next(n["isRead"] for n in inbox if n["id"] == notif_id)
+
+    assert inbox_flag(admin1) is True
+    assert inbox_flag(admin2) is False
+    assert (
+        client.get("/api/notifications/unread-count", headers=admin2).json()
+        == count_before
+    )
+
+    # Reading again is idempotent
+    assert client.patch(f"/api/notifications/{notif_id}/read", headers=admin1).status_code == 200
+
+    # admin2 marks everything read, then clears read notifications:
+    # the broadcast disappears from admin2's inbox only
+    client.patch("/api/notifications/read-all", headers=admin2)
+    assert client.get("/api/notifications/unread-count", headers=admin2).json() == {
+        "count": 0
+    }
+    client.delete("/api/notifications/read", headers=admin2)
+    assert notif_id not in {
+        n["id"] for n in client.get("/api/notifications", headers=admin2).json()
+    }
+    assert notif_id in {
+        n["id"] for n in client.get("/api/notifications", headers=admin1).json()
+    }
+
+
+def test_notifications_stream_matches_list(client: TestClient):
+    payload = {
+        "type": "wo_created",
+        "workOrderId": "WO-stream",
+        "workOrderTitle": "Stream",
+        "message": "Streamed inbox",
+        "recipientRole": "Admin",
+        "recipientName": None,
+        "isRead": False,
+        "triggeredBy": "Tester",
+    }
+    client.post("/api/notifications", json=payload)
+    admin = {"X-User-Role": "Admin", "X-User-Name": "admin-stream"}
+
+    for headers in ({}, admin):
+        streamed = client.get(
+            "/api/notifications", params={"stream": 1}, headers=headers
+        )
+        assert streamed.status_code == 200
+        listed = client.get("/api/notifications", headers=headers)
+        assert streamed.content == listed.content
+        assert any(n["workOrderId"] == "WO-stream" for n in streamed.json())
+
+
+def test_notification_template_rendered_per_locale(client: TestClient):
+    payload = {
+        "type": "wo_due_3_days",
+        "workOrderId": "WO-template",
+        "workOrderTitle": "Pump check",
+        "messageKey": "notif.due3Days",
+        "messageParams": {"date": "2030-01-17"},
+        "recipientRole": "Technician",
+        "recipientName": "tech-template",
+        "triggeredBy": "System",
+    }
+    create_resp = client.post("/api/notifications", json=payload, params={"locale": "en"})
+    assert create_resp.status_code == 200
+    created = create_resp.json()
+    assert created["messageKey"] == "notif.due3Days"
+    assert created["messageParams"] == {"date": "2030-01-17"}
+    assert created["message"] == (
+        '⚠️ Work order "Pump check" is due in 3 days (17/01/2030). Please expedite.'
+    )
+
+    headers = {"X-User-Role": "Technician", "X-User-Name": "tech-template"}
+    thai = client.get(
+        "/api/notifications", headers={**headers, "Accept-Language": "th-TH,th;q=0.9"}
+    ).json()
+    message = next(n["message"] for n in thai if n["id"] == created["id"])
+    assert message.startswith('⚠️ งาน "Pump check"')
+    assert "17/01/2030" in message
+
+    templates = client.get("/api/notifications/templates", params={"locale": "en"})
+    assert templates.json()["templates"]["notif.due3Days"].startswith("⚠️ Work order")
+
+
+
+def test_malformed_template_falls_back():
+    cache = TemplateCache()
+    bodies = {"notif.stray": "Due {", "notif.index": "{0}", "notif.attr": "{date.year}"}
+    rows = [SimpleNamespace(key=k, locale="en", body=b) for k, b in bodies.items()]
+    cache._store(rows, time.monotonic())
+    params = {"date": "2030-01-17"}
+    assert cache.render("notif.stray", params, "en", fallback="stored") == "stored"
+    assert cache.render("notif.index", params, "en") == "notif.index"
+    assert cache.render("notif.attr", params, "en") == "notif.attr"
+
+
+def test_create_notification_requires_message_or_key(client: TestClient):
+    payload = {
+        "type": "manual",
+        "workOrderId": "WO-x",
+        "workOrderTitle": "X",
+        "recipientRole": "Admin",
+        "triggeredBy": "Tester",
+    }
+    resp = client.post("/api/notifications", json=payload)
+    assert resp.status_code == 422
+
+
+def test_reminders_for_many_work_orders_get_distinct_ids(client: TestClient):
+    from tests.conftest import TestingSessionLocal
+
+    due_date = datetime.now().date() + timedelta(days=3)
+    with TestingSessionLocal() as db:
+        for i in range(20):
+            db.add(
+                WorkOrder(
+                    id=f"WO-reminder-batch-{i}",
+                    title="Reminder batch",
+                    description="desc",
+                    asset_name="Asset",
+                    location="Loc",
+                    priority="High",
+                    status="Open",
+                    assigned_to="tech1",
+                    due_date=due_date,
+                )
+            )
+        db.commit()
+
+    resp = client.post("/api/notifications/check-reminders")
+    assert resp.status_code == 200
+    with TestingSessionLocal() as db:
+        ids = [
+            n.id
+            for n in db.query(Notification).filter(
+                Notification.work_order_id.like("WO-reminder-batch-%")
+            )
+        ]
+    assert len(ids) == 20 and len(set(ids)) == 20
@@ -0,0 +1,60 @@
+from db import Notification, NotificationOutbox
+from utils import outbox
+from utils.outbox import dispatch_pending, enqueue_outbox, register_channel
+
+from tests.conftest import TestingSessionLocal
+
+
+def _add_notification(db, notification_id: str) -> None:
+    db.add(
+        Notification(
+            id=notification_id,
+            type="wo_closed",
+            work_order_id="WO-outbox",
+            work_order_title="Outbox WO",
+            message="closed",
+            recipient_role="Requester",
+            recipient_name="req1",
+            is_read=False,
+            triggered_by="admin",
+        )
+    )
+
+
+def test_outbox_delivers_and_retries(monkeypatch):
+    delivered = []
+    attempts = {"flaky": 0}
+
+    @register_channel("test-ok")
+    def _ok(payload):
+        delivered.append(payload["id"])
+
+    @register_channel("test-flaky")
+    def _flaky(payload):
+        attempts["flaky"] += 1
+        raise RuntimeError("push service unavailable")
+
+    monkeypatch.setattr(outbox, "OUTBOX_MAX_ATTEMPTS", 1)
+
+    db = TestingSessionLocal()
+    try:
+        _add_notification(db, "notif-outbox-1")
+        enqueue_outbox(db, ["notif-outbox-1"], channels=["test-ok", "test-flaky"])
+        db.commit()
+
+        assert dispatch_pending(db) == 2
+        assert delivered == ["notif-outbox-1"]
+        assert attempts["flaky"] == 1
+
+        statuses = {
+            row.channel: row.status
+            for row in db.query(NotificationOutbox).filter(
+                NotificationOutbox.notification_id == "notif-outbox-1"
+            )
+        }
+        assert statuses == {"test-ok": "delivered", "test-flaky": "failed"}
+
+        # Nothing left to deliver
+        assert dispatch_pending(db) == 0
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.middleware import Middleware
+
+from main import app
+from middleware import ProfilingMiddleware, QueryStatsMiddleware
+from middleware.profiling import PROFILE_HEADER, PROFILE_ID_HEADER
+
+from tests.test_workorders import _create_workorder_payload
+
+
+@pytest.fixture
+def profiled_app(client: TestClient, tmp_path):
+    """Install ProfilingMiddleware where main.py puts it (inside QueryStatsMiddleware)"""
+    original = list(app.user_middleware)
+    position = next(
+        index
+        for index, middleware in enumerate(original)
+        if middleware.cls is QueryStatsMiddleware
+    )
+    app.user_middleware.insert(
+        position + 1,
+        Middleware(
+            ProfilingMiddleware,
+            directory=str(tmp_path),
+            token="secret",
+            sample_rate=0,
+            # Capture a stack at every event so the assertions are deterministic
+            interval=0,
+        ),
+    )
+    app.middleware_stack = app.build_middleware_stack()
+    try:
+        yield tmp_path
+    finally:
+        app.user_middleware[:] = original
+        app.middleware_stack = app.build_middleware_stack()
+
+
+def test_profiling_is_not_installed_by_default():
+    assert not any(
+        middleware.cls is ProfilingMiddleware for middleware in app.user_middleware
+    )
+
+
+def test_request_without_token_is_not_profiled(client: TestClient, profiled_app):
+    resp = client.get("/api/workorders", headers={PROFILE_HEADER: "wrong"})
+    assert resp.status_code == 200
+    assert PROFILE_ID_HEADER not in resp.headers
+    assert os.listdir(profiled_app) == []
+
+
+def test_profiled_request_writes_folded_stacks_and_summary(
+    client: TestClient, profiled_app
+):
+    resp = client.post(
+        "/api/workorders",
+        json=_create_workorder_payload(title="Profiled WO"),
+        headers={PROFILE_HEADER: "secret"},
+    )
+    assert resp.status_code == 200
+    profile_id = resp.headers[PROFILE_ID_HEADER]
+
+    with open(profiled_app / f"{profile_id}.json", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["route"] == "/api/workorders"
+    assert summary["status"] == resp.status_code
+    assert summary["sql"]["queries"] >= 1
+    statements = [s["statement"] for s in summary["sql"]["statements"]]
+    assert any("INSERT INTO workorders" in s for s in statements)
+    assert summary["pydantic"]["validationMs"] > 0
+    assert summary["pydantic"]["serializationMs"] > 0
+
+    folded = (profiled_app / f"{profile_id}.folded").read_text(encoding="utf-8")
+    folded = folded.splitlines()
+    assert folded
+    for line in folded:
+        stack, weight = line.rsplit(" ", 1)
+        assert stack.startswith("POST /api/workorders")
+        assert int(weight) >= 1
+    assert any(";[sql];INSERT INTO workorders" in line for line in folded)
+    assert any("routes/workorders.py" in line for line in folded)
+    assert any("SchemaValidator.validate_python" in line for line in folded)
+
@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from db import query_stats
+from db.query_stats import statement_shape
+
+from tests.conftest import TestingSessionLocal
+
+
+def test_statement_shape_normalizes_literals_and_in_lists():
+    a = statement_shape("SELECT *\n  FROM t WHERE id IN (?, ?, ?) AND n = 5")
+    b = statement_shape("SELECT * FROM t WHERE id IN (?) AND n = 7")
+    assert a == b == "SELECT * FROM t WHERE id IN (...) AND n = ?"
+
+
+def test_repeated_statement_is_flagged_as_n_plus_one():
+    token = query_stats.start_request("GET", "/test")
+    stats = query_stats.current_stats()
+    db = TestingSessionLocal()
+    try:
+        for work_order_id in ("WO-1", "WO-2", "WO-3"):
+            db.execute(
+                text("SELECT id FROM notifications WHERE work_order_id = :id"),
+                {"id": work_order_id},
+            )
+        db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+        query_stats.end_request(token)
+
+    assert stats.count == 4
+    suspects = stats.n_plus_one(threshold=2)
+    assert len(suspects) == 1
+    assert suspects[0]["count"] == 3
+    assert "work_order_id" in suspects[0]["statement"]
+    assert stats.n_plus_one(threshold=3) == []
+
+
+def test_server_timing_header_and_query_budget(client: TestClient, query_budget):
+    with query_budget(1) as recorded:
+        resp = client.get("/api/workorders")
+    assert resp.status_code == 200
+    assert resp.headers["server-timing"].startswith("db;dur=")
+    assert '1 queries' in resp.headers["server-timing"]
+    assert recorded[0].route == "/api/workorders"
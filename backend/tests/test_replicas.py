@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from db import Request, replicas
+from db.base import Base
+from db.replicas import (
+    RECENT_WRITE_HEADER,
+    RECENT_WRITE_SECONDS,
+    Replica,
+    ReplicaSet,
+    recent_write_marker,
+)
+
+
+def _make_replica(tmp_path, name: str) -> Replica:
+    """A SQLite file standing in for a replica, holding one marker request"""
+    path = os.path.join(tmp_path, f"{name}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(
+            Request(
+                id=f"REQ-{name}",
+                location="Replica",
+                priority="Low",
+                description=name,
+                status="Open",
+            )
+        )
+        db.commit()
+    engine.dispose()
+    return Replica(name, create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool))
+
+
+@pytest.fixture
+def replica_pair(tmp_path, monkeypatch, client: TestClient):
+    pair = [_make_replica(tmp_path, "replica-a"), _make_replica(tmp_path, "replica-b")]
+    monkeypatch.setattr(replicas, "replica_set", ReplicaSet(pair, health_check_seconds=3600))
+    client.cookies.clear()
+    yield pair
+    client.cookies.clear()
+
+
+def _request_ids(client: TestClient, headers=None) -> set:
+    resp = client.get("/api/requests", headers=headers or {})
+    assert resp.status_code == 200
+    return {r["id"] for r in resp.json()}
+
+
+def test_reads_round_robin_over_healthy_replicas(client: TestClient, replica_pair):
+    seen = [_request_ids(client), _request_ids(client)]
+    assert {"REQ-replica-a"} in seen
+    assert {"REQ-replica-b"} in seen
+
+    replica_pair[1].healthy = False
+    assert _request_ids(client) == {"REQ-replica-a"}
+    assert _request_ids(client) == {"REQ-replica-a"}
+
+    replica_pair[0].healthy = False
+    # No healthy replica: reads fall back to the primary
+    assert "REQ-replica-a" not in _request_ids(client)
+
+
+def test_recent_write_pins_client_to_primary(client: TestClient, replica_pair):
+    resp = client.post(
+        "/api/requests",
+        json={"location": "Primary", "priority": "Low", "description": "ryw"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers[RECENT_WRITE_HEADER]
+    assert "eureka_recent_write" in resp.headers["set-cookie"]
+    created_id = resp.json()["id"]
+
+    # The cookie pins this client's reads to the primary
+    ids = _request_ids(client)
+    assert created_id in ids
+    assert not ids & {"REQ-replica-a", "REQ-replica-b"}
+
+    # Clients without cookies can send the marker back as a header
+    client.cookies.clear()
+    assert created_id in _request_ids(
+        client, headers={RECENT_WRITE_HEADER: recent_write_marker()}
+    )
+    assert created_id not in _request_ids(client)
+    # A marker further ahead than the pin window was not issued by the server
+    forever = str(int((time.time() + 10 * RECENT_WRITE_SECONDS) * 1000))
+    assert created_id not in _request_ids(
+        client, headers={RECENT_WRITE_HEADER: forever}
+    )
+
+
+def test_replica_health_check_marks_unreachable_replica(tmp_path):
+    missing = os.path.join(tmp_path, "missing-dir", "replica.db")
+    replica = Replica(
+        "replica-down",
+        create_async_engine(f"sqlite+aiosqlite:///{missing}", poolclass=NullPool),
+    )
+
+
+    async def check() -> bool:
+        healthy = await replica.check()
+        await replica.engine.dispose()
+        # Let aiosqlite's worker thread finish reporting the failed connect
+        await asyncio.sleep(0.05)
+        return healthy
+
+    assert asyncio.run(check()) is False
+    assert replica.healthy is False
@@ -33,6 +33,12 @@ def test_list_requests(client: TestClient):
     assert isinstance(resp.json(), list)
 
 
+def test_list_requests_stream_matches_list(client: TestClient):
+    streamed = client.get("/api/requests", params={"stream": "true"})
+    assert streamed.status_code == 200
+    assert streamed.content == client.get("/api/requests").content
+
+
 def test_get_request_not_found(client: TestClient):
     resp = client.get("/api/requests/REQ-non-existent")
     assert resp.status_code == 404
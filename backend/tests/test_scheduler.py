@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from db import Notification, WorkOrder
+from utils.leader_lock import FileLeaderLock
+from utils.scheduler import ReminderScheduler, SingleFlight
+
+from tests.conftest import TestingSessionLocal, engine
+
+
+def test_file_leader_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "leader.lock")
+    first = FileLeaderLock(path)
+    second = FileLeaderLock(path)
+
+    assert first.acquire() is True
+    assert second.acquire() is False
+
+    first.release()
+    assert second.acquire() is True
+    second.release()
+
+
+def test_single_flight_shares_one_execution():
+    calls = []
+
+    async def scan():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["reminder"]
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.run(scan) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [["reminder"]] * 5
+
+
+def test_scheduler_tick_only_runs_on_leader(tmp_path):
+    db = TestingSessionLocal()
+    try:
+        due = datetime.now().date() + timedelta(days=3)
+        db.add(
+            WorkOrder(
+                id="WO-test-scheduler",
+                title="Scheduled reminder",
+                description="desc",
+                asset_name="Asset",
+                location="Loc",
+                priority="High",
+                status="In Progress",
+                assigned_to="tech-scheduler",
+                due_date=due,
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    path = str(tmp_path / "scheduler.lock")
+    leader = ReminderScheduler(TestingSessionLocal, engine, lock=FileLeaderLock(path))
+    follower = ReminderScheduler(
+        TestingSessionLocal, engine, lock=FileLeaderLock(path)
+    )
+
+    async def main():
+        created = await leader.tick()
+        skipped = await follower.tick()
+        await leader.stop()
+        await follower.stop()
+        return created, skipped
+
+    created, skipped = asyncio.run(main())
+    assert skipped is None
+    assert {
+        "workOrderId": "WO-test-scheduler",
+        "type": "wo_due_3_days",
+        "assignedTo": "tech-scheduler",
+    } in created
+
+    db = TestingSessionLocal()
+    try:
+        assert (
+            db.query(Notification)
+            .filter(Notification.work_order_id == "WO-test-scheduler")
+            .count()
+            == 1
+        )
+    finally:
+        db.close()
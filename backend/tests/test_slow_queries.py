@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from db import WorkOrder, query_stats
+from db.slow_queries import (
+    SlowQueryLog,
+    fingerprint,
+    parameter_shape,
+    slow_query_log,
+)
+
+from tests.conftest import TEST_DB_PATH
+
+
+def test_parameter_shape_has_types_not_values():
+    assert parameter_shape({"id_1": "WO-1", "n": 5}) == {"id_1": "str", "n": "int"}
+    assert parameter_shape(tuple(range(25)))[-1] == "...+5"
+    assert parameter_shape([("a", 1), ("b", 2)], executemany=True) == {
+        "rows": 2,
+        "row": ["str", "int"],
+    }
+
+
+def test_slow_statement_is_logged_with_route_and_explained_once(create_test_db):
+    log = SlowQueryLog(threshold_ms=0.000001, explains_per_minute=10)
+    engine = create_engine(f"sqlite:///{TEST_DB_PATH}")
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{TEST_DB_PATH}", poolclass=NullPool
+    )
+    log.instrument(async_engine.sync_engine, explain_engine=engine)
+
+    statement = (
+        select(WorkOrder.id)
+        .where(WorkOrder.status == "Open")
+        .order_by(WorkOrder.created_at.desc())
+    )
+
+    async def run_request():
+        scope = {"type": "http", "method": "GET", "path": "/api/workorders"}
+        token = query_stats.start_request("GET", "/api/workorders", scope)
+        try:
+            async with async_engine.connect() as conn:
+                for _ in range(3):
+                    await conn.execute(statement)
+        finally:
+            query_stats.end_request(token)
+        await async_engine.dispose()
+
+    try:
+        asyncio.run(run_request())
+        log.wait_for_explains()
+    finally:
+        engine.dispose()
+
+    entries = [e for e in log.entries() if "FROM workorders" in e["statement"]]
+    assert len(entries) == 1
+    entry = entries[0]
+    assert entry["count"] == 3
+    assert entry["routes"] == ["/api/workorders"]
+    # EXPLAIN QUERY PLAN: no index on created_at, so SQLite scans and sorts
+    assert entry["plan"]
+    assert any("SCAN" in line or "SEARCH" in line for line in entry["plan"])
+    assert any("ORDER BY" in line for line in entry["plan"])
+    # Deduplicated: the statement ran three times but was explained once
+    assert len(log._recent_explains) == 1
+    assert entry["fingerprint"] == fingerprint(str(statement.compile(engine)))
+
+
+def test_explain_rate_limit(create_test_db):
+    log = SlowQueryLog(threshold_ms=0.000001, explains_per_minute=1)
+    engine = create_engine(f"sqlite:///{TEST_DB_PATH}")
+    log.instrument(engine, explain_engine=engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(select(WorkOrder.id).where(WorkOrder.priority == "High"))
+            conn.execute(select(WorkOrder.title).where(WorkOrder.priority == "Low"))
+        log.wait_for_explains()
+    finally:
+        engine.dispose()
+
+    plans = [e["plan"] for e in log.entries() if "FROM workorders" in e["statement"]]
+    assert len(plans) == 2
+    assert sum(plan is not None for plan in plans) == 1
+
+
+def test_slow_queries_endpoint(client: TestClient):
+    resp = client.get("/api/metrics/slow-queries")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["thresholdMs"] == slow_query_log.threshold * 1000
+    assert isinstance(body["statements"], list)
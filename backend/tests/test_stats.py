@@ -0,0 +1,256 @@
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from db.models import WorkOrder as WorkOrderModel
+from db.models import WorkOrderDailyRollup, WorkOrderEvent, WorkOrderStat
+from utils.workorder_rollups import backfill_rollups
+from utils.workorder_stats import stats_cache
+
+from tests.conftest import TestingSessionLocal, engine
+from tests.test_workorders import _create_workorder_payload
+
+ADMIN = {"X-User-Role": "Admin", "X-User-Name": "admin"}
+HEAD_TECH = {"X-User-Role": "Head Technician", "X-User-Name": "headtech"}
+
+
+def _stats(client: TestClient) -> dict:
+    stats_cache.clear()
+    resp = client.get("/api/stats/workorders")
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_stats_follow_creates_transitions_and_deletes(client: TestClient):
+    before = _stats(client)
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    create = lambda **kw: client.post(  # noqa: E731
+        "/api/workorders", json=_create_workorder_payload(**kw)
+    ).json()["id"]
+
+    overdue_id = create(
+        status="In Progress", assignedTo="tech-stats", dueDate=yesterday
+    )
+    pending_id = create(status="Pending", assignedTo="tech-stats", priority="Low")
+    open_id = create(status="Open", assignedTo=None)
+
+    client.patch(f"/api/workorders/{pending_id}/approve", headers=HEAD_TECH)
+    client.put(
+        f"/api/workorders/{open_id}",
+        json={"assignedTo": "tech-stats", "status": "In Progress"},
+        headers=ADMIN,
+    )
+    client.post(
+        "/api/workorders/bulk-transition",
+        json={"action": "reassign", "ids": [overdue_id], "assignedTo": "tech-other"},
+        headers=HEAD_TECH,
+    )
+    deleted_id = create(status="Open")
+    client.delete(f"/api/workorders/{deleted_id}")
+
+    after = _stats(client)
+    assert after["total"] - before["total"] == 3
+    assert after["overdue"] - before["overdue"] == 1
+    assert after["byStatus"]["Completed"] - before["byStatus"].get("Completed", 0) == 1
+    assert after["byPriority"]["Low"] - before["byPriority"].get("Low", 0) == 1
+    assert after["byTechnician"]["tech-stats"] == {"total": 2, "open": 1, "overdue": 0}
+    assert after["byTechnician"]["tech-other"] == {"total": 1, "open": 1, "overdue": 1}
+
+    with TestingSessionLocal() as db:
+        for wo_id in (overdue_id, pending_id, open_id):
+            wo = db.get(WorkOrderModel, wo_id)
+            total = db.scalar(
+                select(func.sum(WorkOrderStat.total)).where(
+                    WorkOrderStat.status == wo.status,
+                    WorkOrderStat.priority == wo.priority,
+                    WorkOrderStat.assigned_to == wo.assigned_to,
+                    WorkOrderStat.due_date == wo.due_date,
+                )
+            )
+            assert total >= 1
+
+
+def test_stats_are_cached(client: TestClient, query_budget):
+    _stats(client)
+    with query_budget(0):
+        assert client.get("/api/stats/workorders").status_code == 200
+
+
+def _trends(client: TestClient, **params) -> dict:
+    resp = client.get("/api/stats/workorders/trends", params=params)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_trends_follow_workflow_events(client: TestClient):
+    today = date.today().isoformat()
+    payload = _create_workorder_payload(status="Pending", location="Trend Plant")
+    closed_id = client.post("/api/workorders", json=payload).json()["id"]
+    client.post("/api/workorders", json=payload)
+    client.patch(f"/api/workorders/{closed_id}/approve", headers=HEAD_TECH)
+    client.patch(f"/api/workorders/{closed_id}/close", headers=ADMIN)
+
+    body = _trends(client, start=today, end=today, location="Trend Plant")
+    [point] = body["series"]["all"]
+    assert point == {
+        "day": today,
+        "created": 2,
+        "completed": 1,
+        "closed": 1,
+        "canceled": 0,
+        "deleted": 0,
+        "backlog": 1,
+    }
+
+    start = (date.today() - timedelta(days=5)).isoformat()
+    assert _trends(client, start=start, end=today)["series"]["all"][0]["day"] == start
+    too_long = client.get(
+        "/api/stats/workorders/trends", params={"start": "2000-01-01"}
+    )
+    assert too_long.status_code == 400
+
+
+def test_backfill_rebuilds_history_in_chunks(client: TestClient):
+    today = date.today()
+    ten_days_ago = datetime.now() - timedelta(days=10)
+    with TestingSessionLocal() as db:
+        for i, priority in enumerate(("High", "High", "Low")):
+            db.add(
+                WorkOrderModel(
+                    id=f"WO-backfill-{i}",
+                    title="Old",
+                    description="Old",
+                    asset_name="Asset",
+                    location="Backfill Plant",
+                    priority=priority,
+                    status="Closed" if i == 0 else "Open",
+                    created_at=ten_days_ago,
+                    closed_at=ten_days_ago + timedelta(days=2) if i == 0 else None,
+                )
+            )
+        db.commit()
+        # Recorded live, not derivable from the timestamps
+        nine_days_ago = today - timedelta(days=9)
+        for event in ("canceled", "completed"):
+            db.add(
+                WorkOrderDailyRollup(
+                    day=nine_days_ago,
+                    event=event,
+                    priority="Low",
+                    location="Backfill Plant",
+                    total=1,
+                )
+            )
+        db.commit()
+
+    processed = backfill_rollups(engine, chunk_size=2, before=today)
+    assert processed >= 3
+    # Running it again gives the same rollups
+    backfill_rollups(engine, chunk_size=2, before=today)
+
+    body = _trends(
+        client,
+        start=(today - timedelta(days=11)).isoformat(),
+        end=today.isoformat(),
+        location="Backfill Plant",
+        groupBy="priority",
+    )
+    high, low = body["series"]["High"], body["series"]["Low"]
+    assert high[0]["backlog"] == 0
+    assert high[1]["created"] == 2 and high[1]["backlog"] == 2
+    assert high[3]["closed"] == 1 and high[-1]["backlog"] == 1
+    assert low[2]["canceled"] == 1 and low[2]["completed"] == 1
+    assert low[-1]["backlog"] == 0
+
+
+def test_transitions_append_status_history(client: TestClient):
+    tech = {"X-User-Role": "Technician", "X-User-Name": "tech-history"}
+    wo_id = client.post(
+        "/api/workorders",
+        json=_create_workorder_payload(
+            status="In Progress", assignedTo="tech-history", assetName="History Pump"
+        ),
+    ).json()["id"]
+    update = {"technicianNotes": "Done", "technicianImages": []}
+    client.patch(
+        f"/api/workorders/{wo_id}/technician-update", json=update, headers=tech
+    )
+    client.patch(
+        f"/api/workorders/{wo_id}/reject",
+        json={"rejectionReason": "Redo"},
+        headers=HEAD_TECH,
+    )
+    client.patch(
+        f"/api/workorders/{wo_id}/technician-update", json=update, headers=tech
+    )
+    client.patch(f"/api/workorders/{wo_id}/approve", headers=HEAD_TECH)
+
+    with TestingSessionLocal() as db:
+        events = db.scalars(
+            select(WorkOrderEvent)
+            .where(WorkOrderEvent.work_order_id == wo_id)
+            .order_by(WorkOrderEvent.id)
+        ).all()
+    assert [(e.from_status, e.to_status) for e in events] == [
+        (None, "In Progress"),
+        ("In Progress", "Pending"),
+        ("Pending", "In Progress"),
+        ("In Progress", "Pending"),
+        ("Pending", "Completed"),
+    ]
+    assert events[2].actor == "headtech" and events[2].reason == "Redo"
+
+    resp = client.get("/api/stats/workorders/analytics")
+    assert resp.status_code == 200
+    technician = resp.json()["byTechnician"]["tech-history"]
+    assert technician["completed"] == 1
+    assert (technician["submitted"], technician["rejected"]) == (2, 1)
+    assert technician["rejectionRate"] == 0.5
+    assert resp.json()["byAsset"]["History Pump"]["completed"] == 1
+
+
+def test_analytics_percentiles(client: TestClient):
+    day = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    timeline = (
+        (None, "Open", 0),
+        ("Open", "In Progress", 4),
+        ("In Progress", "Pending", 10),
+        ("Pending", "Completed", 12),
+    )
+    with TestingSessionLocal() as db:
+        for i, scale in enumerate((1, 1, 1.5)):
+            for from_status, to_status, hours in timeline:
+                db.add(
+                    WorkOrderEvent(
+                        work_order_id=f"WO-analytics-{i}",
+                        from_status=from_status,
+                        to_status=to_status,
+                        at=day + timedelta(hours=hours * scale),
+                        assigned_to="tech-analytics",
+                        asset_name="Analytics Pump",
+                    )
+                )
+        db.commit()
+
+    resp = client.get(
+        "/api/stats/workorders/analytics",
+        params={"start": "2020-01-01", "end": "2020-01-01"},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    # Two work orders took 12 hours, the third one 18
+    assert body["mttrHours"]["count"] == 3
+    assert body["mttrHours"]["p50"] == 12.0
+    assert body["mttrHours"]["mean"] == 14.0
+    assert body["timeInStatusHours"]["Open"]["p50"] == 4.0
+    assert body["timeInStatusHours"]["In Progress"]["p50"] == 6.0
+    assert body["timeInStatusHours"]["Pending"]["count"] == 3
+    assert body["byTechnician"]["tech-analytics"]["rejectionRate"] == 0.0
+    assert body["rejectionRate"] == 0.0
+
+    reversed_range = client.get(
+        "/api/stats/workorders/analytics",
+        params={"start": "2020-01-02", "end": "2020-01-01"},
+    )
+    assert reversed_range.status_code == 400
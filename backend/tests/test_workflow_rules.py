@@ -1,6 +1,7 @@
 import pytest
 
 from utils.workflow_rules import (
+    STATUS_TRANSITIONS,
     Status,
     UserRole,
     is_transition_allowed,
@@ -8,6 +9,8 @@ from utils.workflow_rules import (
     get_work_order_permissions,
     get_notification_recipients,
     validate_status_transition,
+    work_order_annotation,
+    _compute_permissions,
 )
 
 
@@ -125,6 +128,33 @@ def test_get_work_order_permissions_technician_assignment_logic():
     assert perms_not_assigned.can_change_status is False
 
 
+def test_precompiled_tables_match_rules():
+    for status in Status:
+        for role in UserRole:
+            expected_next = [
+                to_status
+                for (from_status, to_status), roles in STATUS_TRANSITIONS.items()
+                if from_status == status and role in roles
+            ]
+            assert get_allowed_next_statuses(status.value, role.value) == expected_next
+            for assigned_to in ("tech1", "tech2"):
+                perms = get_work_order_permissions(
+                    status.value, role.value, assigned_to, "tech1"
+                )
+                expected = _compute_permissions(
+                    status.value, role.value, assigned_to, "tech1"
+                )
+                assert vars(perms) == vars(expected)
+
+    annotation = work_order_annotation("In Progress", "Technician", "tech1", "tech1")
+    assert annotation["allowedNextStatuses"] == ["Pending"]
+    assert annotation["permissions"]["canEdit"] is True
+    # Statuses outside the enum fall back to evaluating the rules
+    unknown = work_order_annotation("Archived", "Admin")
+    assert unknown["allowedNextStatuses"] == []
+    assert unknown["permissions"]["canEdit"] is True
+
+
 def test_get_notification_recipients_mapping():
     assert get_notification_recipients("created") == [UserRole.ADMIN]
     assert get_notification_recipients("assigned") == [UserRole.TECHNICIAN]
@@ -1,6 +1,20 @@
+import asyncio
+import json
 from datetime import datetime
+from typing import List
 
+from fastapi.responses import JSONResponse
 from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import select, text
+
+from db.models import WorkOrder as WorkOrderModel
+from schemas import WorkOrder
+
+from utils import generate_id
+from utils.json_response import stream_rows_response
+
+from tests.conftest import TestingSessionLocal, async_engine
 
 
 def _create_workorder_payload(**overrides):
@@ -182,3 +196,425 @@ def test_admin_close_workorder_forbidden_wrong_status(client: TestClient):
         headers={"X-User-Role": "Admin", "X-User-Name": "admin"},
     )
     assert resp.status_code == 403
+
+
+def test_transition_is_a_single_conditional_update(client: TestClient, query_budget):
+    payload = _create_workorder_payload(status="Completed", assignedTo="tech1")
+    wo_id = client.post("/api/workorders", json=payload).json()["id"]
+
+    # UPDATE, stats and rollup upserts, status history INSERT
+    with query_budget(4) as recorded:
+        resp = client.patch(
+            f"/api/workorders/{wo_id}/close",
+            headers={"X-User-Role": "Admin", "X-User-Name": "admin"},
+        )
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "Closed"
+
+    workorder_statements = [
+        shape for shape in recorded[0].shapes if "workorders" in shape
+    ]
+    assert len(workorder_statements) == 1
+    assert workorder_statements[0].startswith("UPDATE workorders")
+    assert "RETURNING" in workorder_statements[0]
+
+
+def test_stale_transition_does_not_overwrite(client: TestClient):
+    payload = _create_workorder_payload(status="Pending", assignedTo="tech1")
+    wo_id = client.post("/api/workorders", json=payload).json()["id"]
+    headers = {"X-User-Role": "Head Technician", "X-User-Name": "headtech"}
+
+    first = client.patch(f"/api/workorders/{wo_id}/approve", headers=headers)
+    second = client.patch(
+        f"/api/workorders/{wo_id}/reject",
+        json={"rejectionReason": "Too late"},
+        headers={**headers, "X-User-Name": "other"},
+    )
+    assert first.status_code == 200
+    assert second.status_code == 403
+    assert "current: 'Completed'" in second.json()["detail"]
+
+    wo = client.get(f"/api/workorders/{wo_id}").json()
+    assert wo["status"] == "Completed"
+    assert wo["approvedBy"] == "headtech"
+    assert wo["rejectionReason"] is None
+
+    missing = client.patch("/api/workorders/WO-missing/approve", headers=headers)
+    assert missing.status_code == 404
+
+    wrong_tech = client.patch(
+        f"/api/workorders/{wo_id}/technician-update",
+        json={"technicianNotes": "n", "technicianImages": []},
+        headers={"X-User-Role": "Technician", "X-User-Name": "tech2"},
+    )
+    assert wrong_tech.status_code == 403
+
+
+def test_bulk_close_reports_result_per_id(client: TestClient, query_budget):
+    completed = [
+        client.post(
+            "/api/workorders", json=_create_workorder_payload(status="Completed")
+        ).json()["id"]
+        for _ in range(3)
+    ]
+    open_id = client.post(
+        "/api/workorders", json=_create_workorder_payload(status="Open")
+    ).json()["id"]
+    admin = {"X-User-Role": "Admin", "X-User-Name": "admin"}
+
+    with query_budget(7) as recorded:
+        resp = client.post(
+            "/api/workorders/bulk-transition",
+            json={"action": "close", "ids": [*completed, open_id, "WO-missing"]},
+            headers=admin,
+        )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["updated"] == 3
+    results = {r["id"]: r for r in body["results"]}
+    assert all(results[i]["ok"] and results[i]["status"] == "Closed" for i in completed)
+    assert results[open_id] == {
+        "id": open_id,
+        "ok": False,
+        "status": "Open",
+        "error": "Work order is in 'Open' status",
+    }
+    assert results["WO-missing"]["error"] == "Work order not found"
+    # One SELECT to check every row, one set-based UPDATE
+    workorder_statements = [s for s in recorded[0].shapes if "workorders" in s]
+    assert len(workorder_statements) == 2
+    history = [s for s in recorded[0].shapes if "workorder_events" in s]
+    assert len(history) == 1
+    assert client.get(f"/api/workorders/{completed[0]}").json()["closedBy"] == "admin"
+
+    denied = client.post(
+        "/api/workorders/bulk-transition",
+        json={"action": "approve", "ids": completed},
+        headers=admin,
+    ).json()
+    assert denied["updated"] == 0
+    assert all(r["status"] == "Closed" for r in denied["results"])
+
+
+def test_bulk_reassign_technicians_open_work(client: TestClient):
+    ids = [
+        client.post(
+            "/api/workorders",
+            json=_create_workorder_payload(status=status, assignedTo="tech-leaving"),
+        ).json()["id"]
+        for status in ("Open", "In Progress", "Pending")
+    ]
+
+    resp = client.post(
+        "/api/workorders/bulk-transition",
+        json={
+            "action": "reassign",
+            "fromAssignee": "tech-leaving",
+            "assignedTo": "tech-new",
+        },
+        headers={"X-User-Role": "Head Technician", "X-User-Name": "headtech"},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["updated"] == 2
+    assigned = {
+        wo_id: client.get(f"/api/workorders/{wo_id}").json()["assignedTo"]
+        for wo_id in ids
+    }
+    assert assigned == {
+        ids[0]: "tech-new",
+        ids[1]: "tech-new",
+        ids[2]: "tech-leaving",
+    }
+    notified = {
+        n["workOrderId"]
+        for n in client.get("/api/notifications").json()
+        if n["recipientName"] == "tech-new"
+    }
+    assert notified == {ids[0], ids[1]}
+
+    missing_assignee = client.post(
+        "/api/workorders/bulk-transition",
+        json={"action": "reassign", "ids": ids},
+    )
+    assert missing_assignee.status_code == 400
+
+
+def test_transitions_write_notifications_server_side(client: TestClient):
+    payload = _create_workorder_payload(
+        title="Notify WO", status="Pending", assignedTo="tech-notify", createdBy="req1"
+    )
+    wo_id = client.post("/api/workorders", json=payload).json()["id"]
+
+    resp = client.patch(
+        f"/api/workorders/{wo_id}/approve",
+        headers={"X-User-Role": "Head Technician", "X-User-Name": "headtech"},
+    )
+    assert resp.status_code == 200
+
+    notifications = [
+        n for n in client.get("/api/notifications").json() if n["workOrderId"] == wo_id
+    ]
+    recipients = {(n["recipientRole"], n["recipientName"]) for n in notifications}
+    assert recipients == {("Requester", "req1"), ("Technician", "tech-notify")}
+    assert all(n["type"] == "wo_approved" for n in notifications)
+    assert all(n["triggeredBy"] == "headtech" for n in notifications)
+
+
+def test_assignment_notifies_new_technician(client: TestClient):
+    payload = _create_workorder_payload(title="Assign WO", assignedTo=None)
+    wo_id = client.post("/api/workorders", json=payload).json()["id"]
+
+    resp = client.put(
+        f"/api/workorders/{wo_id}",
+        json={"assignedTo": "tech-assigned", "status": "In Progress"},
+        headers={"X-User-Role": "Admin", "X-User-Name": "admin"},
+    )
+    assert resp.status_code == 200
+
+    notifications = [
+        n for n in client.get("/api/notifications").json() if n["workOrderId"] == wo_id
+    ]
+    assert len(notifications) == 1
+    assert notifications[0]["type"] == "wo_assigned"
+    assert notifications[0]["recipientName"] == "tech-assigned"
+
+
+def test_list_fast_path_matches_model_serialization(client: TestClient):
+    location = {
+        "latitude": 13.75,
+        "longitude": 100.5,
+        "address": "ถนนพระราม 9",
+        "googleMapsUrl": "https://maps.example/?q=13.75,100.5",
+    }
+    client.post(
+        "/api/workorders",
+        json=_create_workorder_payload(
+            title="งานซ่อม fast path", imageIds=["IMG-1"], locationData=location
+        ),
+    )
+
+    resp = client.get("/api/workorders")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/json"
+
+    # The previous path: one model per ORM row, then FastAPI's serialization
+    db = TestingSessionLocal()
+    try:
+        rows = db.scalars(
+            select(WorkOrderModel).order_by(WorkOrderModel.created_at.desc())
+        ).all()
+        models = [WorkOrder.model_validate(wo) for wo in rows]
+    finally:
+        db.close()
+    expected = JSONResponse(
+        TypeAdapter(List[WorkOrder]).dump_python(models, mode="json")
+    ).body
+    assert resp.content == expected
+
+
+def test_list_workorders_annotated_for_user(client: TestClient):
+    payload = _create_workorder_payload(
+        title="Annotated WO", status="In Progress", assignedTo="tech-annotate"
+    )
+    wo_id = client.post("/api/workorders", json=payload).json()["id"]
+
+    def annotated(name: str) -> dict:
+        resp = client.get(
+            "/api/workorders",
+            params={"annotate": True, "assignedTo": "tech-annotate"},
+            headers={"X-User-Role": "Technician", "X-User-Name": name},
+        )
+        assert resp.status_code == 200
+        return next(wo for wo in resp.json() if wo["id"] == wo_id)
+
+    mine = annotated("tech-annotate")
+    assert mine["allowedNextStatuses"] == ["Pending"]
+    assert mine["permissions"]["canEdit"] is True
+    assert annotated("someone-else")["permissions"]["canEdit"] is False
+
+    streamed = client.get(
+        "/api/workorders",
+        params={"annotate": True, "stream": True, "assignedTo": "tech-annotate"},
+        headers={"X-User-Role": "Technician", "X-User-Name": "tech-annotate"},
+    ).json()
+    assert next(wo for wo in streamed if wo["id"] == wo_id) == mine
+
+    plain = client.get("/api/workorders").json()
+    assert "permissions" not in plain[0]
+    assert client.get("/api/workorders", params={"annotate": True}).status_code == 400
+
+
+def test_list_workorders_stream_matches_list(client: TestClient):
+    for i in range(3):
+        payload = _create_workorder_payload(title=f"Stream WO {i}")
+        client.post("/api/workorders", json=payload)
+
+    streamed = client.get("/api/workorders", params={"stream": 1})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.content == client.get("/api/workorders").content
+
+    filtered = client.get(
+        "/api/workorders", params={"stream": 1, "search": "Stream WO"}
+    )
+    assert sorted(wo["title"] for wo in filtered.json()) == [
+        "Stream WO 0",
+        "Stream WO 1",
+        "Stream WO 2",
+    ]
+
+
+def test_stream_rows_response_sends_batches():
+    query = select(WorkOrderModel.__table__).order_by(WorkOrderModel.created_at.desc())
+    response = stream_rows_response(WorkOrder, async_engine, query, yield_per=2)
+
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(collect())
+    body = b"".join(chunks)
+    items = json.loads(body)
+    assert len(items) >= 3
+    # "[", one chunk per batch of two rows with "," between, "]"
+    assert len(chunks) == 2 + (len(items) + 1) // 2 * 2 - 1
+
+
+def test_generated_ids_are_time_ordered_and_unique():
+    ids = [generate_id("WO") for _ in range(5000)]
+    assert ids == sorted(ids) and len(set(ids)) == len(ids)
+    prefix, ms, random = ids[0].split("-")
+    assert (prefix, len(ms), len(random)) == ("WO", 13, 16)
+    # Legacy IDs from an earlier millisecond sort before new ones
+    legacy = f"WO-{int(ms) - 1}-ab12cd"
+    assert sorted([ids[0], legacy]) == [legacy, ids[0]]
+
+
+def test_list_pages_by_primary_key(client: TestClient):
+    created = [
+        client.post(
+            "/api/workorders", json=_create_workorder_payload(assignedTo="tech-pages")
+        ).json()["id"]
+        for _ in range(5)
+    ]
+
+    seen, before = [], None
+    while True:
+        params = {"assignedTo": "tech-pages", "limit": 2}
+        if before:
+            params["before"] = before
+        resp = client.get("/api/workorders", params=params)
+        assert resp.status_code == 200
+        seen += [wo["id"] for wo in resp.json()]
+        before = resp.headers.get("X-Next-Cursor")
+        if before is None:
+            break
+    assert seen == created[::-1]
+
+
+def test_dates_keep_wire_format_and_filter_by_range(client: TestClient):
+    payload = _create_workorder_payload(
+        assignedTo="tech-dates", dueDate="2031-03-05", preferredDate=""
+    )
+    created = client.post("/api/workorders", json=payload).json()
+    assert created["dueDate"] == "2031-03-05"
+    assert created["preferredDate"] is None
+    client.post(
+        "/api/workorders",
+        json=_create_workorder_payload(assignedTo="tech-dates", dueDate="2031-04-01"),
+    )
+
+    bad = client.post(
+        "/api/workorders", json=_create_workorder_payload(dueDate="05/03/2031")
+    )
+    assert bad.status_code == 422
+    # An empty date input still creates the work order, without a due date
+    no_due = client.post("/api/workorders", json=_create_workorder_payload(dueDate=""))
+    assert no_due.status_code == 200
+    assert no_due.json()["dueDate"] is None
+
+    resp = client.get(
+        "/api/workorders",
+        params={
+            "assignedTo": "tech-dates",
+            "dueFrom": "2031-03-01",
+            "dueTo": "2031-03-31",
+        },
+    )
+    assert [wo["id"] for wo in resp.json()] == [created["id"]]
+    assert resp.json()[0]["dueDate"] == "2031-03-05"
+
+
+def test_status_and_priority_are_stored_as_codes(client: TestClient):
+    ids = {
+        priority: client.post(
+            "/api/workorders",
+            json=_create_workorder_payload(priority=priority, assignedTo="tech-rank"),
+        ).json()["id"]
+        for priority in ("Low", "Critical", "Medium", "High")
+    }
+    with TestingSessionLocal() as db:
+        stored = db.execute(
+            text("SELECT priority, status FROM workorders WHERE id = :id"),
+            {"id": ids["Critical"]},
+        ).one()
+    assert tuple(stored) == (4, 1)
+
+    resp = client.get(
+        "/api/workorders", params={"assignedTo": "tech-rank", "sortBy": "priority"}
+    )
+    assert [wo["priority"] for wo in resp.json()] == [
+        "Critical",
+        "High",
+        "Medium",
+        "Low",
+    ]
+    assert resp.json()[0]["status"] == "Open"
+
+    bad = client.post(
+        "/api/workorders", json=_create_workorder_payload(priority="Urgent")
+    )
+    assert bad.status_code == 422
+
+
+def _upload_image(client: TestClient, name: str) -> str:
+    payload = {"originalName": name, "base64Data": "AA=="}
+    return client.post("/api/images/upload-base64", json=payload).json()["id"]
+
+
+def test_image_refs_follow_work_orders(client: TestClient):
+    photo, other, evidence = (_upload_image(client, f"{n}.jpg") for n in "abc")
+    wo_id = client.post(
+        "/api/workorders",
+        json=_create_workorder_payload(
+            status="In Progress", assignedTo="tech-img", imageIds=[photo, other]
+        ),
+    ).json()["id"]
+    client.patch(
+        f"/api/workorders/{wo_id}/technician-update",
+        json={"technicianNotes": "Done", "technicianImages": [evidence]},
+        headers={"X-User-Role": "Technician", "X-User-Name": "tech-img"},
+    )
+
+    resp = client.get(
+        "/api/images/by-owner",
+        params={"ownerType": "workorder", "ownerIds": [wo_id, "WO-none"]},
+    )
+    assert resp.status_code == 200
+    assert [img["id"] for img in resp.json()[wo_id]] == [photo, other, evidence]
+    technician = client.get(
+        "/api/images/by-owner",
+        params={"ownerType": "workorder", "ownerIds": [wo_id], "role": "technician"},
+    ).json()
+    assert [img["id"] for img in technician[wo_id]] == [evidence]
+
+    references = client.get(f"/api/images/{evidence}/references").json()
+    assert references == [
+        {"ownerType": "workorder", "ownerId": wo_id, "role": "technician"}
+    ]
+
+    client.put(
+        f"/api/workorders/{wo_id}",
+        json={"imageIds": [photo]},
+        headers={"X-User-Role": "Admin", "X-User-Name": "admin"},
+    )
+    assert client.get(f"/api/images/{other}/references").json() == []
@@ -1,10 +1,69 @@
-import uuid
+import os
+import secrets
+import threading
+import time
 from datetime import datetime
 
+# Crockford base32: no I, L, O or U, so IDs are easy to read out
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Random part of an ID: 16 base32 characters
+ID_RANDOM_BITS = 80
+
+_id_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _reset_id_state() -> None:
+    # A forked worker must not continue the parent's sequence
+    global _last_ms, _last_random
+    _last_ms, _last_random = 0, 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_state)
+
+
+def _encode_crockford(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _next_id_parts() -> tuple:
+    """
+    (milliseconds, random) for the next ID, ULID-style monotonic: within
+    the same millisecond (or if the clock steps back) the previous random
+    part is incremented, so IDs from one process never collide and always
+    sort in creation order.
+    """
+    global _last_ms, _last_random
+    with _id_lock:
+        ms = int(time.time() * 1000)
+        if ms > _last_ms:
+            # Leave the top bit clear so increments can't run out
+            _last_ms, _last_random = ms, secrets.randbits(ID_RANDOM_BITS - 1)
+        else:
+            _last_random += 1
+            if _last_random >> ID_RANDOM_BITS:
+                _last_ms += 1
+                _last_random = secrets.randbits(ID_RANDOM_BITS - 1)
+        return _last_ms, _last_random
+
 
 def generate_id(prefix: str) -> str:
-    """Generate unique ID with prefix"""
-    return f"{prefix}-{int(datetime.now().timestamp() * 1000)}-{uuid.uuid4().hex[:6]}"
+    """
+    Generate a unique, time-ordered ID with prefix:
+    {prefix}-{13-digit epoch ms}-{16 Crockford base32 chars}.
+
+    IDs sort in creation order, also after legacy IDs of the form
+    {prefix}-{ms}-{6 hex chars}, so the primary key alone can be used for
+    keyset pagination.
+    """
+    ms, random = _next_id_parts()
+    return f"{prefix}-{ms:013d}-{_encode_crockford(random, ID_RANDOM_BITS // 5)}"
 
 
 def get_current_date() -> str:
@@ -0,0 +1,250 @@
+"""
+Image references of requests and work orders
+
+The JSON arrays (requests.image_ids, workorders.image_ids and
+workorders.technician_images) stay what the API returns; image_refs mirrors
+them one row per reference, so "which work orders use image X", "the images
+of these 50 cards" and finding unreferenced images are indexed joins instead
+of scans over every JSON array. Handlers call sync_image_refs() /
+delete_image_refs() before their commit.
+
+Images that nothing references any more are removed with:
+
+    python -m utils.image_refs gc --grace-hours 24
+
+The grace period keeps images uploaded for a request or work order that
+hasn't been saved yet. GC refuses to run while image_refs is empty but the
+arrays reference images (a database whose table was created by init_db
+rather than the migration); init_db fills it, as does:
+
+    python -m utils.image_refs backfill --chunk-size 1000
+"""
+
+import argparse
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from db.models import Image as ImageModel
+from db.models import ImageRef
+from db.models import Request as RequestModel
+from db.models import WorkOrder as WorkOrderModel
+from sqlalchemy import String, cast, delete, exists, insert, or_, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .storage import PICTURES_DIR
+
+IMAGE_GC_GRACE_HOURS = float(os.getenv("IMAGE_GC_GRACE_HOURS", "24"))
+IMAGE_REFS_BACKFILL_CHUNK_SIZE = int(
+    os.getenv("IMAGE_REFS_BACKFILL_CHUNK_SIZE", "1000")
+)
+
+# (owner type, model, {role: JSON array column})
+OWNERS = (
+    ("request", RequestModel, {"image": RequestModel.image_ids}),
+    (
+        "workorder",
+        WorkOrderModel,
+        {
+            "image": WorkOrderModel.image_ids,
+            "technician": WorkOrderModel.technician_images,
+        },
+    ),
+)
+
+
+async def sync_image_refs(
+    db: AsyncSession,
+    owner_type: str,
+    owner_id: str,
+    refs: Mapping[str, Optional[List[str]]],
+) -> None:
+    """
+    Replace the owner's references for each role in refs (role -> image ids
+    in array order) with one DELETE and one INSERT (no commit). Roles:
+    "image" (image_ids) and "technician" (workorders.technician_images).
+    """
+    await db.execute(
+        delete(ImageRef).where(
+            ImageRef.owner_type == owner_type,
+            ImageRef.owner_id == owner_id,
+            ImageRef.role.in_(list(refs)),
+        )
+    )
+    rows = [
+        {
+            "owner_type": owner_type,
+            "owner_id": owner_id,
+            "role": role,
+            "position": position,
+            "image_id": image_id,
+        }
+        for role, image_ids in refs.items()
+        for position, image_id in enumerate(image_ids or [])
+    ]
+    if rows:
+        await db.execute(insert(ImageRef), rows)
+
+
+async def delete_image_refs(db: AsyncSession, owner_type: str, owner_id: str) -> None:
+    """Drop all references of a deleted owner (no commit)"""
+    await db.execute(
+        delete(ImageRef).where(
+            ImageRef.owner_type == owner_type, ImageRef.owner_id == owner_id
+        )
+    )
+
+
+async def load_owner_images(
+    db: AsyncSession,
+    owner_type: str,
+    owner_ids: Iterable[str],
+    role: Optional[str] = None,
+) -> Dict[str, List[ImageModel]]:
+    """Images of many owners in array order, from one join"""
+    query = (
+        select(ImageRef.owner_id, ImageModel)
+        .join(ImageModel, ImageModel.id == ImageRef.image_id)
+        .where(
+            ImageRef.owner_type == owner_type,
+            ImageRef.owner_id.in_(list(owner_ids)),
+        )
+        .order_by(ImageRef.owner_id, ImageRef.role, ImageRef.position)
+    )
+    if role is not None:
+        query = query.where(ImageRef.role == role)
+    images: Dict[str, List[ImageModel]] = defaultdict(list)
+    for owner_id, image in await db.execute(query):
+        images[owner_id].append(image)
+    return dict(images)
+
+
+async def image_owners(db: AsyncSession, image_id: str) -> List[Dict[str, object]]:
+    """Requests and work orders that reference an image"""
+    rows = await db.execute(
+        select(ImageRef.owner_type, ImageRef.owner_id, ImageRef.role)
+        .where(ImageRef.image_id == image_id)
+        .distinct()
+        .order_by(ImageRef.owner_type, ImageRef.owner_id, ImageRef.role)
+    )
+    return [
+        {"ownerType": owner_type, "ownerId": owner_id, "role": role}
+        for owner_type, owner_id, role in rows
+    ]
+
+
+def refs_missing(conn: Connection) -> bool:
+    """True if image_refs is empty but a request or work order has images"""
+    if conn.scalar(select(exists().select_from(ImageRef))):
+        return False
+    for _, model, roles in OWNERS:
+        has_images = or_(
+            *(
+                cast(column, String).notin_(("[]", "null"))
+                for column in roles.values()
+            )
+        )
+        if conn.scalar(select(exists().where(has_images))):
+            return True
+    return False
+
+
+def backfill_image_refs(
+    engine: Engine, chunk_size: int = IMAGE_REFS_BACKFILL_CHUNK_SIZE
+) -> int:
+    """
+    Fill an empty image_refs from the JSON arrays, reading chunk_size owners
+    at a time, in one transaction so an interrupted run leaves it empty.
+    Does nothing if refs_missing() is false.
+
+    Returns:
+        Number of references inserted
+    """
+    inserted = 0
+    with engine.begin() as conn:
+        if not refs_missing(conn):
+            return 0
+        for owner_type, model, roles in OWNERS:
+            last_id = ""
+            while True:
+                rows = conn.execute(
+                    select(model.id, *roles.values())
+                    .where(model.id > last_id)
+                    .order_by(model.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    break
+                values = [
+                    {
+                        "owner_type": owner_type,
+                        "owner_id": row[0],
+                        "role": role,
+                        "position": position,
+                        "image_id": image_id,
+                    }
+                    for row in rows
+                    for role, image_ids in zip(roles, row[1:])
+                    for position, image_id in enumerate(image_ids or [])
+                    if isinstance(image_id, str)
+                ]
+                if values:
+                    conn.execute(insert(ImageRef), values)
+                inserted += len(values)
+                last_id = rows[-1][0]
+    print(f"[Images] Backfilled {inserted} image references")
+    return inserted
+
+
+def gc_images(engine: Engine, grace_hours: float = IMAGE_GC_GRACE_HOURS) -> int:
+    """
+    Delete images that no request or work order references and that are
+    older than grace_hours, in one statement, then their files.
+
+    Returns:
+        Number of images deleted
+    """
+    older_than = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+    with engine.begin() as conn:
+        if refs_missing(conn):
+            print("[Images] image_refs is empty, run the backfill before GC")
+            return 0
+        deleted = conn.execute(
+            delete(ImageModel)
+            .where(
+                ImageModel.created_at < older_than,
+                ~exists().where(ImageRef.image_id == ImageModel.id),
+            )
+            .returning(ImageModel.id, ImageModel.filename)
+        ).all()
+    for _, filename in deleted:
+        if not filename:
+            continue
+        filepath = os.path.join(PICTURES_DIR, filename)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+    print(f"[Images] Deleted {len(deleted)} unreferenced images")
+    return len(deleted)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Image references")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    gc = subcommands.add_parser("gc", help="Delete unreferenced images")
+    gc.add_argument("--grace-hours", type=float, default=IMAGE_GC_GRACE_HOURS)
+    backfill = subcommands.add_parser(
+        "backfill", help="Fill an empty image_refs from the JSON arrays"
+    )
+    backfill.add_argument(
+        "--chunk-size", type=int, default=IMAGE_REFS_BACKFILL_CHUNK_SIZE
+    )
+    args = parser.parse_args()
+
+    from db import engine
+
+    if args.command == "gc":
+        gc_images(engine, args.grace_hours)
+    else:
+        backfill_image_refs(engine, args.chunk_size)
@@ -0,0 +1,168 @@
+"""
+Cross-process leader locks
+
+Used to make sure only one uvicorn worker runs a periodic job (or a
+specific scan) at a time.
+
+- PostgreSQL: session-level advisory lock held on a dedicated connection
+- SQLite / anything else: exclusive, non-blocking lock on a local file
+"""
+
+import abc
+import os
+import tempfile
+import zlib
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR = os.getenv("LEADER_LOCK_DIR", tempfile.gettempdir())
+
+
+def lock_key(name: str) -> int:
+    """Stable signed 32-bit key for pg_advisory_lock derived from a lock name"""
+    return zlib.crc32(f"eureka:{name}".encode("utf-8")) - 2**31
+
+
+class LeaderLock(abc.ABC):
+    """Non-blocking, re-entrant-safe lock interface"""
+
+    name: str
+    held: bool = False
+
+    @abc.abstractmethod
+    def acquire(self) -> bool:
+        """Take the lock if it is free; True if this process holds it"""
+
+    @abc.abstractmethod
+    def release(self) -> None:
+        """Give the lock up if held"""
+
+    def check(self) -> bool:
+        """Return True if the lock is still held (e.g. connection still alive)"""
+        return self.held
+
+
+class AdvisoryLeaderLock(LeaderLock):
+    """PostgreSQL advisory lock bound to a dedicated connection.
+
+    The lock lives as long as the connection does, so if the worker dies the
+    database releases it automatically and another worker can take over.
+    """
+
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+        self.key = lock_key(name)
+        self.held = False
+        self._conn: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        if self.held:
+            return self.check()
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key}
+            ).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        self.held = True
+        return True
+
+    def check(self) -> bool:
+        if not self.held or self._conn is None:
+            return False
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception as e:
+            print(f"[LeaderLock] Lost advisory lock '{self.name}': {e}")
+            self._drop_connection()
+            return False
+
+    def release(self) -> None:
+        if not self.held or self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": self.key}
+            )
+            self._conn.commit()
+        except Exception as e:
+            print(f"[LeaderLock] Could not release advisory lock '{self.name}': {e}")
+        finally:
+            self._drop_connection()
+
+    def _drop_connection(self) -> None:
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        finally:
+            self._conn = None
+            self.held = False
+
+
+class FileLeaderLock(LeaderLock):
+    """Exclusive lock on a local file, the SQLite stand-in for advisory locks.
+
+    Works across worker processes on the same host, which is the only
+    deployment SQLite supports anyway.
+    """
+
+    def __init__(self, path: str, name: str = ""):
+        self.path = path
+        self.name = name or os.path.basename(path)
+        self.held = False
+        self._fd: Optional[int] = None
+
+    def acquire(self) -> bool:
+        if self.held:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self.held = True
+        return True
+
+    def release(self) -> None:
+        if not self.held or self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self.held = False
+
+
+def create_leader_lock(engine: Engine, name: str) -> LeaderLock:
+    """Pick the right lock implementation for the engine's database"""
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLeaderLock(engine, name)
+    return FileLeaderLock(os.path.join(LOCK_DIR, f"eureka-{name}.lock"), name)
@@ -0,0 +1,293 @@
+"""
+Notification retention
+
+- Read notifications are deleted after NOTIFICATION_RETENTION_READ_DAYS
+- Unread notifications are moved to notifications_archive after
+  NOTIFICATION_ARCHIVE_UNREAD_DAYS
+
+Deletes and archive moves run in batches of NOTIFICATION_RETENTION_BATCH_SIZE
+rows, one commit per batch, so the job never holds long locks.
+
+On PostgreSQL the notifications table is range-partitioned by created_at
+month. Monthly partitions are created ahead of time, and a month that is
+entirely past both retention windows is dropped as a whole (after its unread
+rows are archived) instead of being deleted row by row.
+"""
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from db.models import (
+    Notification as NotificationModel,
+    NotificationArchive,
+    NotificationOutbox,
+    NotificationRead,
+)
+from sqlalchemy import insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from .leader_lock import LeaderLock
+from .scheduler import LeaderJob
+
+NOTIFICATION_RETENTION_ENABLED = os.getenv("NOTIFICATION_RETENTION_ENABLED", "1") == "1"
+READ_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_READ_DAYS", "30"))
+UNREAD_ARCHIVE_DAYS = int(os.getenv("NOTIFICATION_ARCHIVE_UNREAD_DAYS", "90"))
+RETENTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_RETENTION_BATCH_SIZE", "500"))
+RETENTION_INTERVAL_SECONDS = float(
+    os.getenv("NOTIFICATION_RETENTION_INTERVAL_SECONDS", "21600")
+)
+PARTITION_MONTHS_AHEAD = int(os.getenv("NOTIFICATION_PARTITION_MONTHS_AHEAD", "2"))
+
+NOTIFICATIONS_TABLE = NotificationModel.__table__.name
+ARCHIVED_COLUMNS = [
+    "id",
+    "type",
+    "work_order_id",
+    "work_order_title",
+    "message",
+    "message_key",
+    "message_params",
+    "recipient_role",
+    "recipient_name",
+    "is_read",
+    "created_at",
+    "triggered_by",
+]
+
+
+# ==========================================
+# Batched row retention (all databases)
+# ==========================================
+
+
+def _delete_related(db: Session, notification_ids: List[str]) -> None:
+    db.query(NotificationRead).filter(
+        NotificationRead.notification_id.in_(notification_ids)
+    ).delete(synchronize_session=False)
+    db.query(NotificationOutbox).filter(
+        NotificationOutbox.notification_id.in_(notification_ids)
+    ).delete(synchronize_session=False)
+
+
+def delete_read_notifications(
+    db: Session, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE
+) -> int:
+    """Delete read notifications created before cutoff, one batch per commit"""
+    total = 0
+    while True:
+        ids = [
+            row[0]
+            for row in db.query(NotificationModel.id)
+            .filter(
+                NotificationModel.is_read == True,  # noqa: E712
+                NotificationModel.created_at < cutoff,
+            )
+            .limit(batch_size)
+        ]
+        if not ids:
+            return total
+        _delete_related(db, ids)
+        db.query(NotificationModel).filter(NotificationModel.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
+
+
+def archive_unread_notifications(
+    db: Session, cutoff: datetime, batch_size: int = RETENTION_BATCH_SIZE
+) -> int:
+    """Move unread notifications created before cutoff to notifications_archive"""
+    columns = [getattr(NotificationModel, name) for name in ARCHIVED_COLUMNS]
+    total = 0
+    while True:
+        ids = [
+            row[0]
+            for row in db.query(NotificationModel.id)
+            .filter(
+                NotificationModel.is_read != True,  # noqa: E712
+                NotificationModel.created_at < cutoff,
+            )
+            .limit(batch_size)
+        ]
+        if not ids:
+            return total
+        db.execute(
+            insert(NotificationArchive).from_select(
+                ARCHIVED_COLUMNS,
+                select(*columns).where(NotificationModel.id.in_(ids)),
+            )
+        )
+        _delete_related(db, ids)
+        db.query(NotificationModel).filter(NotificationModel.id.in_(ids)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        total += len(ids)
+        if len(ids) < batch_size:
+            return total
+
+
+# ==========================================
+# PostgreSQL monthly partitions
+# ==========================================
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f"{NOTIFICATIONS_TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p "
+                "JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = :name)"
+            ),
+            {"name": NOTIFICATIONS_TABLE},
+        ).scalar()
+    )
+
+
+def ensure_partitions(
+    conn: Connection, start: date, months_ahead: int = PARTITION_MONTHS_AHEAD
+) -> None:
+    """Create monthly partitions from start's month up to months_ahead past today"""
+    month = _month_start(start)
+    last = _month_start(date.today())
+    for _ in range(months_ahead):
+        last = _next_month(last)
+    while month <= last:
+        upper = _next_month(month)
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+                f"PARTITION OF {NOTIFICATIONS_TABLE} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        )
+        month = upper
+
+
+def list_partitions(conn: Connection) -> Dict[str, date]:
+    """Partition table name -> first day of its month"""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :name"
+        ),
+        {"name": NOTIFICATIONS_TABLE},
+    )
+    partitions = {}
+    prefix = f"{NOTIFICATIONS_TABLE}_p"
+    for (name,) in rows:
+        if name.startswith(prefix):
+            suffix = name[len(prefix):]
+            partitions[name] = date(int(suffix[:4]), int(suffix[4:6]), 1)
+    return partitions
+
+
+def drop_expired_partitions(conn: Connection, cutoff: datetime) -> List[str]:
+    """
+    Drop monthly partitions that end before cutoff.
+
+    Unread rows of the partition are copied to notifications_archive first;
+    receipts and outbox rows pointing at the dropped notifications go too.
+    """
+    dropped = []
+    columns = ", ".join(ARCHIVED_COLUMNS)
+    for name, month in sorted(list_partitions(conn).items(), key=lambda item: item[1]):
+        upper = _next_month(month)
+        if datetime.combine(upper, datetime.min.time(), timezone.utc) > cutoff:
+            continue
+        conn.execute(
+            text(
+                f"INSERT INTO {NotificationArchive.__tablename__} ({columns}) "
+                f"SELECT {columns} FROM {name} WHERE is_read IS NOT TRUE "
+                "ON CONFLICT (id) DO NOTHING"
+            )
+        )
+        for table in (NotificationRead.__tablename__, NotificationOutbox.__tablename__):
+            conn.execute(
+                text(
+                    f"DELETE FROM {table} WHERE notification_id IN (SELECT id FROM {name})"
+                )
+            )
+        conn.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    return dropped
+
+
+# ==========================================
+# Orchestration
+# ==========================================
+
+
+def run_retention(
+    db: Session,
+    read_days: int = READ_RETENTION_DAYS,
+    unread_days: int = UNREAD_ARCHIVE_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+) -> Dict[str, object]:
+    """Apply the retention policy once; returns what was removed"""
+    now = datetime.now(timezone.utc)
+    read_cutoff = now - timedelta(days=read_days)
+    unread_cutoff = now - timedelta(days=unread_days)
+    result: Dict[str, object] = {"droppedPartitions": []}
+
+    conn = db.connection()
+    if is_partitioned(conn):
+        ensure_partitions(conn, now.date())
+        # A whole month can go once both policies agree it has expired
+        result["droppedPartitions"] = drop_expired_partitions(
+            conn, min(read_cutoff, unread_cutoff)
+        )
+        db.commit()
+
+    result["deleted"] = delete_read_notifications(db, read_cutoff, batch_size)
+    result["archived"] = archive_unread_notifications(db, unread_cutoff, batch_size)
+    return result
+
+
+class NotificationRetentionJob(LeaderJob):
+    """Run the retention policy periodically on the leader worker"""
+
+    lock_name = "notification-retention"
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        engine: Engine,
+        interval: float = RETENTION_INTERVAL_SECONDS,
+        lock: Optional[LeaderLock] = None,
+    ):
+        super().__init__(session_factory, engine, interval, lock)
+
+    async def run(self) -> Dict[str, object]:
+        result = await run_in_threadpool(self._run_with_new_session)
+        if result["deleted"] or result["archived"] or result["droppedPartitions"]:
+            print(f"[Retention] Notifications cleaned up: {result}")
+        return result
+
+    def _run_with_new_session(self) -> Dict[str, object]:
+        db = self.session_factory()
+        try:
+            return run_retention(db)
+        finally:
+            db.close()
@@ -0,0 +1,187 @@
+"""
+Notification message templates
+
+Notifications are stored as a template key (e.g. "notif.due3Days") plus a
+small JSON object of parameters; the text is rendered per locale when the
+notification is read. Keys match the frontend i18n keys in lib/i18n.ts, so
+clients can also render them themselves.
+
+Rows in the notification_templates table override the built-in defaults
+below. They are cached in-process and reloaded after TEMPLATE_CACHE_TTL.
+"""
+
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from db.models import NotificationTemplate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+DEFAULT_LOCALE = os.getenv("NOTIFICATION_DEFAULT_LOCALE", "th")
+TEMPLATE_CACHE_TTL = float(os.getenv("NOTIFICATION_TEMPLATE_TTL_SECONDS", "300"))
+
+DEFAULT_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "notif.woCreated": 'New work order created: "{title}"',
+        "notif.woAssigned": 'You have been assigned to work order: "{title}"',
+        "notif.woCompleted": 'Work order "{title}" has been completed and is pending review',
+        "notif.woApproved": 'Work order "{title}" has been approved and is ready to be closed',
+        "notif.woApprovedRequestor": 'Your work order "{title}" has been approved and completed',
+        "notif.woApprovedTech": 'Work order "{title}" has been approved',
+        "notif.woRejected": 'Work order "{title}" needs revision',
+        "notif.woRejectedWithReason": 'Work order "{title}" needs revision. Reason: {reason}',
+        "notif.woClosed": 'Work order "{title}" has been closed',
+        "notif.reminder7Days": 'Work order "{title}" has an appointment in 7 days ({date})',
+        "notif.reminder3Days": '⚠️ Work order "{title}" has an appointment in 3 days ({date}). Please prepare.',
+        "notif.due7Days": '📅 Work order "{title}" is due in 7 days ({date})',
+        "notif.due3Days": '⚠️ Work order "{title}" is due in 3 days ({date}). Please expedite.',
+        "notif.due1Day": '🚨 Work order "{title}" is due tomorrow ({date}). Please complete!',
+    },
+    "th": {
+        "notif.woCreated": 'สร้างใบงานใหม่: "{title}"',
+        "notif.woAssigned": 'คุณได้รับมอบหมายใบงาน: "{title}"',
+        "notif.woCompleted": 'ใบงาน "{title}" เสร็จสิ้นแล้ว รอการตรวจสอบ',
+        "notif.woApproved": 'ใบงาน "{title}" ได้รับการอนุมัติแล้ว พร้อมปิดงาน',
+        "notif.woApprovedRequestor": 'ใบงานของคุณ "{title}" ได้รับการอนุมัติและเสร็จสิ้นแล้ว',
+        "notif.woApprovedTech": 'ใบงาน "{title}" ได้รับการอนุมัติแล้ว',
+        "notif.woRejected": 'ใบงาน "{title}" ต้องแก้ไข',
+        "notif.woRejectedWithReason": 'ใบงาน "{title}" ต้องแก้ไข เหตุผล: {reason}',
+        "notif.woClosed": 'ใบงาน "{title}" ถูกปิดแล้ว',
+        "notif.reminder7Days": 'งาน "{title}" มีกำหนดนัดหมายในอีก 7 วัน ({date})',
+        "notif.reminder3Days": '⚠️ งาน "{title}" มีกำหนดนัดหมายในอีก 3 วัน ({date}) กรุณาเตรียมตัวให้พร้อม',
+        "notif.due7Days": '📅 งาน "{title}" จะถึงกำหนดส่งในอีก 7 วัน ({date})',
+        "notif.due3Days": '⚠️ งาน "{title}" จะถึงกำหนดส่งในอีก 3 วัน ({date}) กรุณาเร่งดำเนินการ',
+        "notif.due1Day": '🚨 งาน "{title}" จะถึงกำหนดส่งพรุ่งนี้ ({date}) กรุณาดำเนินการให้เสร็จ!',
+    },
+}
+
+_ISO_DATE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
+
+
+class _Params(dict):
+    """format_map() mapping that leaves unknown placeholders untouched"""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _display_value(value) -> str:
+    """Dates are stored as YYYY-MM-DD and displayed as DD/MM/YYYY"""
+    value = "" if value is None else str(value)
+    match = _ISO_DATE.match(value)
+    if match:
+        year, month, day = match.groups()
+        return f"{day}/{month}/{year}"
+    return value
+
+
+def normalize_locale(locale: Optional[str]) -> str:
+    """Map 'th-TH,th;q=0.9,en;q=0.8' style values to a supported locale"""
+    if locale:
+        for part in locale.split(","):
+            language = part.split(";")[0].strip().lower()[:2]
+            if language in DEFAULT_TEMPLATES:
+                return language
+    return DEFAULT_LOCALE
+
+
+class TemplateCache:
+    """In-process cache of (key, locale) -> template body"""
+
+    def __init__(self, ttl: float = TEMPLATE_CACHE_TTL):
+        self.ttl = ttl
+        self._templates: Dict[Tuple[str, str], str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _defaults(self) -> Dict[Tuple[str, str], str]:
+        return {
+            (key, locale): body
+            for locale, templates in DEFAULT_TEMPLATES.items()
+            for key, body in templates.items()
+        }
+
+    def _is_fresh(self, now: float) -> bool:
+        return self._loaded_at is not None and now - self._loaded_at < self.ttl
+
+    def _store(self, rows, now: float) -> None:
+        templates = self._defaults()
+        for row in rows:
+            templates[(row.key, row.locale)] = row.body
+        with self._lock:
+            self._templates = templates
+            self._loaded_at = now
+
+    def refresh(self, db: Session, force: bool = False) -> None:
+        """Reload overrides from the database when the cache is stale"""
+        now = time.monotonic()
+        if not force and self._is_fresh(now):
+            return
+        try:
+            rows = db.query(NotificationTemplate).all()
+        except Exception as e:
+            print(f"[Templates] Using built-in notification templates: {e}")
+            rows = []
+        self._store(rows, now)
+
+    async def refresh_async(self, db: AsyncSession, force: bool = False) -> None:
+        """refresh() for request handlers using an AsyncSession"""
+        now = time.monotonic()
+        if not force and self._is_fresh(now):
+            return
+        try:
+            rows = (await db.execute(select(NotificationTemplate))).scalars().all()
+        except Exception as e:
+            print(f"[Templates] Using built-in notification templates: {e}")
+            rows = []
+        self._store(rows, now)
+
+    def templates_for(self, locale: str) -> Dict[str, str]:
+        templates = self._templates or self._defaults()
+        return {key: body for (key, loc), body in templates.items() if loc == locale}
+
+    def render(
+        self,
+        key: Optional[str],
+        params: Optional[dict],
+        locale: Optional[str] = None,
+        title: Optional[str] = None,
+        fallback: Optional[str] = None,
+    ) -> str:
+        """
+        Render a notification message.
+
+        Args:
+            key: Template key; legacy rows without one return `fallback`
+            params: Stored template parameters
+            locale: Requested locale (falls back to DEFAULT_LOCALE)
+            title: Work order title, injected as the {title} parameter
+            fallback: Pre-rendered legacy message
+
+        Returns:
+            The rendered message
+        """
+        if not key:
+            return fallback or ""
+        templates = self._templates or self._defaults()
+        locale = normalize_locale(locale)
+        body = templates.get((key, locale)) or templates.get((key, DEFAULT_LOCALE))
+        if body is None:
+            return fallback or key
+        values = _Params({name: _display_value(v) for name, v in (params or {}).items()})
+        if title is not None:
+            values.setdefault("title", title)
+        try:
+            return body.format_map(values)
+        except (ValueError, IndexError, AttributeError, KeyError) as e:
+            # A malformed stored template ("{", "{0}", "{a.b}") mustn't break
+            # the inbox
+            print(f"[Templates] Could not render {key} ({locale}): {e!r}")
+            return fallback or key
+
+
+template_cache = TemplateCache()
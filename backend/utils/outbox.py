@@ -0,0 +1,196 @@
+"""
+Transactional outbox for notification push delivery
+
+Notifications are written together with one outbox row per configured push
+channel, inside the transaction that caused them. The OutboxDispatcher (run
+on the leader worker) delivers pending rows and retries failures with
+exponential backoff, so a delivery is never lost when a request or tab dies
+after the commit.
+
+Channels are enabled with NOTIFICATION_OUTBOX_CHANNELS (comma separated):
+- log: print the notification (useful in development)
+- webhook: POST the notification JSON to NOTIFICATION_WEBHOOK_URL
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Union
+
+import httpx
+from db.models import Notification as NotificationModel
+from db.models import NotificationOutbox
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from .leader_lock import LeaderLock
+from .notification_templates import template_cache
+from .scheduler import LeaderJob
+
+OUTBOX_CHANNELS = [
+    c.strip()
+    for c in os.getenv("NOTIFICATION_OUTBOX_CHANNELS", "").split(",")
+    if c.strip()
+]
+OUTBOX_POLL_SECONDS = float(os.getenv("NOTIFICATION_OUTBOX_POLL_SECONDS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("NOTIFICATION_OUTBOX_BATCH_SIZE", "100"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", "8"))
+NOTIFICATION_WEBHOOK_URL = os.getenv("NOTIFICATION_WEBHOOK_URL")
+
+ChannelHandler = Callable[[dict], None]
+CHANNELS: Dict[str, ChannelHandler] = {}
+
+
+def register_channel(name: str):
+    """Register a push channel handler; it must raise on delivery failure"""
+
+    def decorator(handler: ChannelHandler) -> ChannelHandler:
+        CHANNELS[name] = handler
+        return handler
+
+    return decorator
+
+
+@register_channel("log")
+def _log_channel(payload: dict) -> None:
+    print(
+        f"[Outbox] {payload['type']} -> {payload['recipientRole']}"
+        f"/{payload['recipientName'] or '*'}: {payload['message']}"
+    )
+
+
+@register_channel("webhook")
+def _webhook_channel(payload: dict) -> None:
+    if not NOTIFICATION_WEBHOOK_URL:
+        raise RuntimeError("NOTIFICATION_WEBHOOK_URL is not set")
+    response = httpx.post(NOTIFICATION_WEBHOOK_URL, json=payload, timeout=5.0)
+    response.raise_for_status()
+
+
+def _payload(notification: NotificationModel) -> dict:
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "workOrderId": notification.work_order_id,
+        "workOrderTitle": notification.work_order_title,
+        "message": template_cache.render(
+            notification.message_key,
+            notification.message_params,
+            title=notification.work_order_title,
+            fallback=notification.message,
+        ),
+        "messageKey": notification.message_key,
+        "messageParams": notification.message_params,
+        "recipientRole": notification.recipient_role,
+        "recipientName": notification.recipient_name,
+        "triggeredBy": notification.triggered_by,
+    }
+
+
+def enqueue_outbox(
+    db: Union[Session, AsyncSession],
+    notification_ids: List[str],
+    channels: Optional[List[str]] = None,
+) -> None:
+    """Add outbox rows for the notifications to the session (no commit)"""
+    channels = OUTBOX_CHANNELS if channels is None else channels
+    now = datetime.now(timezone.utc)
+    for notification_id in notification_ids:
+        for channel in channels:
+            db.add(
+                NotificationOutbox(
+                    notification_id=notification_id,
+                    channel=channel,
+                    status="pending",
+                    attempts=0,
+                    next_attempt_at=now,
+                )
+            )
+
+
+def dispatch_pending(db: Session, batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """
+    Deliver one batch of due outbox rows and commit the results.
+
+    Returns:
+        Number of outbox rows processed
+    """
+    now = datetime.now(timezone.utc)
+    rows = (
+        db.query(NotificationOutbox)
+        .filter(
+            NotificationOutbox.status == "pending",
+            NotificationOutbox.next_attempt_at <= now,
+        )
+        .order_by(NotificationOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not rows:
+        return 0
+
+    template_cache.refresh(db)
+    notifications = {
+        n.id: n
+        for n in db.query(NotificationModel).filter(
+            NotificationModel.id.in_({row.notification_id for row in rows})
+        )
+    }
+
+    for row in rows:
+        notification = notifications.get(row.notification_id)
+        handler = CHANNELS.get(row.channel)
+        if notification is None or handler is None:
+            row.status = "dropped"
+            row.last_error = (
+                "notification deleted" if notification is None else "unknown channel"
+            )
+            continue
+
+        try:
+            handler(_payload(notification))
+        except Exception as e:
+            row.attempts += 1
+            row.last_error = str(e)[:1000]
+            if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+                row.status = "failed"
+            else:
+                row.next_attempt_at = now + timedelta(seconds=2**row.attempts)
+        else:
+            row.status = "delivered"
+            row.delivered_at = now
+
+    db.commit()
+    return len(rows)
+
+
+class OutboxDispatcher(LeaderJob):
+    """Deliver pending outbox rows on the leader worker"""
+
+    lock_name = "notification-outbox"
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        engine: Engine,
+        interval: float = OUTBOX_POLL_SECONDS,
+        lock: Optional[LeaderLock] = None,
+    ):
+        super().__init__(session_factory, engine, interval, lock)
+
+    async def run(self) -> int:
+        return await run_in_threadpool(self._dispatch_with_new_session)
+
+    def _dispatch_with_new_session(self) -> int:
+        db = self.session_factory()
+        try:
+            processed = 0
+            while True:
+                batch = dispatch_pending(db)
+                processed += batch
+                if batch < OUTBOX_BATCH_SIZE:
+                    return processed
+        finally:
+            db.close()
@@ -0,0 +1,202 @@
+"""
+Per-request profiler
+
+A RequestProfile collects folded stacks ("frame;frame;frame <microseconds>",
+the input format of flamegraph.pl, speedscope and inferno) for one request.
+
+It is driven by sys.setprofile on the event loop thread: every call/return
+event checks the profile ContextVar, so only code running for the profiled
+request is counted (other requests' tasks on the same loop carry a different
+context, and so do SQLAlchemy's greenlets for them). Time accumulates between
+the request's own events and its stack is captured every
+PROFILE_INTERVAL_MS, which keeps the overhead bounded on deep call trees.
+Time spent inside pydantic-core validators and serializers is measured
+exactly from its C call/return events.
+
+Work handed to the threadpool (run_in_threadpool) is not sampled; its SQL
+still shows up through the query statistics.
+"""
+
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+
+PROFILING_ENABLED = bool(PROFILE_DIR) and (
+    PROFILE_SAMPLE_RATE > 0 or bool(PROFILE_TOKEN)
+)
+
+PYDANTIC_CORE_MODULE = "pydantic_core._pydantic_core"
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=4096)
+def _short_filename(filename: str) -> str:
+    """Path relative to site-packages or the backend directory"""
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_BACKEND_DIR + os.sep):
+        return filename[len(_BACKEND_DIR) + 1 :]
+    return os.path.basename(filename)
+
+
+def _frame_name(code) -> str:
+    # ";" separates frames in the folded format
+    name = f"{code.co_qualname} ({_short_filename(code.co_filename)}:{code.co_firstlineno})"
+    return name.replace(";", ",")
+
+
+def folded_frame(text: str) -> str:
+    """Make arbitrary text (e.g. a SQL statement) safe to use as a frame"""
+    return " ".join(text.split()).replace(";", ",")
+
+
+class RequestProfile:
+    """Folded stacks and pydantic-core timings for one request"""
+
+    def __init__(
+        self,
+        root: str = "request",
+        interval: float = PROFILE_INTERVAL_MS / 1000,
+        stop_code=None,
+    ):
+        # Root frame of every stack; the route template is only known once
+        # the request has been routed, so it can be set until folded()
+        self.root = root
+        self.interval = interval
+        # Stack walks stop at this code object (the profiling middleware)
+        self.stop_code = stop_code
+        self.stacks: Dict[str, float] = {}
+        self.pending = 0.0
+        self.sampled = 0.0
+        self.pydantic = {"validation": 0.0, "serialization": 0.0}
+        self._pydantic_depth = 0
+        self._pydantic_started = 0.0
+
+    def _stack(self, frame, leaf: Optional[str]) -> str:
+        names: List[str] = []
+        if leaf is not None:
+            names.append(leaf)
+        while frame is not None and frame.f_code is not self.stop_code:
+            names.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+    def sample(self, frame, leaf: Optional[str] = None) -> None:
+        if frame is None:
+            return
+        key = self._stack(frame, leaf)
+        self.stacks[key] = self.stacks.get(key, 0.0) + self.pending
+        self.sampled += self.pending
+        self.pending = 0.0
+
+    def pydantic_call(self, now: float) -> None:
+        if self._pydantic_depth == 0:
+            self._pydantic_started = now
+        self._pydantic_depth += 1
+
+    def pydantic_return(self, function, now: float) -> None:
+        if self._pydantic_depth == 0:
+            return
+        self._pydantic_depth -= 1
+        if self._pydantic_depth == 0:
+            kind = "validation" if function.__name__.startswith("validate") else "serialization"
+            self.pydantic[kind] += now - self._pydantic_started
+
+    def add_stack(self, frames: List[str], seconds: float) -> None:
+        """Add a synthetic stack under the root frame (e.g. SQL statements)"""
+        key = ";".join(folded_frame(name) for name in frames)
+        self.stacks[key] = self.stacks.get(key, 0.0) + seconds
+
+    def folded(self) -> str:
+        """Folded stacks with microsecond weights"""
+        root = folded_frame(self.root)
+        lines = []
+        for stack, seconds in sorted(self.stacks.items()):
+            if seconds <= 0:
+                continue
+            path = f"{root};{stack}" if stack else root
+            lines.append(f"{path} {max(1, round(seconds * 1_000_000))}")
+        return "\n".join(lines) + "\n"
+
+
+_active: ContextVar[Optional[RequestProfile]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def _is_pydantic_core(function) -> bool:
+    return type(getattr(function, "__self__", None)).__module__ == PYDANTIC_CORE_MODULE
+
+
+class _ThreadHook:
+    """The sys.setprofile callback of one thread, shared by its profiled requests"""
+
+    def __init__(self):
+        self.users = 0
+        self.previous = None
+        self.owner: Optional[RequestProfile] = None
+        self.last = 0.0
+
+    def __call__(self, frame, event, arg) -> None:
+        now = time.perf_counter()
+        if self.owner is not None:
+            self.owner.pending += now - self.last
+        profile = _active.get()
+        self.owner = profile
+        if profile is not None:
+            if event == "c_call":
+                if _is_pydantic_core(arg):
+                    profile.pydantic_call(now)
+            elif event in ("c_return", "c_exception") and _is_pydantic_core(arg):
+                profile.pydantic_return(arg, now)
+            if profile.pending >= profile.interval:
+                # The time since the previous event was spent in the caller
+                # before a call, and in the callee before a return
+                if event == "call":
+                    profile.sample(frame.f_back)
+                elif event in ("c_return", "c_exception"):
+                    profile.sample(frame, f"{arg.__qualname__} (builtin)")
+                else:
+                    profile.sample(frame)
+        self.last = time.perf_counter()
+
+
+_local = threading.local()
+
+
+def start(profile: RequestProfile):
+    """
+    Start profiling the current context on this thread; returns the token
+    for stop()
+    """
+    hook = getattr(_local, "hook", None)
+    if hook is None:
+        hook = _local.hook = _ThreadHook()
+    if hook.users == 0:
+        hook.previous = sys.getprofile()
+        hook.last = time.perf_counter()
+        sys.setprofile(hook)
+    hook.users += 1
+    return _active.set(profile)
+
+
+def stop(token) -> None:
+    hook = _local.hook
+    _active.reset(token)
+    hook.users -= 1
+    if hook.users == 0:
+        sys.setprofile(hook.previous)
+        hook.previous = None
+        hook.owner = None
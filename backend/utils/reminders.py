@@ -0,0 +1,123 @@
+"""
+Reminder notifications for upcoming work orders
+
+Creates notifications for the assigned technician:
+- 7 and 3 days before the preferred maintenance date
+- 7, 3 and 1 day(s) before the due date
+
+Shared by the manual POST /api/notifications/check-reminders endpoint and the
+in-process reminder scheduler.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from db.models import Notification as NotificationModel
+from db.models import WorkOrder as WorkOrderModel
+from sqlalchemy.orm import Session
+
+from .helpers import generate_id
+from .leader_lock import create_leader_lock
+
+# (date column, days before, notification type, message template key)
+REMINDER_RULES = [
+    ("preferred_date", 7, "wo_reminder_7_days", "notif.reminder7Days"),
+    ("preferred_date", 3, "wo_reminder_3_days", "notif.reminder3Days"),
+    ("due_date", 7, "wo_due_7_days", "notif.due7Days"),
+    ("due_date", 3, "wo_due_3_days", "notif.due3Days"),
+    ("due_date", 1, "wo_due_1_day", "notif.due1Day"),
+]
+
+INACTIVE_STATUSES = ["Completed", "Closed", "Canceled"]
+
+
+class ReminderScanBusy(Exception):
+    """Raised when another worker is already running the reminder scan"""
+
+
+def create_due_reminders(db: Session) -> List[Dict[str, str]]:
+    """
+    Create any missing reminder notifications and commit them.
+
+    The scan is guarded by a cross-process lock so the scheduler and manual
+    triggers on different workers never insert the same reminder twice.
+
+    Raises:
+        ReminderScanBusy: If another process holds the scan lock
+    """
+    lock = create_leader_lock(db.get_bind(), "reminder-scan")
+    if not lock.acquire():
+        raise ReminderScanBusy()
+    try:
+        created = _scan(db)
+        db.commit()
+        return created
+    finally:
+        lock.release()
+
+
+def _scan(db: Session) -> List[Dict[str, str]]:
+    today = datetime.now().date()
+    created_notifications = []
+
+    for column in ("preferred_date", "due_date"):
+        # days before -> (notification type, message key)
+        rules = {
+            days: (notif_type, message_key)
+            for rule_column, days, notif_type, message_key in REMINDER_RULES
+            if rule_column == column
+        }
+        date_column = getattr(WorkOrderModel, column)
+
+        # Index lookups on the date column instead of parsing every work order
+        work_orders = (
+            db.query(WorkOrderModel)
+            .filter(
+                date_column.in_([today + timedelta(days=days) for days in rules]),
+                WorkOrderModel.assigned_to.isnot(None),
+                WorkOrderModel.status.notin_(INACTIVE_STATUSES),
+            )
+            .all()
+        )
+        if not work_orders:
+            continue
+
+        # Reminders that already exist for these work orders
+        existing = set(
+            db.query(NotificationModel.work_order_id, NotificationModel.type)
+            .filter(
+                NotificationModel.work_order_id.in_([wo.id for wo in work_orders]),
+                NotificationModel.type.in_([rule[0] for rule in rules.values()]),
+            )
+            .all()
+        )
+
+        for wo in work_orders:
+            target_date = getattr(wo, column)
+            notif_type, message_key = rules[(target_date - today).days]
+            if (wo.id, notif_type) in existing:
+                continue
+
+            db.add(
+                NotificationModel(
+                    id=generate_id("notif"),
+                    type=notif_type,
+                    work_order_id=wo.id,
+                    work_order_title=wo.title,
+                    message_key=message_key,
+                    message_params={"date": target_date.isoformat()},
+                    recipient_role="Technician",
+                    recipient_name=wo.assigned_to,
+                    is_read=False,
+                    triggered_by="System",
+                )
+            )
+            created_notifications.append(
+                {
+                    "workOrderId": wo.id,
+                    "type": notif_type,
+                    "assignedTo": wo.assigned_to,
+                }
+            )
+
+    return created_notifications
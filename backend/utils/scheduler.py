@@ -0,0 +1,155 @@
+"""
+In-process background jobs
+
+Started from the FastAPI lifespan in main.py. Every worker runs the job
+loops, but only the worker holding a job's leader lock actually runs it.
+"""
+
+import abc
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from .leader_lock import LeaderLock, create_leader_lock
+from .reminders import ReminderScanBusy, create_due_reminders
+
+REMINDER_SCHEDULER_ENABLED = os.getenv("REMINDER_SCHEDULER_ENABLED", "1") == "1"
+REMINDER_INTERVAL_SECONDS = float(os.getenv("REMINDER_INTERVAL_SECONDS", "3600"))
+
+
+class SingleFlight:
+    """Collapse concurrent calls into one execution within this process.
+
+    Callers that arrive while a run is in flight await the same result
+    instead of starting another one.
+    """
+
+    def __init__(self):
+        self._inflight: Optional[asyncio.Future] = None
+
+    async def run(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if self._inflight is not None:
+            return await asyncio.shield(self._inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so asyncio doesn't warn when nobody else waited
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight = None
+
+
+reminder_scan = SingleFlight()
+
+
+class LeaderJob(abc.ABC):
+    """Periodic background job that only runs on the elected leader worker.
+
+    Every worker runs the loop; the ones that don't hold the leader lock just
+    keep retrying so one of them takes over if the leader dies.
+    """
+
+    lock_name = ""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        engine: Engine,
+        interval: float,
+        lock: Optional[LeaderLock] = None,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.lock = lock or create_leader_lock(engine, self.lock_name)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.held
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await run_in_threadpool(self.lock.release)
+
+    async def tick(self) -> Any:
+        """Run one round; returns None when this worker is not the leader"""
+        if not await run_in_threadpool(self._ensure_leadership):
+            return None
+        return await self.run()
+
+    @abc.abstractmethod
+    async def run(self) -> Any:
+        """The job's work for one round on the leader"""
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Scheduler] Job '{self.lock_name}' failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def _ensure_leadership(self) -> bool:
+        if self.lock.held:
+            return self.lock.check() or self.lock.acquire()
+        if self.lock.acquire():
+            print(f"[Scheduler] This worker is now the leader for '{self.lock_name}'")
+            return True
+        return False
+
+
+class ReminderScheduler(LeaderJob):
+    """Periodically run the reminder scan on the elected leader worker"""
+
+    lock_name = "reminder-scheduler"
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        engine: Engine,
+        interval: float = REMINDER_INTERVAL_SECONDS,
+        lock: Optional[LeaderLock] = None,
+    ):
+        super().__init__(session_factory, engine, interval, lock)
+
+    async def run(self) -> Optional[list]:
+        try:
+            created = await reminder_scan.run(
+                lambda: run_in_threadpool(self._scan_with_new_session)
+            )
+        except ReminderScanBusy:
+            return None
+        if created:
+            print(f"[Scheduler] Created {len(created)} reminder notifications")
+        return created
+
+    def _scan_with_new_session(self) -> list:
+        db = self.session_factory()
+        try:
+            return create_due_reminders(db)
+        finally:
+            db.close()
@@ -0,0 +1,100 @@
+"""
+Server-side workflow notifications
+
+Transition handlers call enqueue_workflow_notifications() before their
+commit, so the state change, its notifications and their outbox entries are
+written in one transaction. Recipients come from get_notification_recipients().
+"""
+
+from typing import List, Optional, Union
+
+from db.models import Notification as NotificationModel
+from db.models import WorkOrder as WorkOrderModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .helpers import generate_id
+from .outbox import enqueue_outbox
+from .workflow_rules import UserRole, get_notification_recipients
+
+NOTIFICATION_TYPES = {
+    "created": "wo_created",
+    "assigned": "wo_assigned",
+    "completed": "wo_completed",
+    "approved": "wo_approved",
+    "rejected": "wo_rejected",
+    "closed": "wo_closed",
+}
+
+# (action, recipient role) -> message template key; falls back to (action, None)
+MESSAGE_KEYS = {
+    ("created", None): "notif.woCreated",
+    ("assigned", None): "notif.woAssigned",
+    ("completed", None): "notif.woCompleted",
+    ("approved", None): "notif.woApproved",
+    ("approved", UserRole.REQUESTER): "notif.woApprovedRequestor",
+    ("approved", UserRole.TECHNICIAN): "notif.woApprovedTech",
+    ("rejected", None): "notif.woRejected",
+    ("closed", None): "notif.woClosed",
+}
+
+
+def _recipient_name(wo: WorkOrderModel, role: UserRole) -> Optional[str]:
+    """Technicians and requesters are addressed by name, other roles get a broadcast"""
+    if role == UserRole.TECHNICIAN:
+        return wo.assigned_to
+    if role == UserRole.REQUESTER:
+        return wo.created_by
+    return None
+
+
+def _message_key(action: str, role: UserRole, reason: Optional[str]) -> str:
+    if action == "rejected" and reason:
+        return "notif.woRejectedWithReason"
+    return MESSAGE_KEYS.get((action, role)) or MESSAGE_KEYS[(action, None)]
+
+
+def enqueue_workflow_notifications(
+    db: Union[Session, AsyncSession],
+    wo: WorkOrderModel,
+    action: str,
+    triggered_by: str,
+    reason: Optional[str] = None,
+) -> List[NotificationModel]:
+    """
+    Add notifications for a workflow action to the session (no commit).
+
+    Args:
+        db: Session of the transition (sync or async); the caller commits
+        wo: Work order after the transition has been applied
+        action: Workflow action (created, assigned, completed, rejected, approved, closed)
+        triggered_by: Name of the user who performed the action
+        reason: Optional rejection reason
+
+    Returns:
+        The notification rows that were added
+    """
+    notifications = []
+    for role in get_notification_recipients(action):
+        recipient_name = _recipient_name(wo, role)
+        if role in (UserRole.TECHNICIAN, UserRole.REQUESTER) and not recipient_name:
+            # Don't broadcast a personal notification to everyone with the role
+            continue
+
+        notification = NotificationModel(
+            id=generate_id("notif"),
+            type=NOTIFICATION_TYPES[action],
+            work_order_id=wo.id,
+            work_order_title=wo.title,
+            message_key=_message_key(action, role, reason),
+            message_params={"reason": reason} if reason else None,
+            recipient_role=role.value,
+            recipient_name=recipient_name,
+            is_read=False,
+            triggered_by=triggered_by,
+        )
+        db.add(notification)
+        notifications.append(notification)
+
+    enqueue_outbox(db, [n.id for n in notifications])
+    return notifications
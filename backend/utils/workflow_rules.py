@@ -9,6 +9,10 @@ Workflow:
    - Reject → status = In Progress
    - Approve → status = Completed
 5. Admin closes → status = Closed
+
+Allowed next statuses and permissions are precomputed per (status, role)
+(and, for technicians, whether the work order is assigned to them), so
+annotating a list of work orders costs a dictionary lookup per row.
 """
 
 from typing import List, Dict, Set, Tuple
@@ -24,6 +28,35 @@ class Status(str, Enum):
     CANCELED = "Canceled"
 
 
+class Priority(str, Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+    CRITICAL = "Critical"
+
+
+# SMALLINT codes stored in the status and priority columns. Stored data
+# depends on them: add new values with new codes, never renumber.
+STATUS_CODES: Dict[str, int] = {
+    Status.OPEN.value: 1,
+    Status.IN_PROGRESS.value: 2,
+    Status.PENDING.value: 3,
+    Status.COMPLETED.value: 4,
+    Status.CLOSED.value: 5,
+    Status.CANCELED.value: 6,
+}
+# Requests additionally end up converted to a work order
+REQUEST_CONVERTED = "Converted to WO"
+REQUEST_STATUS_CODES: Dict[str, int] = {**STATUS_CODES, REQUEST_CONVERTED: 7}
+# In order of importance, so sorting by the column sorts by priority rank
+PRIORITY_CODES: Dict[str, int] = {
+    Priority.LOW.value: 1,
+    Priority.MEDIUM.value: 2,
+    Priority.HIGH.value: 3,
+    Priority.CRITICAL.value: 4,
+}
+
+
 class UserRole(str, Enum):
     REQUESTER = "Requester"
     TECHNICIAN = "Technician"
@@ -70,6 +103,15 @@ class WorkOrderPermissions:
         self.can_delete = can_delete
         self.can_view = can_view
 
+    def as_dict(self) -> Dict[str, bool]:
+        return {
+            "canEdit": self.can_edit,
+            "canChangeStatus": self.can_change_status,
+            "canAssign": self.can_assign,
+            "canDelete": self.can_delete,
+            "canView": self.can_view,
+        }
+
 
 def is_transition_allowed(from_status: str, to_status: str, user_role: str) -> bool:
     """
@@ -89,6 +131,19 @@ def is_transition_allowed(from_status: str, to_status: str, user_role: str) -> b
     return any(role.value == user_role for role in allowed_roles)
 
 
+def _next_statuses_table() -> Dict[Tuple[str, str], Tuple[Status, ...]]:
+    table: Dict[Tuple[str, str], Tuple[Status, ...]] = {}
+    for (from_status, to_status), allowed_roles in STATUS_TRANSITIONS.items():
+        for role in allowed_roles:
+            key = (from_status.value, role.value)
+            table[key] = table.get(key, ()) + (to_status,)
+    return table
+
+
+# (status, role) -> allowed next statuses, in STATUS_TRANSITIONS order
+NEXT_STATUSES = _next_statuses_table()
+
+
 def get_allowed_next_statuses(current_status: str, user_role: str) -> List[str]:
     """
     Get allowed next statuses for current status and user role
@@ -100,33 +155,13 @@ def get_allowed_next_statuses(current_status: str, user_role: str) -> List[str]:
     Returns:
         List of allowed next statuses
     """
-    allowed_statuses = []
-    for (from_status, to_status), allowed_roles in STATUS_TRANSITIONS.items():
-        if from_status != current_status:
-            continue
-
-        # Compare the provided user_role string against the enum values in
-        # allowed_roles, similar to is_transition_allowed.
-        if any(role.value == user_role for role in allowed_roles):
-            allowed_statuses.append(to_status)
-    return allowed_statuses
+    return list(NEXT_STATUSES.get((current_status, user_role), ()))
 
 
-def get_work_order_permissions(
+def _compute_permissions(
     status: str, user_role: str, assigned_to: str = None, current_user_name: str = None
 ) -> WorkOrderPermissions:
-    """
-    Get permissions for a work order based on status and user role
-
-    Args:
-        status: Work order status
-        user_role: User's role
-        assigned_to: Name of assigned technician
-        current_user_name: Name of current user
-
-    Returns:
-        WorkOrderPermissions object
-    """
+    """Evaluate the permission rules (used to build the lookup tables)"""
     permissions = WorkOrderPermissions()
 
     # Admin has full control except editing closed work orders
@@ -162,6 +197,76 @@ def get_work_order_permissions(
     return permissions
 
 
+# (status, role, is assigned to the user) -> permissions, for every known
+# status and role. The instances are shared: don't modify them.
+PERMISSIONS: Dict[Tuple[str, str, bool], WorkOrderPermissions] = {
+    (status.value, role.value, is_assigned): _compute_permissions(
+        status.value, role.value, "user" if is_assigned else None, "user"
+    )
+    for status in Status
+    for role in UserRole
+    for is_assigned in (True, False)
+}
+
+
+def get_work_order_permissions(
+    status: str, user_role: str, assigned_to: str = None, current_user_name: str = None
+) -> WorkOrderPermissions:
+    """
+    Get permissions for a work order based on status and user role
+
+    Args:
+        status: Work order status
+        user_role: User's role
+        assigned_to: Name of assigned technician
+        current_user_name: Name of current user
+
+    Returns:
+        WorkOrderPermissions object (shared, read only)
+    """
+    permissions = PERMISSIONS.get(
+        (status, user_role, assigned_to == current_user_name)
+    )
+    if permissions is None:
+        # Status or role outside the enums
+        return _compute_permissions(status, user_role, assigned_to, current_user_name)
+    return permissions
+
+
+def _annotation(
+    permissions: WorkOrderPermissions, next_statuses: Tuple[Status, ...]
+) -> dict:
+    return {
+        "permissions": permissions.as_dict(),
+        "allowedNextStatuses": [status.value for status in next_statuses],
+    }
+
+
+# (status, role, is assigned to the user) -> JSON-ready annotation
+ANNOTATIONS: Dict[Tuple[str, str, bool], dict] = {
+    key: _annotation(permissions, NEXT_STATUSES.get(key[:2], ()))
+    for key, permissions in PERMISSIONS.items()
+}
+
+
+def work_order_annotation(
+    status: str, user_role: str, assigned_to: str = None, current_user_name: str = None
+) -> dict:
+    """
+    permissions and allowedNextStatuses of a work order for a user, as added
+    to annotated list responses (a dict lookup; the dict is shared)
+    """
+    annotation = ANNOTATIONS.get((status, user_role, assigned_to == current_user_name))
+    if annotation is None:
+        annotation = _annotation(
+            get_work_order_permissions(
+                status, user_role, assigned_to, current_user_name
+            ),
+            NEXT_STATUSES.get((status, user_role), ()),
+        )
+    return annotation
+
+
 def get_notification_recipients(action: str) -> List[str]:
     """
     Get notification recipients based on workflow action
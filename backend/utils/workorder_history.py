@@ -0,0 +1,207 @@
+"""
+Work order status history and workflow analytics
+
+Every status change appends a row to workorder_events in the transaction
+that makes it (history_event() / record_history()), including creation
+(from_status NULL). Rows are never updated, so the table is the timeline
+the analytics are computed from:
+
+- MTTR: hours from creation to Completed (approval)
+- time in status: hours between consecutive events of a work order
+- rejection rate: Pending -> In Progress over In Progress -> Pending
+
+load_workorder_analytics() reads the events of the work orders that
+changed in the window with one query and computes the percentiles for all
+statuses, technicians and assets in bulk with NumPy.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+from db.models import WorkOrderEvent
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .workflow_rules import Status
+
+PERCENTILES = (50, 90, 95)
+
+SECONDS_PER_HOUR = 3600.0
+
+
+def history_event(
+    wo: Any,
+    from_status: Optional[str],
+    actor: Optional[str] = None,
+    reason: Optional[str] = None,
+) -> Optional[WorkOrderEvent]:
+    """
+    The event for a work order that has just moved from from_status (None
+    when it was created) to its current status; None if the status is
+    unchanged.
+    """
+    if wo.status == from_status:
+        return None
+    return WorkOrderEvent(
+        work_order_id=wo.id,
+        from_status=from_status,
+        to_status=wo.status,
+        at=datetime.now(timezone.utc),
+        actor=actor,
+        assigned_to=wo.assigned_to,
+        asset_name=wo.asset_name,
+        reason=reason,
+    )
+
+
+def record_history(
+    db: AsyncSession, events: Iterable[Optional[WorkOrderEvent]]
+) -> None:
+    """Add events to the session (no commit); None entries are skipped"""
+    db.add_all([event for event in events if event is not None])
+
+
+def _utc(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite returns the stored UTC time without its timezone
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _hours(value: float) -> Optional[float]:
+    return round(float(value), 2) if np.isfinite(value) else None
+
+
+def _summary(hours: np.ndarray) -> Dict[str, Any]:
+    if hours.size == 0:
+        return {"count": 0, "mean": None, **{f"p{p}": None for p in PERCENTILES}}
+    points = np.percentile(hours, PERCENTILES)
+    return {
+        "count": int(hours.size),
+        "mean": _hours(hours.mean()),
+        **{f"p{p}": _hours(v) for p, v in zip(PERCENTILES, points)},
+    }
+
+
+def _by_group(
+    groups: np.ndarray,
+    repaired: np.ndarray,
+    repair_hours: np.ndarray,
+    submitted: np.ndarray,
+    rejected: np.ndarray,
+) -> Dict[str, Dict[str, Any]]:
+    """Per technician or asset: completions, MTTR and rejection rate"""
+    names, codes = np.unique(groups, return_inverse=True)
+    size = len(names)
+    completed = np.bincount(codes[repaired], minlength=size)
+    repair_sum = np.bincount(codes[repaired], weights=repair_hours, minlength=size)
+    submitted_count = np.bincount(codes, weights=submitted, minlength=size)
+    rejected_count = np.bincount(codes, weights=rejected, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mttr = repair_sum / completed
+        rate = rejected_count / submitted_count
+
+    result = {}
+    for i, name in enumerate(names):
+        if not name or not (completed[i] or submitted_count[i]):
+            continue
+        result[str(name)] = {
+            "completed": int(completed[i]),
+            "mttrHours": _hours(mttr[i]),
+            "submitted": int(submitted_count[i]),
+            "rejected": int(rejected_count[i]),
+            "rejectionRate": (
+                round(float(rate[i]), 4) if submitted_count[i] else None
+            ),
+        }
+    return result
+
+
+async def load_workorder_analytics(
+    db: AsyncSession, start: date, end: date
+) -> Dict[str, Any]:
+    """
+    MTTR, time-in-status percentiles and rejection rates for the changes made
+    from start to end (inclusive), overall and per technician and asset.
+    """
+    window_start, window_end = _utc(start), _utc(end + timedelta(days=1))
+    changed = (
+        select(WorkOrderEvent.work_order_id)
+        .where(WorkOrderEvent.at >= window_start, WorkOrderEvent.at < window_end)
+        .distinct()
+    )
+    rows = (
+        await db.execute(
+            select(
+                WorkOrderEvent.work_order_id,
+                WorkOrderEvent.from_status,
+                WorkOrderEvent.to_status,
+                WorkOrderEvent.at,
+                WorkOrderEvent.assigned_to,
+                WorkOrderEvent.asset_name,
+            )
+            .where(WorkOrderEvent.work_order_id.in_(changed))
+            .order_by(
+                WorkOrderEvent.work_order_id, WorkOrderEvent.at, WorkOrderEvent.id
+            )
+        )
+    ).all()
+
+    wo_ids = np.array([row.work_order_id for row in rows], dtype=object)
+    from_status = np.array([row.from_status or "" for row in rows], dtype=object)
+    to_status = np.array([row.to_status for row in rows], dtype=object)
+    at = np.array([_timestamp(row.at) for row in rows], dtype=float)
+    technician = np.array([row.assigned_to or "" for row in rows], dtype=object)
+    asset = np.array([row.asset_name or "" for row in rows], dtype=object)
+    in_window = (at >= window_start.timestamp()) & (at < window_end.timestamp())
+
+    # Rows are grouped by work order: a group starts where the id changes
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = wo_ids[1:] != wo_ids[:-1]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(rows)), 0))
+
+    # Time in status: each event to the next one of the same work order,
+    # counted in the window the status was left
+    follows = ~first[1:]
+    left_in_window = follows & in_window[1:]
+    segment_hours = ((at[1:] - at[:-1]) / SECONDS_PER_HOUR)[left_in_window]
+    segment_status = to_status[:-1][left_in_window]
+    time_in_status = {
+        str(status): _summary(segment_hours[segment_status == status])
+        for status in np.unique(segment_status)
+    }
+
+    # MTTR: creation (first event) to each completion in the window
+    repaired = (to_status == Status.COMPLETED.value) & in_window
+    repair_hours = (at - at[group_start])[repaired] / SECONDS_PER_HOUR
+
+    submitted = (
+        (to_status == Status.PENDING.value)
+        & (from_status == Status.IN_PROGRESS.value)
+        & in_window
+    )
+    rejected = (
+        (from_status == Status.PENDING.value)
+        & (to_status == Status.IN_PROGRESS.value)
+        & in_window
+    )
+    groups = (repaired, repair_hours, submitted, rejected)
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "mttrHours": _summary(repair_hours),
+        "timeInStatusHours": time_in_status,
+        "rejectionRate": (
+            round(float(rejected.sum() / submitted.sum()), 4)
+            if submitted.any()
+            else None
+        ),
+        "byTechnician": _by_group(technician, *groups),
+        "byAsset": _by_group(asset, *groups),
+        "generatedAt": datetime.now(timezone.utc).isoformat(),
+    }
@@ -0,0 +1,242 @@
+"""
+Daily work order rollups for trend charts
+
+workorder_daily_rollups counts workflow events per day, priority and
+location: created, completed (approved), closed, canceled and deleted. The
+handlers record an event in the transaction that causes it (record_events()),
+so trend queries read the rollups alone and never scan workorders. The
+backlog on a day is the running total of created minus closed, canceled and
+deleted work orders.
+
+History from before the rollups existed is rebuilt from the work order
+timestamps (created_at, approved_at, closed_at) in chunks:
+
+    python -m utils.workorder_rollups backfill --chunk-size 1000
+
+The backfill only raises counts before today: each rebuilt created,
+completed and closed count is merged into the stored one (the larger
+wins) in a single transaction, so running it again changes nothing, live
+events the timestamps can't show (cancellations, deletions, completions
+without an approval, work orders deleted since) are kept, and today's
+rollups, which the handlers keep current, are left alone.
+"""
+
+import argparse
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from db.models import WorkOrder as WorkOrderModel
+from db.models import WorkOrderDailyRollup
+from db.upsert import dialect_insert, increment
+from sqlalchemy import case, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .workflow_rules import Status
+
+ROLLUP_BACKFILL_CHUNK_SIZE = int(os.getenv("ROLLUP_BACKFILL_CHUNK_SIZE", "1000"))
+
+EVENTS = ("created", "completed", "closed", "canceled", "deleted")
+# Event recorded when a work order enters the status
+STATUS_EVENTS = {
+    Status.COMPLETED.value: "completed",
+    Status.CLOSED.value: "closed",
+    Status.CANCELED.value: "canceled",
+}
+# Events that take a work order out of the backlog
+BACKLOG_EXITS = ("closed", "canceled", "deleted")
+# Events the backfill can rebuild from the work order timestamps
+BACKFILL_EVENTS = ("created", "completed", "closed")
+
+KEY_FIELDS = ("day", "event", "priority", "location")
+
+# (event, priority, location)
+Event = Tuple[str, str, str]
+
+
+def workorder_event(event: str, wo: Any) -> Event:
+    return (event, wo.priority or "", wo.location or "")
+
+
+def status_events(wo: Any, previous_status: Optional[str] = None) -> List[Event]:
+    """The event for a work order that has just moved to its current status"""
+    event = STATUS_EVENTS.get(wo.status)
+    if event is None or wo.status == previous_status:
+        return []
+    return [workorder_event(event, wo)]
+
+
+def deletion_events(wo: Any) -> List[Event]:
+    """Deleting a work order still in the backlog takes it out"""
+    if wo.status in (Status.CLOSED.value, Status.CANCELED.value):
+        return []
+    return [workorder_event("deleted", wo)]
+
+
+async def record_events(
+    db: AsyncSession, events: Iterable[Event], day: Optional[date] = None
+) -> None:
+    """Add events to today's rollups in one upsert (no commit)"""
+    day = day or date.today()
+    rows = [
+        {**dict(zip(KEY_FIELDS, (day, *event))), "total": count}
+        for event, count in Counter(events).items()
+    ]
+    if rows:
+        await db.execute(
+            increment(db.get_bind(), WorkOrderDailyRollup.__table__, KEY_FIELDS),
+            rows,
+        )
+
+
+def _local_day(value: datetime) -> date:
+    # created_at comes back timezone-aware, the workflow stamps are local time
+    return (value.astimezone() if value.tzinfo else value).date()
+
+
+def backfill_rollups(
+    engine: Engine,
+    chunk_size: int = ROLLUP_BACKFILL_CHUNK_SIZE,
+    before: Optional[date] = None,
+) -> int:
+    """
+    Rebuild the rollups of days before `before` (default today) from the
+    work order timestamps, reading chunk_size work orders at a time, and
+    merge them into the stored rollups in one transaction.
+
+    Returns:
+        Number of work orders processed
+    """
+    before = before or date.today()
+    table = WorkOrderDailyRollup.__table__
+    counts: Counter = Counter()
+    processed = 0
+    last_id = ""
+    while True:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(
+                    WorkOrderModel.id,
+                    WorkOrderModel.priority,
+                    WorkOrderModel.location,
+                    WorkOrderModel.created_at,
+                    WorkOrderModel.approved_at,
+                    WorkOrderModel.closed_at,
+                )
+                .where(WorkOrderModel.id > last_id)
+                .order_by(WorkOrderModel.id)
+                .limit(chunk_size)
+            ).all()
+        if not rows:
+            break
+        for row in rows:
+            for event, value in zip(
+                BACKFILL_EVENTS, (row.created_at, row.approved_at, row.closed_at)
+            ):
+                if value is None or _local_day(value) >= before:
+                    continue
+                counts[(_local_day(value), *workorder_event(event, row))] += 1
+        last_id = rows[-1].id
+        processed += len(rows)
+        print(f"[Rollups] Read {processed} work orders")
+
+    with engine.begin() as conn:
+        stored = conn.execute(
+            select(*(table.c[field] for field in KEY_FIELDS), table.c.total).where(
+                table.c.day < before, table.c.event.in_(BACKFILL_EVENTS)
+            )
+        )
+        for *key, total in stored:
+            if tuple(key) in counts:
+                counts[tuple(key)] = max(counts[tuple(key)], total)
+        if counts:
+            insert = dialect_insert(conn, table)
+            conn.execute(
+                insert.on_conflict_do_update(
+                    index_elements=list(KEY_FIELDS),
+                    set_={"total": insert.excluded.total},
+                ),
+                [
+                    {**dict(zip(KEY_FIELDS, key)), "total": count}
+                    for key, count in counts.items()
+                ],
+            )
+    print(f"[Rollups] Backfilled {len(counts)} rollups from {processed} work orders")
+    return processed
+
+
+def _empty_day(day: date) -> Dict[str, Any]:
+    return {"day": day.isoformat(), **{event: 0 for event in EVENTS}, "backlog": 0}
+
+
+async def load_trends(
+    db: AsyncSession,
+    start: date,
+    end: date,
+    group_by: Optional[str] = None,
+    priority: Optional[str] = None,
+    location: Optional[str] = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Events and backlog per day from start to end, per group_by value
+    (priority or location) or under "all". One grouped query: rows before
+    start are summed into the opening backlog.
+    """
+    rollup = WorkOrderDailyRollup
+    bucket = case((rollup.day < start, None), else_=rollup.day).label("bucket")
+    group = getattr(rollup, group_by) if group_by else None
+    columns = [bucket, rollup.event, func.sum(rollup.total)]
+    if group is not None:
+        columns.append(group)
+    query = select(*columns).where(rollup.day <= end).group_by(bucket, rollup.event)
+    if group is not None:
+        query = query.group_by(group)
+    if priority:
+        query = query.where(rollup.priority == priority)
+    if location:
+        query = query.where(rollup.location == location)
+
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    index = {day.isoformat(): i for i, day in enumerate(days)}
+    series: Dict[str, List[Dict[str, Any]]] = {}
+    opening: Counter = Counter()
+    for row in await db.execute(query):
+        day, event, count = row[0], row[1], row[2]
+        key = row[3] if group is not None else "all"
+        points = series.get(key)
+        if points is None:
+            points = series[key] = [_empty_day(d) for d in days]
+        if day is None:
+            if event == "created":
+                opening[key] += count
+            elif event in BACKLOG_EXITS:
+                opening[key] -= count
+            continue
+        points[index[str(day)]][event] += count
+
+    for key, points in series.items():
+        backlog = opening[key]
+        for point in points:
+            backlog += point["created"] - sum(point[e] for e in BACKLOG_EXITS)
+            point["backlog"] = backlog
+    if not series and group is None:
+        series["all"] = [_empty_day(d) for d in days]
+    return series
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Work order daily rollups")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    backfill = subcommands.add_parser(
+        "backfill", help="Rebuild history from the work order timestamps"
+    )
+    backfill.add_argument(
+        "--chunk-size", type=int, default=ROLLUP_BACKFILL_CHUNK_SIZE
+    )
+    args = parser.parse_args()
+
+    from db import engine
+
+    backfill_rollups(engine, args.chunk_size)
@@ -0,0 +1,168 @@
+"""
+Dashboard work order statistics
+
+The workorder_stats table holds work order counts per (status, priority,
+technician, due date). Handlers that create, update, delete or transition
+work orders call apply_stats_changes() before their commit, so the counts
+change in the same transaction as the work orders. GET /api/stats/workorders
+then needs one grouped query over this small table instead of the full work
+order list.
+
+Responses are cached in-process for STATS_CACHE_TTL_SECONDS; writes made by
+this worker clear the cache.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from db.models import WorkOrderStat
+from db.upsert import increment
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .workflow_rules import Status
+
+STATS_CACHE_TTL_SECONDS = float(os.getenv("STATS_CACHE_TTL_SECONDS", "5"))
+
+# Statuses that no longer count as open (or overdue) work
+DONE_STATUSES = (Status.COMPLETED.value, Status.CLOSED.value, Status.CANCELED.value)
+
+KEY_FIELDS = ("status", "priority", "assigned_to", "due_date")
+
+StatsKey = Tuple[str, str, str, str]
+
+
+def stats_key(wo: Any, **overrides: Optional[str]) -> StatsKey:
+    """
+    Aggregate key of a work order (entity or row); overrides replace fields,
+    e.g. stats_key(wo, status=from_status) for the state before a transition.
+    Dates are stored as YYYY-MM-DD.
+    """
+    values = (
+        overrides[field] if field in overrides else getattr(wo, field)
+        for field in KEY_FIELDS
+    )
+    return tuple(
+        value.isoformat() if isinstance(value, date) else value or ""
+        for value in values
+    )
+
+
+async def apply_stats_changes(
+    db: AsyncSession, changes: Iterable[Tuple[Optional[StatsKey], Optional[StatsKey]]]
+) -> None:
+    """
+    Apply (before, after) key pairs to workorder_stats in one upsert (no
+    commit). before is None for a new work order, after None for a deleted one.
+    """
+    deltas: Counter = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        if before is not None:
+            deltas[before] -= 1
+        if after is not None:
+            deltas[after] += 1
+    rows = [
+        {**dict(zip(KEY_FIELDS, key)), "total": delta}
+        for key, delta in deltas.items()
+        if delta
+    ]
+    if not rows:
+        return
+
+    await db.execute(
+        increment(db.get_bind(), WorkOrderStat.__table__, KEY_FIELDS), rows
+    )
+    stats_cache.clear()
+
+
+async def load_workorder_stats(db: AsyncSession, today: date) -> Dict[str, Any]:
+    """Dashboard aggregates from one grouped query over workorder_stats"""
+    today_key = today.isoformat()
+    overdue = (
+        (WorkOrderStat.due_date != "")
+        & (WorkOrderStat.due_date < today_key)
+        & WorkOrderStat.status.notin_(DONE_STATUSES)
+    )
+    query = (
+        select(
+            WorkOrderStat.status,
+            WorkOrderStat.priority,
+            WorkOrderStat.assigned_to,
+            overdue.label("overdue"),
+            func.sum(WorkOrderStat.total),
+        )
+        .where(WorkOrderStat.total > 0)
+        .group_by(
+            WorkOrderStat.status,
+            WorkOrderStat.priority,
+            WorkOrderStat.assigned_to,
+            overdue,
+        )
+    )
+
+    stats: Dict[str, Any] = {
+        "total": 0,
+        "open": 0,
+        "overdue": 0,
+        "unassigned": 0,
+        "byStatus": Counter(),
+        "byPriority": Counter(),
+        "byTechnician": {},
+    }
+    for status, priority, assigned_to, is_overdue, count in await db.execute(query):
+        is_open = status not in DONE_STATUSES
+        stats["total"] += count
+        stats["open"] += count if is_open else 0
+        stats["overdue"] += count if is_overdue else 0
+        stats["byStatus"][status] += count
+        stats["byPriority"][priority] += count
+        if not assigned_to:
+            stats["unassigned"] += count if is_open else 0
+            continue
+        technician = stats["byTechnician"].setdefault(
+            assigned_to, {"total": 0, "open": 0, "overdue": 0}
+        )
+        technician["total"] += count
+        technician["open"] += count if is_open else 0
+        technician["overdue"] += count if is_overdue else 0
+
+    stats["byStatus"] = dict(stats["byStatus"])
+    stats["byPriority"] = dict(stats["byPriority"])
+    stats["asOf"] = today_key
+    stats["generatedAt"] = datetime.now(timezone.utc).isoformat()
+    return stats
+
+
+class StatsCache:
+    """Encoded stats response per day, reused for STATS_CACHE_TTL_SECONDS"""
+
+    def __init__(self, ttl: float = STATS_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._entry: Optional[Tuple[float, str, bytes]] = None
+        self._lock = threading.Lock()
+
+    def get(self, today: str) -> Optional[bytes]:
+        entry = self._entry
+        if entry is None:
+            return None
+        loaded_at, day, body = entry
+        if day != today or time.monotonic() - loaded_at >= self.ttl:
+            return None
+        return body
+
+    def put(self, today: str, body: bytes) -> None:
+        with self._lock:
+            self._entry = (time.monotonic(), today, body)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entry = None
+
+
+stats_cache = StatsCache()
@@ -0,0 +1,252 @@
+"""
+Work order transitions as single conditional UPDATEs
+
+A transition is one statement:
+
+    UPDATE workorders SET ... WHERE id = :id AND status = :expected RETURNING *
+
+so the handler needs no SELECT before the change and no refresh after it. If
+another request moved the work order first, no row matches and the caller
+gets None instead of overwriting the other change (concurrent approvals
+can't both win). The rare failure path reads the row with
+current_workorder() to tell the client why.
+
+bulk_transition() applies one action to many work orders the same way:
+one SELECT to check every row against the workflow rules, then set-based
+conditional UPDATEs, all in the caller's transaction.
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from db.models import WorkOrder as WorkOrderModel
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .workflow_notifications import enqueue_workflow_notifications
+from .workorder_history import history_event, record_history
+from .workorder_rollups import record_events, status_events
+from .workorder_stats import apply_stats_changes, stats_key
+from .workflow_rules import (
+    Status,
+    UserRole,
+    get_work_order_permissions,
+    is_transition_allowed,
+)
+
+BULK_TRANSITION_MAX_IDS = int(os.getenv("BULK_TRANSITION_MAX_IDS", "1000"))
+
+
+async def apply_transition(
+    db: AsyncSession,
+    wo_id: str,
+    from_status: str,
+    values: Dict[str, Any],
+    assigned_to: Optional[str] = None,
+    actor: Optional[str] = None,
+    reason: Optional[str] = None,
+) -> Optional[WorkOrderModel]:
+    """
+    Update a work order if it is still in from_status (and, with assigned_to,
+    still assigned to that user), recording the change by actor in the
+    status history. No commit.
+
+    Returns:
+        The updated work order, or None if no row matched
+    """
+    query = (
+        update(WorkOrderModel)
+        .where(WorkOrderModel.id == wo_id, WorkOrderModel.status == from_status)
+        .values(**values)
+        .returning(WorkOrderModel)
+        .execution_options(populate_existing=True)
+    )
+    if assigned_to is not None:
+        query = query.where(WorkOrderModel.assigned_to == assigned_to)
+    wo = await db.scalar(query)
+    if wo is not None:
+        # Transitions don't change the other stats fields
+        await apply_stats_changes(
+            db, [(stats_key(wo, status=from_status), stats_key(wo))]
+        )
+        await record_events(db, status_events(wo, from_status))
+        record_history(db, [history_event(wo, from_status, actor, reason)])
+    return wo
+
+
+async def current_workorder(
+    db: AsyncSession, wo_id: str
+) -> Optional[WorkOrderModel]:
+    """The work order as it is now (for explaining a failed transition)"""
+    return await db.scalar(select(WorkOrderModel).where(WorkOrderModel.id == wo_id))
+
+
+class BulkAction(NamedTuple):
+    """A transition applied to many work orders by POST /bulk-transition"""
+
+    from_statuses: Tuple[str, ...]
+    # None keeps the current status (reassignment)
+    to_status: Optional[str]
+    # Workflow notification action sent for every updated work order
+    notification: str
+
+
+BULK_ACTIONS: Dict[str, BulkAction] = {
+    "approve": BulkAction(
+        (Status.PENDING.value,), Status.COMPLETED.value, "approved"
+    ),
+    "reject": BulkAction(
+        (Status.PENDING.value,), Status.IN_PROGRESS.value, "rejected"
+    ),
+    "close": BulkAction((Status.COMPLETED.value,), Status.CLOSED.value, "closed"),
+    "reassign": BulkAction(
+        (Status.OPEN.value, Status.IN_PROGRESS.value), None, "assigned"
+    ),
+}
+
+
+def _bulk_values(
+    action: str, user_name: str, reason: Optional[str], assignee: Optional[str]
+) -> Dict[str, Any]:
+    now = datetime.now()
+    if action == "approve":
+        return {"approved_by": user_name, "approved_at": now}
+    if action == "reject":
+        return {
+            "rejection_reason": reason,
+            "rejected_by": user_name,
+            "rejected_at": now,
+        }
+    if action == "close":
+        return {"closed_by": user_name, "closed_at": now}
+    return {"assigned_to": assignee}
+
+
+def _bulk_check(
+    bulk: BulkAction,
+    status: str,
+    assigned_to: Optional[str],
+    user_role: str,
+    user_name: str,
+    assignee: Optional[str],
+) -> Optional[str]:
+    """Why the action can't be applied to a row, or None if it can"""
+    if status not in bulk.from_statuses:
+        return f"Work order is in '{status}' status"
+    permissions = get_work_order_permissions(status, user_role, assigned_to, user_name)
+    if bulk.to_status is None:
+        if not permissions.can_assign:
+            return f"User with role '{user_role}' cannot assign work orders"
+        if assigned_to == assignee:
+            return f"Work order is already assigned to '{assignee}'"
+        return None
+    if not (
+        permissions.can_change_status
+        and is_transition_allowed(status, bulk.to_status, user_role)
+    ):
+        return (
+            f"User with role '{user_role}' cannot change status "
+            f"from '{status}' to '{bulk.to_status}'"
+        )
+    return None
+
+
+def _result(wo_id: str, status: Optional[str], error: Optional[str]) -> Dict[str, Any]:
+    # ok is set once the UPDATE has returned the row
+    return {"id": wo_id, "ok": False, "status": status, "error": error}
+
+
+async def bulk_transition(
+    db: AsyncSession,
+    action: str,
+    ids: List[str],
+    user_role: str,
+    user_name: str,
+    reason: Optional[str] = None,
+    assignee: Optional[str] = None,
+    from_assignee: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Apply a BULK_ACTIONS action to many work orders (no commit).
+
+    All rows are read and checked in one SELECT, then updated with one
+    conditional UPDATE ... RETURNING per current status. For reassignment,
+    from_assignee selects all of that technician's open work instead of ids.
+
+    Returns:
+        One result per work order: {"id", "ok", "status", "error"}
+    """
+    bulk = BULK_ACTIONS[action]
+    state = select(
+        WorkOrderModel.id, WorkOrderModel.status, WorkOrderModel.assigned_to
+    )
+    if from_assignee is not None:
+        state = state.where(
+            WorkOrderModel.assigned_to == from_assignee,
+            WorkOrderModel.status.in_(bulk.from_statuses),
+        )
+    else:
+        state = state.where(WorkOrderModel.id.in_(ids))
+    rows = {row.id: row for row in (await db.execute(state)).all()}
+    if from_assignee is not None:
+        ids = sorted(rows)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    by_status: Dict[str, List[str]] = defaultdict(list)
+    for wo_id in dict.fromkeys(ids):
+        row = rows.get(wo_id)
+        if row is None:
+            results[wo_id] = _result(wo_id, None, "Work order not found")
+            continue
+        error = _bulk_check(
+            bulk, row.status, row.assigned_to, user_role, user_name, assignee
+        )
+        results[wo_id] = _result(wo_id, row.status, error)
+        if error is None:
+            by_status[row.status].append(wo_id)
+
+    values = _bulk_values(action, user_name, reason, assignee)
+    stats_changes = []
+    events = []
+    history = []
+    for from_status, status_ids in by_status.items():
+        query = (
+            update(WorkOrderModel)
+            .where(
+                WorkOrderModel.id.in_(status_ids),
+                WorkOrderModel.status == from_status,
+            )
+            .values(**values, status=bulk.to_status or from_status)
+            .returning(WorkOrderModel)
+            .execution_options(populate_existing=True)
+        )
+        if user_role == UserRole.TECHNICIAN.value:
+            query = query.where(WorkOrderModel.assigned_to == user_name)
+        updated = {wo.id: wo for wo in await db.scalars(query)}
+        for wo_id in status_ids:
+            wo = updated.get(wo_id)
+            if wo is None:
+                # Changed by another request between the SELECT and the UPDATE
+                results[wo_id]["error"] = "Work order was modified concurrently"
+                continue
+            results[wo_id].update(ok=True, status=wo.status)
+            stats_changes.append(
+                (
+                    stats_key(
+                        wo, status=from_status, assigned_to=rows[wo_id].assigned_to
+                    ),
+                    stats_key(wo),
+                )
+            )
+            events.extend(status_events(wo, from_status))
+            history.append(history_event(wo, from_status, user_name, reason))
+            enqueue_workflow_notifications(
+                db, wo, bulk.notification, user_name, reason=reason
+            )
+
+    await apply_stats_changes(db, stats_changes)
+    await record_events(db, events)
+    record_history(db, history)
+    return list(results.values())
@@ -65,6 +65,19 @@ const inferMessageKeyFromType = (notification: Notification): { messageKey: stri
   }
 };
 
+/**
+ * Server-side templates store dates as YYYY-MM-DD; display them as DD/MM/YYYY
+ */
+const formatMessageParams = (params?: Record<string, string>): Record<string, string> | undefined => {
+  if (!params) return params;
+  const formatted: Record<string, string> = {};
+  for (const [key, value] of Object.entries(params)) {
+    const match = /^(\d{4})-(\d{2})-(\d{2})$/.exec(value ?? '');
+    formatted[key] = match ? `${match[3]}/${match[2]}/${match[1]}` : value;
+  }
+  return formatted;
+};
+
 /**
  * Helper function to get translated notification message
  * Uses messageKey if available, otherwise infers from notification type
@@ -75,7 +88,7 @@ const getTranslatedMessage = (
 ): string => {
   // If messageKey exists, use it directly
   if (notification.messageKey) {
-    return t(notification.messageKey, notification.messageParams);
+    return t(notification.messageKey, formatMessageParams(notification.messageParams));
   }
   
   // Try to infer messageKey from notification type
@@ -6,7 +6,8 @@ import { getWorkOrderPermissions } from '../utils/workflowRules';
 import { useLanguage } from '../lib/i18n';
 
 // Helper function to format date as DD/MM/YYYY
-const formatDateDDMMYYYY = (dateString: string): string => {
+const formatDateDDMMYYYY = (dateString: string | null | undefined): string => {
+  if (!dateString) return 'N/A';
   const date = new Date(dateString);
   const day = date.getDate().toString().padStart(2, '0');
   const month = (date.getMonth() + 1).toString().padStart(2, '0');
@@ -15,7 +16,8 @@ const formatDateDDMMYYYY = (dateString: string): string => {
 };
 
 // Helper function to format date as DD/MM (short format)
-const formatDateShort = (dateString: string): string => {
+const formatDateShort = (dateString: string | null | undefined): string => {
+  if (!dateString) return 'N/A';
   const date = new Date(dateString);
   const day = date.getDate().toString().padStart(2, '0');
   const month = (date.getMonth() + 1).toString().padStart(2, '0');
@@ -8,7 +8,8 @@ import { DateInputSmall } from './DateInput';
 import { useLanguage } from '../lib/i18n';
 
 // Helper function to format date as DD/MM/YYYY
-const formatDateDDMMYYYY = (dateString: string): string => {
+const formatDateDDMMYYYY = (dateString: string | null | undefined): string => {
+  if (!dateString) return 'N/A';
   const date = new Date(dateString);
   const day = date.getDate().toString().padStart(2, '0');
   const month = (date.getMonth() + 1).toString().padStart(2, '0');
@@ -17,7 +18,8 @@ const formatDateDDMMYYYY = (dateString: string): string => {
 };
 
 // Helper function to format date as DD/MM (short format)
-const formatDateShort = (dateString: string): string => {
+const formatDateShort = (dateString: string | null | undefined): string => {
+  if (!dateString) return 'N/A';
   const date = new Date(dateString);
   const day = date.getDate().toString().padStart(2, '0');
   const month = (date.getMonth() + 1).toString().padStart(2, '0');
@@ -25,15 +27,8 @@ const formatDateShort = (dateString: string): string => {
 };
 import { WorkOrder, Status, Priority, User, PartUsage } from '../types';
 import { analyzeMaintenanceIssue, AnalysisResult, generateSmartChecklist } from '../services/geminiService';
-import { getImageDataUrl, uploadImage, technicianUpdateWorkOrder, TechnicianUpdateData, updateWorkOrder, adminApproveWorkOrder, adminRejectWorkOrder, adminCloseWorkOrder, createNotification } from '../services/apiService';
+import { getImageDataUrl, uploadImage, technicianUpdateWorkOrder, TechnicianUpdateData, updateWorkOrder, adminApproveWorkOrder, adminRejectWorkOrder, adminCloseWorkOrder } from '../services/apiService';
 import { canDragToStatus, getWorkOrderPermissions } from '../utils/workflowRules';
-import { 
-  createWOAssignedNotification, 
-  createWOCompletedNotification, 
-  createWOApprovedNotifications, 
-  createWORejectedNotification, 
-  createWOClosedNotification 
-} from '../services/notificationService';
 
 interface WorkOrdersProps {
   workOrders: WorkOrder[];
@@ -250,19 +245,9 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
         payload.status = nextStatus;
       }
 
+      // The backend notifies the assigned technician in the same transaction
       const updated = await updateWorkOrder(selectedWO.id, payload);
       
-      // Create notification for assigned technician (only when assigning from Open)
-      if (isFromOpen && adminAssignedTo) {
-        const notification = createWOAssignedNotification(
-          selectedWO.id,
-          selectedWO.title,
-          adminAssignedTo,
-          currentUser.name
-        );
-        await createNotification(notification);
-      }
-      
       // Reflect locally (map API fields to WorkOrder shape if needed)
       const updatedWO: WorkOrder = {
         ...selectedWO,
@@ -418,16 +403,9 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
         technicianImages
       };
 
+      // The backend notifies the Head Technician (pending review)
       const updatedWO = await technicianUpdateWorkOrder(selectedWO.id, updateData);
       
-      // Create notification for Admin (work completed, pending review)
-      const notification = createWOCompletedNotification(
-        selectedWO.id,
-        selectedWO.title,
-        currentUser.name
-      );
-      await createNotification(notification);
-      
       setWorkOrders(prev => prev.map(wo => wo.id === updatedWO.id ? updatedWO : wo));
       // Keep the details panel open but reflect new status (typically Pending),
       // which will hide the inline technician section automatically
@@ -450,20 +428,12 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
     setIsAssigning(true);
     try {
       // Assign technician and change status to In Progress
+      // (the backend notifies the assigned technician)
       const updatedWO = await updateWorkOrder(selectedWO.id, {
         assignedTo: selectedTechnician,
         status: Status.IN_PROGRESS,
       });
 
-      // Create notification for assigned technician
-      const notification = createWOAssignedNotification(
-        selectedWO.id,
-        selectedWO.title,
-        selectedTechnician,
-        currentUser.name
-      );
-      await createNotification(notification);
-
       // Update local state
       setWorkOrders(prev => prev.map(wo => 
         wo.id === selectedWO.id 
@@ -489,22 +459,9 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
     setIsApproving(true);
     try {
       // Approve work order, changes status to Completed
+      // (the backend notifies the Requestor and Technician)
       const updatedWO = await adminApproveWorkOrder(selectedWO.id);
 
-      // Create notifications for Requestor and Technician
-      const notifications = createWOApprovedNotifications(
-        selectedWO.id,
-        selectedWO.title,
-        currentUser.name,
-        undefined, // requestorName - would need to track this
-        selectedWO.assignedTo
-      );
-      
-      // Send both notifications
-      for (const notification of notifications) {
-        await createNotification(notification);
-      }
-
       // Update local state
       setWorkOrders(prev => prev.map(wo => 
         wo.id === selectedWO.id 
@@ -541,20 +498,11 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
     setIsRejecting(true);
     try {
       // Reject work order with reason, changes status back to In Progress
+      // (the backend notifies the Technician with the rejection reason)
       const updatedWO = await adminRejectWorkOrder(selectedWO.id, {
         rejectionReason: rejectionReason.trim()
       });
 
-      // Create notification for Technician with rejection reason
-      const notification = createWORejectedNotification(
-        selectedWO.id,
-        selectedWO.title,
-        currentUser.name,
-        selectedWO.assignedTo,
-        rejectionReason.trim()
-      );
-      await createNotification(notification);
-
       // Update local state
       setWorkOrders(prev => prev.map(wo => 
         wo.id === selectedWO.id 
@@ -585,17 +533,9 @@ const WorkOrders: React.FC<WorkOrdersProps> = ({ workOrders: initialWorkOrders,
     setIsClosing(true);
     try {
       // Close work order, changes status to Closed
+      // (the backend notifies the Requestor)
       const updatedWO = await adminCloseWorkOrder(selectedWO.id);
 
-      // Create notification for Requestor
-      const notification = createWOClosedNotification(
-        selectedWO.id,
-        selectedWO.title,
-        currentUser.name,
-        undefined // requestorName - would need to track this
-      );
-      await createNotification(notification);
-
       // Update local state
       setWorkOrders(prev => prev.map(wo => 
         wo.id === selectedWO.id 
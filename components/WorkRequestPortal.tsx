@@ -75,7 +75,7 @@ const WorkRequestPortal: React.FC<WorkRequestPortalProps> = ({
   const { t } = useLanguage();
   const [requests, setRequests] = useState<RequestItem[]>([]);
   const [location, setLocation] = useState('');
-  const [priority, setPriority] = useState('Low - Cosmetic issue');
+  const [priority, setPriority] = useState('Low');
   const [description, setDescription] = useState('');
   const [assignedTo, setAssignedTo] = useState<string>('');
   const [preferredDate, setPreferredDate] = useState<string>(''); // Preferred maintenance date
@@ -273,15 +273,13 @@ const WorkRequestPortal: React.FC<WorkRequestPortalProps> = ({
         }
       }
 
-      const priorityValue = priority.split(' - ')[0];
-      
       // Determine assignedTo value
       const assignedToValue = canAssign ? (assignedTo || undefined) : undefined;
 
       // Create request via API with location data and preferred date
       const createdRequest = await createRequest({
         location: location,
-        priority: priorityValue,
+        priority: priority,
         description: description,
         imageIds: savedImageIds,
         assignedTo: assignedToValue,
@@ -332,7 +330,7 @@ const WorkRequestPortal: React.FC<WorkRequestPortalProps> = ({
       // Update UI
       setRequests(prev => [newRequest, ...prev]);
       setLocation('');
-      setPriority('Low - Cosmetic issue');
+      setPriority('Low');
       setDescription('');
       setSelectedLocation(null); // Reset location
       setPreferredDate(''); // Reset preferred date
@@ -402,10 +400,10 @@ const WorkRequestPortal: React.FC<WorkRequestPortalProps> = ({
                           aria-label={t('request.priority')}
                           className="w-full px-4 py-3 bg-stone-50 border border-stone-200 rounded-xl focus:ring-2 focus:ring-teal-500 focus:border-transparent outline-none transition-all duration-200"
                         >
-                            <option>{t('request.priorityLow')}</option>
-                            <option>{t('request.priorityMedium')}</option>
-                            <option>{t('request.priorityHigh')}</option>
-                            <option>{t('request.priorityCritical')}</option>
+                            <option value="Low">{t('request.priorityLow')}</option>
+                            <option value="Medium">{t('request.priorityMedium')}</option>
+                            <option value="High">{t('request.priorityHigh')}</option>
+                            <option value="Critical">{t('request.priorityCritical')}</option>
                         </select>
                         </div>
                     </div>
@@ -49,6 +49,27 @@ const getAuthHeaders = (): Record<string, string> => {
   return headers;
 };
 
+// Read-your-writes: after a write the backend returns X-Recent-Write (epoch
+// ms until which reads must go to the primary database). Send the last one
+// back on the following requests so they don't read from a lagging replica;
+// the backend decides when it has expired (the browser clock may be off), and
+// the cookie it also sets isn't sent to the cross-origin API.
+const RECENT_WRITE_HEADER = 'X-Recent-Write';
+let recentWriteUntil: string | null = null;
+
+const apiFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const headers = new Headers(init.headers);
+  if (recentWriteUntil) {
+    headers.set(RECENT_WRITE_HEADER, recentWriteUntil);
+  }
+  const response = await fetch(url, { ...init, headers });
+  const marker = response.headers.get(RECENT_WRITE_HEADER);
+  if (marker) {
+    recentWriteUntil = marker;
+  }
+  return response;
+};
+
 // --- Image API ---
 export interface ImageInfo {
   id: string;
@@ -72,7 +93,7 @@ export const uploadImage = async (file: File): Promise<ImageInfo> => {
 
   const base64 = await toBase64(file);
 
-  const response = await fetch(`${API_BASE_URL}/images/upload-base64`, {
+  const response = await apiFetch(`${API_BASE_URL}/images/upload-base64`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ originalName: file.name, base64Data: base64 }),
@@ -86,7 +107,7 @@ export const uploadImage = async (file: File): Promise<ImageInfo> => {
 };
 
 export const getImageDataUrl = async (imageId: string): Promise<string> => {
-  const response = await fetch(`${API_BASE_URL}/images/${imageId}`);
+  const response = await apiFetch(`${API_BASE_URL}/images/${imageId}`);
   if (!response.ok) {
     throw new Error('Failed to get image');
   }
@@ -96,7 +117,7 @@ export const getImageDataUrl = async (imageId: string): Promise<string> => {
 };
 
 export const listImages = async (): Promise<ImageInfo[]> => {
-  const response = await fetch(`${API_BASE_URL}/images`);
+  const response = await apiFetch(`${API_BASE_URL}/images`);
   if (!response.ok) {
     throw new Error('Failed to list images');
   }
@@ -104,7 +125,7 @@ export const listImages = async (): Promise<ImageInfo[]> => {
 };
 
 export const deleteImage = async (imageId: string): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/images/${imageId}`, {
+  const response = await apiFetch(`${API_BASE_URL}/images/${imageId}`, {
     method: 'DELETE',
   });
   if (!response.ok) {
@@ -146,7 +167,7 @@ export interface CreateRequestData {
 }
 
 export const createRequest = async (data: CreateRequestData): Promise<RequestItem> => {
-  const response = await fetch(`${API_BASE_URL}/requests`, {
+  const response = await apiFetch(`${API_BASE_URL}/requests`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -162,7 +183,7 @@ export const createRequest = async (data: CreateRequestData): Promise<RequestIte
 };
 
 export const listRequests = async (): Promise<RequestItem[]> => {
-  const response = await fetch(`${API_BASE_URL}/requests`);
+  const response = await apiFetch(`${API_BASE_URL}/requests`);
   if (!response.ok) {
     throw new Error('Failed to list requests');
   }
@@ -170,7 +191,7 @@ export const listRequests = async (): Promise<RequestItem[]> => {
 };
 
 export const getRequest = async (requestId: string): Promise<RequestItem> => {
-  const response = await fetch(`${API_BASE_URL}/requests/${requestId}`);
+  const response = await apiFetch(`${API_BASE_URL}/requests/${requestId}`);
   if (!response.ok) {
     throw new Error('Failed to get request');
   }
@@ -178,7 +199,7 @@ export const getRequest = async (requestId: string): Promise<RequestItem> => {
 };
 
 export const deleteRequest = async (requestId: string): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/requests/${requestId}`, {
+  const response = await apiFetch(`${API_BASE_URL}/requests/${requestId}`, {
     method: 'DELETE',
   });
   if (!response.ok) {
@@ -187,7 +208,7 @@ export const deleteRequest = async (requestId: string): Promise<void> => {
 };
 
 export const convertRequestToWorkOrder = async (requestId: string): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/requests/${requestId}/convert`, {
+  const response = await apiFetch(`${API_BASE_URL}/requests/${requestId}/convert`, {
     method: 'POST',
   });
   if (!response.ok) {
@@ -236,7 +257,7 @@ export interface CreateWorkOrderData {
 }
 
 export const createWorkOrder = async (data: CreateWorkOrderData): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -269,7 +290,7 @@ export const listWorkOrders = async (query?: WorkOrderQuery): Promise<WorkOrderI
   const qs = params.toString();
   const url = qs ? `${API_BASE_URL}/workorders?${qs}` : `${API_BASE_URL}/workorders`;
 
-  const response = await fetch(url);
+  const response = await apiFetch(url);
   if (!response.ok) {
     throw new Error('Failed to list work orders');
   }
@@ -277,7 +298,7 @@ export const listWorkOrders = async (query?: WorkOrderQuery): Promise<WorkOrderI
 };
 
 export const getWorkOrder = async (woId: string): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}`);
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}`);
   if (!response.ok) {
     throw new Error('Failed to get work order');
   }
@@ -285,7 +306,7 @@ export const getWorkOrder = async (woId: string): Promise<WorkOrderItem> => {
 };
 
 export const updateWorkOrder = async (woId: string, updates: Partial<WorkOrderItem>): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}`, {
     method: 'PUT',
     headers: getAuthHeaders(),
     body: JSON.stringify(updates),
@@ -299,7 +320,7 @@ export const updateWorkOrder = async (woId: string, updates: Partial<WorkOrderIt
 };
 
 export const deleteWorkOrder = async (woId: string): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}`, {
     method: 'DELETE',
   });
   if (!response.ok) {
@@ -317,7 +338,7 @@ export const technicianUpdateWorkOrder = async (
   woId: string,
   data: TechnicianUpdateData
 ): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}/technician-update`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}/technician-update`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
     body: JSON.stringify(data),
@@ -333,7 +354,7 @@ export const technicianUpdateWorkOrder = async (
 
 // --- Admin Review API ---
 export const adminApproveWorkOrder = async (woId: string): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}/approve`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}/approve`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
   });
@@ -350,7 +371,7 @@ export interface AdminRejectData {
 }
 
 export const adminRejectWorkOrder = async (woId: string, data: AdminRejectData): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}/reject`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}/reject`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
     body: JSON.stringify(data),
@@ -364,7 +385,7 @@ export const adminRejectWorkOrder = async (woId: string, data: AdminRejectData):
 };
 
 export const adminCloseWorkOrder = async (woId: string): Promise<WorkOrderItem> => {
-  const response = await fetch(`${API_BASE_URL}/workorders/${woId}/close`, {
+  const response = await apiFetch(`${API_BASE_URL}/workorders/${woId}/close`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
   });
@@ -383,6 +404,8 @@ export interface NotificationItem {
   workOrderId: string;
   workOrderTitle: string;
   message: string;
+  messageKey?: string; // i18n key; message is the server-rendered fallback
+  messageParams?: Record<string, string>;
   recipientRole: string;
   recipientName?: string;
   isRead: boolean;
@@ -391,7 +414,7 @@ export interface NotificationItem {
 }
 
 export const getNotifications = async (): Promise<NotificationItem[]> => {
-  const response = await fetch(`${API_BASE_URL}/notifications`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications`, {
     headers: getAuthHeaders(),
   });
 
@@ -403,7 +426,7 @@ export const getNotifications = async (): Promise<NotificationItem[]> => {
 };
 
 export const createNotification = async (notification: Omit<NotificationItem, 'id'>): Promise<NotificationItem> => {
-  const response = await fetch(`${API_BASE_URL}/notifications`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications`, {
     method: 'POST',
     headers: getAuthHeaders(),
     body: JSON.stringify(notification),
@@ -417,7 +440,7 @@ export const createNotification = async (notification: Omit<NotificationItem, 'i
 };
 
 export const markNotificationAsRead = async (notificationId: string): Promise<NotificationItem> => {
-  const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}/read`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications/${notificationId}/read`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
   });
@@ -430,7 +453,7 @@ export const markNotificationAsRead = async (notificationId: string): Promise<No
 };
 
 export const markAllNotificationsAsRead = async (): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/notifications/read-all`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications/read-all`, {
     method: 'PATCH',
     headers: getAuthHeaders(),
   });
@@ -441,7 +464,7 @@ export const markAllNotificationsAsRead = async (): Promise<void> => {
 };
 
 export const deleteNotification = async (notificationId: string): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/notifications/${notificationId}`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications/${notificationId}`, {
     method: 'DELETE',
     headers: getAuthHeaders(),
   });
@@ -452,7 +475,7 @@ export const deleteNotification = async (notificationId: string): Promise<void>
 };
 
 export const deleteAllReadNotifications = async (): Promise<void> => {
-  const response = await fetch(`${API_BASE_URL}/notifications/read`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications/read`, {
     method: 'DELETE',
     headers: getAuthHeaders(),
   });
@@ -464,7 +487,7 @@ export const deleteAllReadNotifications = async (): Promise<void> => {
 
 // Check and create reminder notifications for upcoming work orders
 export const checkAndCreateReminders = async (): Promise<{ message: string; notifications: { workOrderId: string; type: string; assignedTo: string }[] }> => {
-  const response = await fetch(`${API_BASE_URL}/notifications/check-reminders`, {
+  const response = await apiFetch(`${API_BASE_URL}/notifications/check-reminders`, {
     method: 'POST',
     headers: getAuthHeaders(),
   });
@@ -479,7 +502,7 @@ export const checkAndCreateReminders = async (): Promise<{ message: string; noti
 // --- Health Check ---
 export const checkHealth = async (): Promise<boolean> => {
   try {
-    const response = await fetch(`${API_BASE_URL}/health`);
+    const response = await apiFetch(`${API_BASE_URL}/health`);
     return response.ok;
   } catch {
     return false;